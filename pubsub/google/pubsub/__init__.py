@@ -16,49 +16,119 @@
 #
 
 
-from google.pubsub_v1.services.publisher.client import PublisherClient
-from google.pubsub_v1.services.subscriber.client import SubscriberClient
-from google.pubsub_v1.types.pubsub import AcknowledgeRequest
-from google.pubsub_v1.types.pubsub import CreateSnapshotRequest
-from google.pubsub_v1.types.pubsub import DeadLetterPolicy
-from google.pubsub_v1.types.pubsub import DeleteSnapshotRequest
-from google.pubsub_v1.types.pubsub import DeleteSubscriptionRequest
-from google.pubsub_v1.types.pubsub import DeleteTopicRequest
-from google.pubsub_v1.types.pubsub import ExpirationPolicy
-from google.pubsub_v1.types.pubsub import GetSnapshotRequest
-from google.pubsub_v1.types.pubsub import GetSubscriptionRequest
-from google.pubsub_v1.types.pubsub import GetTopicRequest
-from google.pubsub_v1.types.pubsub import ListSnapshotsRequest
-from google.pubsub_v1.types.pubsub import ListSnapshotsResponse
-from google.pubsub_v1.types.pubsub import ListSubscriptionsRequest
-from google.pubsub_v1.types.pubsub import ListSubscriptionsResponse
-from google.pubsub_v1.types.pubsub import ListTopicSnapshotsRequest
-from google.pubsub_v1.types.pubsub import ListTopicSnapshotsResponse
-from google.pubsub_v1.types.pubsub import ListTopicSubscriptionsRequest
-from google.pubsub_v1.types.pubsub import ListTopicSubscriptionsResponse
-from google.pubsub_v1.types.pubsub import ListTopicsRequest
-from google.pubsub_v1.types.pubsub import ListTopicsResponse
-from google.pubsub_v1.types.pubsub import MessageStoragePolicy
-from google.pubsub_v1.types.pubsub import ModifyAckDeadlineRequest
-from google.pubsub_v1.types.pubsub import ModifyPushConfigRequest
-from google.pubsub_v1.types.pubsub import PublishRequest
-from google.pubsub_v1.types.pubsub import PublishResponse
-from google.pubsub_v1.types.pubsub import PubsubMessage
-from google.pubsub_v1.types.pubsub import PullRequest
-from google.pubsub_v1.types.pubsub import PullResponse
-from google.pubsub_v1.types.pubsub import PushConfig
-from google.pubsub_v1.types.pubsub import ReceivedMessage
-from google.pubsub_v1.types.pubsub import RetryPolicy
-from google.pubsub_v1.types.pubsub import SeekRequest
-from google.pubsub_v1.types.pubsub import SeekResponse
-from google.pubsub_v1.types.pubsub import Snapshot
-from google.pubsub_v1.types.pubsub import StreamingPullRequest
-from google.pubsub_v1.types.pubsub import StreamingPullResponse
-from google.pubsub_v1.types.pubsub import Subscription
-from google.pubsub_v1.types.pubsub import Topic
-from google.pubsub_v1.types.pubsub import UpdateSnapshotRequest
-from google.pubsub_v1.types.pubsub import UpdateSubscriptionRequest
-from google.pubsub_v1.types.pubsub import UpdateTopicRequest
+import importlib
+import sys
+import typing
+
+# Public names and the modules defining them. They are imported on first
+# access (PEP 562), so that importing the package, or one client, does not
+# load grpc, google.auth and the other client up front.
+_LAZY_ATTRIBUTES = {
+    'PublisherClient': 'google.pubsub_v1.services.publisher.client',
+    'SubscriberClient': 'google.pubsub_v1.services.subscriber.client',
+    'AcknowledgeRequest': 'google.pubsub_v1.types.pubsub',
+    'CreateSnapshotRequest': 'google.pubsub_v1.types.pubsub',
+    'DeadLetterPolicy': 'google.pubsub_v1.types.pubsub',
+    'DeleteSnapshotRequest': 'google.pubsub_v1.types.pubsub',
+    'DeleteSubscriptionRequest': 'google.pubsub_v1.types.pubsub',
+    'DeleteTopicRequest': 'google.pubsub_v1.types.pubsub',
+    'ExpirationPolicy': 'google.pubsub_v1.types.pubsub',
+    'GetSnapshotRequest': 'google.pubsub_v1.types.pubsub',
+    'GetSubscriptionRequest': 'google.pubsub_v1.types.pubsub',
+    'GetTopicRequest': 'google.pubsub_v1.types.pubsub',
+    'ListSnapshotsRequest': 'google.pubsub_v1.types.pubsub',
+    'ListSnapshotsResponse': 'google.pubsub_v1.types.pubsub',
+    'ListSubscriptionsRequest': 'google.pubsub_v1.types.pubsub',
+    'ListSubscriptionsResponse': 'google.pubsub_v1.types.pubsub',
+    'ListTopicSnapshotsRequest': 'google.pubsub_v1.types.pubsub',
+    'ListTopicSnapshotsResponse': 'google.pubsub_v1.types.pubsub',
+    'ListTopicSubscriptionsRequest': 'google.pubsub_v1.types.pubsub',
+    'ListTopicSubscriptionsResponse': 'google.pubsub_v1.types.pubsub',
+    'ListTopicsRequest': 'google.pubsub_v1.types.pubsub',
+    'ListTopicsResponse': 'google.pubsub_v1.types.pubsub',
+    'MessageStoragePolicy': 'google.pubsub_v1.types.pubsub',
+    'ModifyAckDeadlineRequest': 'google.pubsub_v1.types.pubsub',
+    'ModifyPushConfigRequest': 'google.pubsub_v1.types.pubsub',
+    'PublishRequest': 'google.pubsub_v1.types.pubsub',
+    'PublishResponse': 'google.pubsub_v1.types.pubsub',
+    'PubsubMessage': 'google.pubsub_v1.types.pubsub',
+    'PullRequest': 'google.pubsub_v1.types.pubsub',
+    'PullResponse': 'google.pubsub_v1.types.pubsub',
+    'PushConfig': 'google.pubsub_v1.types.pubsub',
+    'ReceivedMessage': 'google.pubsub_v1.types.pubsub',
+    'RetryPolicy': 'google.pubsub_v1.types.pubsub',
+    'SeekRequest': 'google.pubsub_v1.types.pubsub',
+    'SeekResponse': 'google.pubsub_v1.types.pubsub',
+    'Snapshot': 'google.pubsub_v1.types.pubsub',
+    'StreamingPullRequest': 'google.pubsub_v1.types.pubsub',
+    'StreamingPullResponse': 'google.pubsub_v1.types.pubsub',
+    'Subscription': 'google.pubsub_v1.types.pubsub',
+    'Topic': 'google.pubsub_v1.types.pubsub',
+    'UpdateSnapshotRequest': 'google.pubsub_v1.types.pubsub',
+    'UpdateSubscriptionRequest': 'google.pubsub_v1.types.pubsub',
+    'UpdateTopicRequest': 'google.pubsub_v1.types.pubsub',
+}
+
+if typing.TYPE_CHECKING or sys.version_info < (3, 7):
+    # Type checkers resolve the names statically, and module-level
+    # __getattr__ is only honoured from Python 3.7.
+    from google.pubsub_v1.services.publisher.client import PublisherClient
+    from google.pubsub_v1.services.subscriber.client import SubscriberClient
+    from google.pubsub_v1.types.pubsub import AcknowledgeRequest
+    from google.pubsub_v1.types.pubsub import CreateSnapshotRequest
+    from google.pubsub_v1.types.pubsub import DeadLetterPolicy
+    from google.pubsub_v1.types.pubsub import DeleteSnapshotRequest
+    from google.pubsub_v1.types.pubsub import DeleteSubscriptionRequest
+    from google.pubsub_v1.types.pubsub import DeleteTopicRequest
+    from google.pubsub_v1.types.pubsub import ExpirationPolicy
+    from google.pubsub_v1.types.pubsub import GetSnapshotRequest
+    from google.pubsub_v1.types.pubsub import GetSubscriptionRequest
+    from google.pubsub_v1.types.pubsub import GetTopicRequest
+    from google.pubsub_v1.types.pubsub import ListSnapshotsRequest
+    from google.pubsub_v1.types.pubsub import ListSnapshotsResponse
+    from google.pubsub_v1.types.pubsub import ListSubscriptionsRequest
+    from google.pubsub_v1.types.pubsub import ListSubscriptionsResponse
+    from google.pubsub_v1.types.pubsub import ListTopicSnapshotsRequest
+    from google.pubsub_v1.types.pubsub import ListTopicSnapshotsResponse
+    from google.pubsub_v1.types.pubsub import ListTopicSubscriptionsRequest
+    from google.pubsub_v1.types.pubsub import ListTopicSubscriptionsResponse
+    from google.pubsub_v1.types.pubsub import ListTopicsRequest
+    from google.pubsub_v1.types.pubsub import ListTopicsResponse
+    from google.pubsub_v1.types.pubsub import MessageStoragePolicy
+    from google.pubsub_v1.types.pubsub import ModifyAckDeadlineRequest
+    from google.pubsub_v1.types.pubsub import ModifyPushConfigRequest
+    from google.pubsub_v1.types.pubsub import PublishRequest
+    from google.pubsub_v1.types.pubsub import PublishResponse
+    from google.pubsub_v1.types.pubsub import PubsubMessage
+    from google.pubsub_v1.types.pubsub import PullRequest
+    from google.pubsub_v1.types.pubsub import PullResponse
+    from google.pubsub_v1.types.pubsub import PushConfig
+    from google.pubsub_v1.types.pubsub import ReceivedMessage
+    from google.pubsub_v1.types.pubsub import RetryPolicy
+    from google.pubsub_v1.types.pubsub import SeekRequest
+    from google.pubsub_v1.types.pubsub import SeekResponse
+    from google.pubsub_v1.types.pubsub import Snapshot
+    from google.pubsub_v1.types.pubsub import StreamingPullRequest
+    from google.pubsub_v1.types.pubsub import StreamingPullResponse
+    from google.pubsub_v1.types.pubsub import Subscription
+    from google.pubsub_v1.types.pubsub import Topic
+    from google.pubsub_v1.types.pubsub import UpdateSnapshotRequest
+    from google.pubsub_v1.types.pubsub import UpdateSubscriptionRequest
+    from google.pubsub_v1.types.pubsub import UpdateTopicRequest
+else:
+    def __getattr__(name):
+        try:
+            module_name = _LAZY_ATTRIBUTES[name]
+        except KeyError:
+            raise AttributeError(
+                'module {!r} has no attribute {!r}'.format(__name__, name)) from None
+        value = getattr(importlib.import_module(module_name, __name__), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 __all__ = (
     'AcknowledgeRequest',
@@ -16,49 +16,118 @@
 #
 
 
-from .services.publisher import PublisherClient
-from .services.subscriber import SubscriberClient
-from .types.pubsub import AcknowledgeRequest
-from .types.pubsub import CreateSnapshotRequest
-from .types.pubsub import DeadLetterPolicy
-from .types.pubsub import DeleteSnapshotRequest
-from .types.pubsub import DeleteSubscriptionRequest
-from .types.pubsub import DeleteTopicRequest
-from .types.pubsub import ExpirationPolicy
-from .types.pubsub import GetSnapshotRequest
-from .types.pubsub import GetSubscriptionRequest
-from .types.pubsub import GetTopicRequest
-from .types.pubsub import ListSnapshotsRequest
-from .types.pubsub import ListSnapshotsResponse
-from .types.pubsub import ListSubscriptionsRequest
-from .types.pubsub import ListSubscriptionsResponse
-from .types.pubsub import ListTopicSnapshotsRequest
-from .types.pubsub import ListTopicSnapshotsResponse
-from .types.pubsub import ListTopicSubscriptionsRequest
-from .types.pubsub import ListTopicSubscriptionsResponse
-from .types.pubsub import ListTopicsRequest
-from .types.pubsub import ListTopicsResponse
-from .types.pubsub import MessageStoragePolicy
-from .types.pubsub import ModifyAckDeadlineRequest
-from .types.pubsub import ModifyPushConfigRequest
-from .types.pubsub import PublishRequest
-from .types.pubsub import PublishResponse
-from .types.pubsub import PubsubMessage
-from .types.pubsub import PullRequest
-from .types.pubsub import PullResponse
-from .types.pubsub import PushConfig
-from .types.pubsub import ReceivedMessage
-from .types.pubsub import RetryPolicy
-from .types.pubsub import SeekRequest
-from .types.pubsub import SeekResponse
-from .types.pubsub import Snapshot
-from .types.pubsub import StreamingPullRequest
-from .types.pubsub import StreamingPullResponse
-from .types.pubsub import Subscription
-from .types.pubsub import Topic
-from .types.pubsub import UpdateSnapshotRequest
-from .types.pubsub import UpdateSubscriptionRequest
-from .types.pubsub import UpdateTopicRequest
+import importlib
+import sys
+import typing
+
+# Public names and the modules defining them. They are imported on first
+# access (PEP 562), so that importing the package, or one client, does not
+# load grpc, google.auth and the other client up front.
+_LAZY_ATTRIBUTES = {
+    'PublisherClient': '.services.publisher',
+    'SubscriberClient': '.services.subscriber',
+    'AcknowledgeRequest': '.types.pubsub',
+    'CreateSnapshotRequest': '.types.pubsub',
+    'DeadLetterPolicy': '.types.pubsub',
+    'DeleteSnapshotRequest': '.types.pubsub',
+    'DeleteSubscriptionRequest': '.types.pubsub',
+    'DeleteTopicRequest': '.types.pubsub',
+    'ExpirationPolicy': '.types.pubsub',
+    'GetSnapshotRequest': '.types.pubsub',
+    'GetSubscriptionRequest': '.types.pubsub',
+    'GetTopicRequest': '.types.pubsub',
+    'ListSnapshotsRequest': '.types.pubsub',
+    'ListSnapshotsResponse': '.types.pubsub',
+    'ListSubscriptionsRequest': '.types.pubsub',
+    'ListSubscriptionsResponse': '.types.pubsub',
+    'ListTopicSnapshotsRequest': '.types.pubsub',
+    'ListTopicSnapshotsResponse': '.types.pubsub',
+    'ListTopicSubscriptionsRequest': '.types.pubsub',
+    'ListTopicSubscriptionsResponse': '.types.pubsub',
+    'ListTopicsRequest': '.types.pubsub',
+    'ListTopicsResponse': '.types.pubsub',
+    'MessageStoragePolicy': '.types.pubsub',
+    'ModifyAckDeadlineRequest': '.types.pubsub',
+    'ModifyPushConfigRequest': '.types.pubsub',
+    'PublishRequest': '.types.pubsub',
+    'PublishResponse': '.types.pubsub',
+    'PubsubMessage': '.types.pubsub',
+    'PullRequest': '.types.pubsub',
+    'PullResponse': '.types.pubsub',
+    'PushConfig': '.types.pubsub',
+    'ReceivedMessage': '.types.pubsub',
+    'RetryPolicy': '.types.pubsub',
+    'SeekRequest': '.types.pubsub',
+    'SeekResponse': '.types.pubsub',
+    'Snapshot': '.types.pubsub',
+    'StreamingPullRequest': '.types.pubsub',
+    'StreamingPullResponse': '.types.pubsub',
+    'Subscription': '.types.pubsub',
+    'Topic': '.types.pubsub',
+    'UpdateSnapshotRequest': '.types.pubsub',
+    'UpdateSubscriptionRequest': '.types.pubsub',
+    'UpdateTopicRequest': '.types.pubsub',
+}
+
+if typing.TYPE_CHECKING or sys.version_info < (3, 7):
+    # Type checkers resolve the names statically, and module-level
+    # __getattr__ is only honoured from Python 3.7.
+    from .services.publisher import PublisherClient
+    from .services.subscriber import SubscriberClient
+    from .types.pubsub import AcknowledgeRequest
+    from .types.pubsub import CreateSnapshotRequest
+    from .types.pubsub import DeadLetterPolicy
+    from .types.pubsub import DeleteSnapshotRequest
+    from .types.pubsub import DeleteSubscriptionRequest
+    from .types.pubsub import DeleteTopicRequest
+    from .types.pubsub import ExpirationPolicy
+    from .types.pubsub import GetSnapshotRequest
+    from .types.pubsub import GetSubscriptionRequest
+    from .types.pubsub import GetTopicRequest
+    from .types.pubsub import ListSnapshotsRequest
+    from .types.pubsub import ListSnapshotsResponse
+    from .types.pubsub import ListSubscriptionsRequest
+    from .types.pubsub import ListSubscriptionsResponse
+    from .types.pubsub import ListTopicSnapshotsRequest
+    from .types.pubsub import ListTopicSnapshotsResponse
+    from .types.pubsub import ListTopicSubscriptionsRequest
+    from .types.pubsub import ListTopicSubscriptionsResponse
+    from .types.pubsub import ListTopicsRequest
+    from .types.pubsub import ListTopicsResponse
+    from .types.pubsub import MessageStoragePolicy
+    from .types.pubsub import ModifyAckDeadlineRequest
+    from .types.pubsub import ModifyPushConfigRequest
+    from .types.pubsub import PublishRequest
+    from .types.pubsub import PublishResponse
+    from .types.pubsub import PubsubMessage
+    from .types.pubsub import PullRequest
+    from .types.pubsub import PullResponse
+    from .types.pubsub import PushConfig
+    from .types.pubsub import ReceivedMessage
+    from .types.pubsub import RetryPolicy
+    from .types.pubsub import SeekRequest
+    from .types.pubsub import SeekResponse
+    from .types.pubsub import Snapshot
+    from .types.pubsub import StreamingPullRequest
+    from .types.pubsub import StreamingPullResponse
+    from .types.pubsub import Subscription
+    from .types.pubsub import Topic
+    from .types.pubsub import UpdateSnapshotRequest
+    from .types.pubsub import UpdateSubscriptionRequest
+    from .types.pubsub import UpdateTopicRequest
+else:
+    def __getattr__(name):
+        try:
+            module_name = _LAZY_ATTRIBUTES[name]
+        except KeyError:
+            raise AttributeError(
+                'module {!r} has no attribute {!r}'.format(__name__, name)) from None
+        value = getattr(importlib.import_module(module_name, __name__), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 
 __all__ = (
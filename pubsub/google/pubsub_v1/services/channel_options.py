@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from typing import Any, List, Mapping, Sequence, Tuple, Union
+
+
+class ChannelOptions:
+    """HTTP/2 and message size settings for the gRPC channel.
+
+    Every setting defaults to ``None``, which leaves gRPC's own default in
+    place. Pass an instance as ``channel_options`` to a client or gRPC
+    transport, or as the ``channel_options`` key of a client's
+    ``client_options``.
+
+    Suggested settings for streaming pull behind a NAT or load balancer
+    that drops idle connections, with large pull responses:
+
+    .. code-block:: python
+
+        ChannelOptions(
+            keepalive_time_ms=30000,
+            keepalive_timeout_ms=10000,
+            initial_window_size=8 * 1024 * 1024,
+            max_receive_message_length=-1,
+        )
+
+    gRPC has no client-side limit on concurrent streams per connection; the
+    server advertises one. To spread many streams over several
+    connections, use :meth:`~.SharedChannel.create` with ``pool_size``.
+    """
+    # Setting name -> gRPC channel argument.
+    _ARGUMENTS = (
+        ('keepalive_time_ms', 'grpc.keepalive_time_ms'),
+        ('keepalive_timeout_ms', 'grpc.keepalive_timeout_ms'),
+        ('keepalive_permit_without_calls', 'grpc.keepalive_permit_without_calls'),
+        ('initial_window_size', 'grpc.http2.lookahead_bytes'),
+        ('max_send_message_length', 'grpc.max_send_message_length'),
+        ('max_receive_message_length', 'grpc.max_receive_message_length'),
+    )
+
+    def __init__(self, *,
+            keepalive_time_ms: int = None,
+            keepalive_timeout_ms: int = None,
+            keepalive_permit_without_calls: bool = None,
+            initial_window_size: int = None,
+            max_send_message_length: int = None,
+            max_receive_message_length: int = None,
+            extra: Sequence[Tuple[str, Any]] = ()):
+        """Instantiate the options.
+
+        Args:
+            keepalive_time_ms (Optional[int]): Send an HTTP/2 ping after the
+                connection has been idle for this long, keeping NAT and load
+                balancer mappings alive.
+            keepalive_timeout_ms (Optional[int]): Close the connection if a
+                ping is not acknowledged within this long.
+            keepalive_permit_without_calls (Optional[bool]): Keep pinging
+                while no RPC is active.
+            initial_window_size (Optional[int]): The initial HTTP/2
+                flow-control window of each stream, in bytes. Larger windows
+                let large responses arrive without waiting for window
+                updates.
+            max_send_message_length (Optional[int]): The largest request
+                the channel sends, in bytes; ``-1`` for no limit.
+            max_receive_message_length (Optional[int]): The largest
+                response the channel accepts, in bytes; ``-1`` for no limit.
+                gRPC's default is 4 MiB.
+            extra (Sequence[Tuple[str, Any]]): Any other gRPC channel
+                arguments, passed through unchanged.
+
+        Raises:
+            ValueError: If a duration or window size is not positive.
+        """
+        for name, value in (
+                ('keepalive_time_ms', keepalive_time_ms),
+                ('keepalive_timeout_ms', keepalive_timeout_ms),
+                ('initial_window_size', initial_window_size)):
+            if value is not None and value <= 0:
+                raise ValueError('{} must be a positive integer.'.format(name))
+        self.keepalive_time_ms = keepalive_time_ms
+        self.keepalive_timeout_ms = keepalive_timeout_ms
+        self.keepalive_permit_without_calls = keepalive_permit_without_calls
+        self.initial_window_size = initial_window_size
+        self.max_send_message_length = max_send_message_length
+        self.max_receive_message_length = max_receive_message_length
+        self.extra = tuple(extra)
+
+    @classmethod
+    def from_value(cls,
+            value: Union['ChannelOptions', Mapping[str, Any], None],
+            ) -> Union['ChannelOptions', None]:
+        """Accept an instance, a dict of its settings, or ``None``."""
+        if value is None or isinstance(value, cls):
+            return value
+        return cls(**value)
+
+    def to_grpc_options(self) -> List[Tuple[str, Any]]:
+        """Return the channel arguments for ``grpc_helpers.create_channel``."""
+        options = []
+        for name, argument in self._ARGUMENTS:
+            value = getattr(self, name)
+            if value is not None:
+                options.append((argument, int(value)))
+        if self.initial_window_size is not None:
+            # Otherwise gRPC resizes the window from its own estimate.
+            options.append(('grpc.http2.bdp_probe', 0))
+        options.extend(self.extra)
+        return options
+
+    def __repr__(self) -> str:
+        return '{0}({1})'.format(self.__class__.__name__, ', '.join(
+            '{}={!r}'.format(name, getattr(self, name))
+            for name, _ in self._ARGUMENTS
+            if getattr(self, name) is not None
+        ))
+
+
+__all__ = (
+    'ChannelOptions',
+)
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+from concurrent import futures
+import json
+import os
+import tempfile
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from google.protobuf import json_format  # type: ignore
+
+# The kinds of resource that can be listed, with the client that lists
+# them and the name of its asynchronous listing method.
+TOPICS = 'topics'
+SUBSCRIPTIONS = 'subscriptions'
+SNAPSHOTS = 'snapshots'
+_METHODS = {
+    TOPICS: ('publisher', 'list_topics_async'),
+    SUBSCRIPTIONS: ('subscriber', 'list_subscriptions_async'),
+    SNAPSHOTS: ('subscriber', 'list_snapshots_async'),
+}
+
+# Marks the end of one listing on the results queue.
+_DONE = object()
+
+# The fields kept in an :class:`Inventory` index, per kind. A change to any
+# of them is reported; other fields are ignored.
+INDEXED_FIELDS = {
+    TOPICS: ('labels', 'message_storage_policy', 'kms_key_name'),
+    SUBSCRIPTIONS: (
+        'topic', 'push_config', 'ack_deadline_seconds', 'retain_acked_messages',
+        'message_retention_duration', 'labels', 'enable_message_ordering',
+        'expiration_policy', 'filter', 'dead_letter_policy', 'retry_policy',
+    ),
+    SNAPSHOTS: ('topic', 'expire_time', 'labels'),
+}
+
+# The version of the on-disk index format.
+_FORMAT_VERSION = 1
+
+
+def _project_path(project: str) -> str:
+    return project if project.startswith('projects/') else 'projects/' + project
+
+
+async def list_resources(
+        projects: Iterable[str],
+        *,
+        publisher=None,
+        subscriber=None,
+        kinds: Sequence[str] = None,
+        max_concurrency: int = 16,
+        return_exceptions: bool = False,
+        ) -> AsyncIterator[Tuple[str, str, Any]]:
+    """List topics, subscriptions and snapshots across many projects.
+
+    Every (project, kind) listing runs as its own task, at most
+    ``max_concurrency`` at a time, and resources are yielded as soon as
+    their page arrives, in no particular order across listings.
+
+    .. code-block:: python
+
+        async for project, kind, resource in list_resources(
+                projects, publisher=publisher, subscriber=subscriber,
+                max_concurrency=32):
+            ...
+
+    Args:
+        projects (Iterable[str]): The projects, as IDs or as
+            ``projects/{project}`` names.
+        publisher (Optional[~.PublisherClient]): The client that lists
+            topics.
+        subscriber (Optional[~.SubscriberClient]): The client that lists
+            subscriptions and snapshots.
+        kinds (Optional[Sequence[str]]): Which of ``topics``,
+            ``subscriptions`` and ``snapshots`` to list. Defaults to every
+            kind a client was given for.
+        max_concurrency (int): The most listings in flight at once. Pages
+            are fetched on a thread pool of this size.
+        return_exceptions (bool): If set, a failed listing yields its
+            exception in place of a resource and the others carry on. If
+            not, the first failure cancels the rest and is raised.
+
+    Yields:
+        Tuple[str, str, Any]: The ``projects/{project}`` name, the kind,
+            and the resource (a :class:`~.pubsub.Topic`,
+            :class:`~.pubsub.Subscription` or :class:`~.pubsub.Snapshot`).
+    """
+    if max_concurrency < 1:
+        raise ValueError('max_concurrency must be a positive integer.')
+    clients = {'publisher': publisher, 'subscriber': subscriber}
+    if kinds is None:
+        kinds = [kind for kind, (client, _) in _METHODS.items() if clients[client] is not None]
+    for kind in kinds:
+        if kind not in _METHODS:
+            raise ValueError('Unknown resource kind: {!r}'.format(kind))
+        if clients[_METHODS[kind][0]] is None:
+            raise ValueError('Listing {} requires a {} client.'.format(kind, _METHODS[kind][0]))
+
+    executor = futures.ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix='Thread-PubsubInventory')
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # Bounded, so that slow consumers hold the listings back.
+    results = asyncio.Queue(maxsize=max_concurrency * 100)  # type: asyncio.Queue
+
+    async def produce(project: str, kind: str) -> None:
+        client, method = _METHODS[kind]
+        try:
+            async with semaphore:
+                pager = await getattr(clients[client], method)(
+                    project=project, executor=executor)
+                async for resource in pager:
+                    await results.put((project, kind, resource))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            await results.put((project, kind, exc))
+        await results.put(_DONE)
+
+    tasks = [
+        asyncio.ensure_future(produce(_project_path(project), kind))
+        for project in projects
+        for kind in kinds
+    ]  # type: List[asyncio.Future]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            item = await results.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            if isinstance(item[2], Exception) and not return_exceptions:
+                raise item[2]
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False)
+
+
+class Change:
+    """A resource added, removed or changed between two listings.
+
+    Attributes:
+        type (str): ``added``, ``removed`` or ``changed``.
+        kind (str): ``topics``, ``subscriptions`` or ``snapshots``.
+        name (str): The resource name.
+        old (Optional[Dict[str, Any]]): The indexed fields before, or
+            ``None`` if the resource was added.
+        new (Optional[Dict[str, Any]]): The indexed fields after, or
+            ``None`` if the resource was removed.
+    """
+    ADDED = 'added'
+    REMOVED = 'removed'
+    CHANGED = 'changed'
+
+    __slots__ = ('type', 'kind', 'name', 'old', 'new')
+
+    def __init__(self, type, kind, name, old, new):
+        self.type = type
+        self.kind = kind
+        self.name = name
+        self.old = old
+        self.new = new
+
+    @property
+    def changed_fields(self) -> List[str]:
+        """The indexed fields whose value differs, sorted."""
+        old, new = self.old or {}, self.new or {}
+        return sorted(f for f in set(old) | set(new) if old.get(f) != new.get(f))
+
+    def __repr__(self) -> str:
+        return 'Change({!r}, {!r})'.format(self.type, self.name)
+
+
+def _project_of(name: str) -> str:
+    return '/'.join(name.split('/', 2)[:2])
+
+
+def _index_fields(kind: str, resource: Any) -> Dict[str, Any]:
+    # Fields at their default value are omitted, which keeps the index
+    # small and makes it independent of fields added to the API later.
+    fields = json_format.MessageToDict(
+        type(resource).pb(resource), preserving_proto_field_name=True)
+    return {f: fields[f] for f in INDEXED_FIELDS[kind] if f in fields}
+
+
+class Inventory:
+    """A local index of topics, subscriptions and snapshots.
+
+    The index keeps, for every resource, its kind and the
+    :data:`INDEXED_FIELDS` of that kind, as JSON values. :meth:`refresh`
+    re-lists projects concurrently with :func:`list_resources` and returns
+    only what was added, removed or changed since the previous refresh.
+
+    A resource is only reported removed if its project and kind were
+    listed successfully; a listing that fails leaves that part of the index
+    as it was, and is reported in :attr:`failures`. Resources of projects
+    not passed to a refresh are left untouched.
+
+    The index can be saved to disk and loaded again, so that a restarted
+    poller reports changes relative to its last run.
+
+    .. code-block:: python
+
+        inventory = Inventory.load(path, publisher=publisher, subscriber=subscriber)
+        while True:
+            for change in inventory.refresh(projects):
+                handle(change)
+            inventory.save(path)
+            time.sleep(300)
+    """
+    def __init__(self,
+            publisher=None,
+            subscriber=None,
+            *,
+            kinds: Sequence[str] = None,
+            max_concurrency: int = 16):
+        """Instantiate an empty inventory.
+
+        Args:
+            publisher (Optional[~.PublisherClient]): The client that lists
+                topics.
+            subscriber (Optional[~.SubscriberClient]): The client that
+                lists subscriptions and snapshots.
+            kinds (Optional[Sequence[str]]): The kinds to index. Defaults
+                to every kind a client was given for.
+            max_concurrency (int): The most listings in flight at once.
+        """
+        self._publisher = publisher
+        self._subscriber = subscriber
+        if kinds is None:
+            clients = {'publisher': publisher, 'subscriber': subscriber}
+            kinds = [kind for kind, (client, _) in _METHODS.items() if clients[client] is not None]
+        self.kinds = tuple(kinds)
+        self.max_concurrency = max_concurrency
+        self._resources = {}  # type: Dict[str, Tuple[str, Dict[str, Any]]]
+        self.failures = []  # type: List[Tuple[str, str, Exception]]
+
+    def __len__(self) -> int:
+        return len(self._resources)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._resources
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the indexed fields of a resource, or ``None``."""
+        entry = self._resources.get(name)
+        return None if entry is None else entry[1]
+
+    def names(self, kind: str = None) -> Iterator[str]:
+        """Iterate over the indexed resource names, of one kind or all."""
+        for name, (resource_kind, _) in self._resources.items():
+            if kind is None or kind == resource_kind:
+                yield name
+
+    async def refresh_async(self, projects: Iterable[str]) -> List[Change]:
+        """Re-list ``projects`` and update the index.
+
+        Args:
+            projects (Iterable[str]): The projects, as IDs or as
+                ``projects/{project}`` names.
+
+        Returns:
+            List[~.Change]: What was added, removed or changed.
+        """
+        projects = [_project_path(project) for project in projects]
+        listed = {}  # type: Dict[str, Tuple[str, Dict[str, Any]]]
+        failed = set()  # type: Set[Tuple[str, str]]
+        self.failures = []
+        async for project, kind, resource in list_resources(
+                projects,
+                publisher=self._publisher,
+                subscriber=self._subscriber,
+                kinds=self.kinds,
+                max_concurrency=self.max_concurrency,
+                return_exceptions=True):
+            if isinstance(resource, Exception):
+                failed.add((project, kind))
+                self.failures.append((project, kind, resource))
+            else:
+                listed[resource.name] = (kind, _index_fields(kind, resource))
+
+        changes = []  # type: List[Change]
+        for name, (kind, fields) in listed.items():
+            previous = self._resources.get(name)
+            if previous is None:
+                changes.append(Change(Change.ADDED, kind, name, None, fields))
+            elif previous[1] != fields:
+                changes.append(Change(Change.CHANGED, kind, name, previous[1], fields))
+            self._resources[name] = (kind, fields)
+
+        scope = set(projects)
+        for name, (kind, fields) in list(self._resources.items()):
+            if name in listed or kind not in self.kinds:
+                continue
+            project = _project_of(name)
+            if project in scope and (project, kind) not in failed:
+                del self._resources[name]
+                changes.append(Change(Change.REMOVED, kind, name, fields, None))
+        return changes
+
+    def refresh(self, projects: Iterable[str]) -> List[Change]:
+        """Run :meth:`refresh_async` on a new event loop."""
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.refresh_async(projects))
+        finally:
+            loop.close()
+
+    def save(self, path: str) -> None:
+        """Write the index to ``path``, atomically replacing any file there."""
+        data = {
+            'version': _FORMAT_VERSION,
+            'resources': {
+                name: {'kind': kind, 'fields': fields}
+                for name, (kind, fields) in self._resources.items()
+            },
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.inventory-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, separators=(',', ':'), sort_keys=True)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, *args, **kwargs) -> 'Inventory':
+        """Create an inventory from an index saved by :meth:`save`.
+
+        A missing file gives an empty inventory, so that the first run
+        reports every resource as added.
+
+        Args:
+            path (str): The file to read.
+            args, kwargs: Arguments passed to the constructor.
+
+        Raises:
+            ValueError: If the file was written by an incompatible version.
+        """
+        inventory = cls(*args, **kwargs)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return inventory
+        if data.get('version') != _FORMAT_VERSION:
+            raise ValueError('Unsupported inventory format: {!r}'.format(data.get('version')))
+        inventory._resources = {
+            name: (entry['kind'], entry['fields'])
+            for name, entry in data['resources'].items()
+        }
+        return inventory
+
+
+__all__ = (
+    'Change',
+    'INDEXED_FIELDS',
+    'Inventory',
+    'SNAPSHOTS',
+    'SUBSCRIPTIONS',
+    'TOPICS',
+    'list_resources',
+)
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import abc
+import bisect
+import collections
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+
+import grpc  # type: ignore
+
+from google.api_core import gapic_v1  # type: ignore
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# The client call running on each thread, see :func:`wrap_method`.
+_current = threading.local()
+
+
+class ExponentialHistogram:
+    """A histogram with exponentially growing buckets.
+
+    Bucket upper bounds start at ``min_value`` and grow by ``factor``
+    until ``max_value``; samples above it fall in a final overflow bucket.
+    The default bounds cover 100 microseconds to about 14 minutes, with
+    relative error under 20% for any percentile.
+    """
+    def __init__(self,
+            min_value: float = 0.0001,
+            max_value: float = 1000.0,
+            factor: float = 1.2):
+        """Instantiate the histogram.
+
+        Args:
+            min_value (float): The upper bound of the first bucket.
+            max_value (float): The largest bucket upper bound.
+            factor (float): The ratio between consecutive bounds.
+        """
+        if min_value <= 0 or max_value < min_value or factor <= 1:
+            raise ValueError(
+                'Bounds must satisfy 0 < min_value <= max_value and factor > 1.')
+        bounds = [min_value]
+        while bounds[-1] < max_value:
+            bounds.append(bounds[-1] * factor)
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._total = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._total
+
+    def add(self, value: float) -> None:
+        """Record one sample."""
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._total if self._total else 0.0
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+    def percentile(self, percent: float) -> float:
+        """Return the upper bound of the bucket holding the percentile.
+
+        Returns ``0.0`` if no samples were recorded; samples in the
+        overflow bucket are reported as the largest sample seen.
+        """
+        with self._lock:
+            if not self._total:
+                return 0.0
+            target = self._total * percent / 100.0
+            seen = 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= target and count:
+                    if index == len(self._bounds):
+                        return self._max
+                    return min(self._bounds[index], self._max)
+            return self._max
+
+    def summary(self) -> Dict[str, float]:
+        """Return the count, mean, max and common percentiles."""
+        return {
+            'count': self._total,
+            'mean': self.mean,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self._max,
+        }
+
+
+class CallRecord:
+    """The outcome of one attempt of one RPC.
+
+    Attributes:
+        method (str): The full method name, such as
+            ``/google.pubsub.v1.Publisher/Publish``.
+        latency (float): Seconds from the call to its completion. For a
+            stream, its whole lifetime.
+        request_bytes (int): The serialized size of the request, or of
+            all requests sent on a stream.
+        response_bytes (int): The serialized size of the response, or of
+            all responses received on a stream.
+        code (grpc.StatusCode): The final status.
+        retry (bool): Whether the attempt retried an earlier attempt of
+            the same client call.
+    """
+    __slots__ = ('method', 'latency', 'request_bytes', 'response_bytes', 'code', 'retry')
+
+    def __init__(self, method, latency, request_bytes, response_bytes, code, retry):
+        self.method = method
+        self.latency = latency
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+        self.code = code
+        self.retry = retry
+
+    def __repr__(self) -> str:
+        return 'CallRecord({})'.format(', '.join(
+            '{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__))
+
+
+class MetricsSink(metaclass=abc.ABCMeta):
+    """Receives a :class:`CallRecord` for every RPC attempt.
+
+    Subclass it to forward records to a monitoring system. :meth:`record`
+    runs on gRPC's threads as calls complete, so it should be quick and
+    must not block.
+    """
+    @abc.abstractmethod
+    def record(self, record: CallRecord) -> None:
+        raise NotImplementedError
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """Aggregate records per method in memory.
+
+    .. code-block:: python
+
+        sink = InMemoryMetricsSink()
+        client = PublisherClient(metrics_sink=sink)
+        ...
+        print(sink.snapshot()['/google.pubsub.v1.Publisher/Publish'])
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._methods = {}  # type: Dict[str, Dict[str, Any]]
+
+    def _method(self, method: str) -> Dict[str, Any]:
+        stats = self._methods.get(method)
+        if stats is None:
+            stats = self._methods[method] = {
+                'calls': 0,
+                'retries': 0,
+                'codes': collections.Counter(),
+                'request_bytes': 0,
+                'response_bytes': 0,
+                'latency': ExponentialHistogram(),
+                'request_size': ExponentialHistogram(min_value=16, max_value=1 << 30, factor=2),
+            }
+        return stats
+
+    def record(self, record: CallRecord) -> None:
+        with self._lock:
+            stats = self._method(record.method)
+            stats['calls'] += 1
+            stats['retries'] += record.retry
+            stats['codes'][record.code.name] += 1
+            stats['request_bytes'] += record.request_bytes
+            stats['response_bytes'] += record.response_bytes
+        stats['latency'].add(record.latency)
+        stats['request_size'].add(record.request_bytes)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the aggregates so far, keyed by method name."""
+        with self._lock:
+            return {
+                method: {
+                    'calls': stats['calls'],
+                    'retries': stats['retries'],
+                    'codes': dict(stats['codes']),
+                    'request_bytes': stats['request_bytes'],
+                    'response_bytes': stats['response_bytes'],
+                    'latency': stats['latency'].summary(),
+                    'request_size': stats['request_size'].summary(),
+                }
+                for method, stats in self._methods.items()
+            }
+
+
+def _byte_size(message: Any) -> int:
+    # proto-plus messages wrap a protobuf message reachable through their
+    # class; raw protobuf messages report their size directly, and
+    # requests encoded ahead of time are bytes.
+    if isinstance(message, bytes):
+        return len(message)
+    pb = getattr(type(message), 'pb', None)
+    try:
+        if pb is not None:
+            return pb(message).ByteSize()
+        return message.ByteSize()
+    except Exception:
+        return 0
+
+
+class _CountingStream:
+    """Wrap a response stream, counting the bytes it yields."""
+    def __init__(self, call, on_response: Callable[[Any], None]):
+        self._call = call
+        self._on_response = on_response
+
+    def __iter__(self) -> '_CountingStream':
+        return self
+
+    def __next__(self) -> Any:
+        response = next(self._call)
+        self._on_response(response)
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._call, name)
+
+
+class MetricsInterceptor(grpc.UnaryUnaryClientInterceptor,
+                         grpc.StreamStreamClientInterceptor):
+    """Report every unary and bidirectional streaming call to a sink.
+
+    The Pub/Sub API only has these two kinds of method. The interceptor is
+    only installed when a sink is configured; without one, calls go
+    straight to the channel.
+
+    Retries are made by the caller, above the channel. Client methods run
+    their retry loop inside :func:`wrap_method`, which opens a scope for
+    the call; every attempt of a method after the first in that scope is
+    flagged as a retry. Calls made on the transport directly are never
+    flagged.
+    """
+    def __init__(self, sink: MetricsSink):
+        self._sink = sink
+
+    @staticmethod
+    def _is_retry(method: str) -> bool:
+        attempted = getattr(_current, 'methods', None)  # type: Optional[Set[str]]
+        if attempted is None:
+            return False
+        retry = method in attempted
+        attempted.add(method)
+        return retry
+
+    def _report(self, *args) -> None:
+        try:
+            self._sink.record(CallRecord(*args))
+        except Exception as exc:
+            _LOGGER.warning('Metrics sink failed: %r', exc)
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        method = client_call_details.method
+        retry = self._is_retry(method)
+        request_bytes = _byte_size(request)
+        start = time.monotonic()
+        outcome = continuation(client_call_details, request)
+
+        def done(future):
+            code = future.code()
+            response_bytes = 0
+            if code == grpc.StatusCode.OK:
+                response_bytes = _byte_size(future.result())
+            self._report(method, time.monotonic() - start, request_bytes,
+                         response_bytes, code, retry)
+
+        outcome.add_done_callback(done)
+        return outcome
+
+    def intercept_stream_stream(self, continuation, client_call_details, request_iterator):
+        method = client_call_details.method
+        sizes = [0, 0]  # Request and response bytes.
+        start = time.monotonic()
+
+        def requests() -> Iterator[Any]:
+            for request in request_iterator:
+                sizes[0] += _byte_size(request)
+                yield request
+
+        def on_response(response: Any) -> None:
+            sizes[1] += _byte_size(response)
+
+        call = continuation(client_call_details, requests())
+
+        def done(call):
+            self._report(method, time.monotonic() - start, sizes[0], sizes[1],
+                         call.code(), False)
+
+        call.add_done_callback(done)
+        return _CountingStream(call, on_response)
+
+
+def wrap_method(func: Callable, *args, **kwargs) -> Callable:
+    """Wrap an RPC method like ``google.api_core.gapic_v1.method.wrap_method``.
+
+    Each call of the result also opens a scope in which the
+    :class:`MetricsInterceptor` counts the attempts of the call, so that
+    retries made by the ``retry`` argument are reported as retries.
+
+    Args:
+        func (Callable): The transport's RPC method.
+        args, kwargs: Passed to ``gapic_v1.method.wrap_method``.
+
+    Returns:
+        Callable: The wrapped method.
+    """
+    rpc = gapic_v1.method.wrap_method(func, *args, **kwargs)
+
+    @functools.wraps(rpc)
+    def call(*call_args, **call_kwargs):
+        outer = getattr(_current, 'methods', None)
+        _current.methods = set()
+        try:
+            return rpc(*call_args, **call_kwargs)
+        finally:
+            _current.methods = outer
+    return call
+
+
+def method_wrapper(sink: Optional[MetricsSink]) -> Callable:
+    """Return :func:`wrap_method` if ``sink`` is set.
+
+    Without a sink nothing counts attempts, so RPC methods are wrapped by
+    ``gapic_v1.method.wrap_method`` alone and calls do not pay for a scope.
+    """
+    if sink is None:
+        return gapic_v1.method.wrap_method
+    return wrap_method
+
+
+def instrument(channel: grpc.Channel, sink: Optional[MetricsSink]) -> grpc.Channel:
+    """Return ``channel`` reporting to ``sink``, or unchanged if it is None."""
+    if sink is None:
+        return channel
+    return grpc.intercept_channel(channel, MetricsInterceptor(sink))
+
+
+__all__ = (
+    'CallRecord',
+    'InMemoryMetricsSink',
+    'ExponentialHistogram',
+    'MetricsInterceptor',
+    'MetricsSink',
+    'instrument',
+    'method_wrapper',
+    'wrap_method',
+)
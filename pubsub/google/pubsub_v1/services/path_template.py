@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import functools
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+_VARIABLE_RE = re.compile(r'\{(\w+)\}')
+
+
+class PathTemplate:
+    """A resource name template such as ``projects/{project}/topics/{topic}``.
+
+    The template is compiled once into a format string and an anchored
+    regular expression. Both directions are memoized in LRU caches, so
+    building or parsing a name the process has seen recently is a single
+    dictionary lookup. Formatted names are interned, so every caller
+    building the same name shares one string object, and comparing or
+    hashing it (as routing tables do) is cheap.
+
+    Each variable matches one or more characters, including ``/``, exactly
+    as the generated ``parse_*_path`` methods always have.
+    """
+    def __init__(self, template: str, cache_size: int = 4096):
+        """Compile the template.
+
+        Args:
+            template (str): The template, with variables in braces.
+            cache_size (int): The number of recently formatted and parsed
+                names remembered in each direction.
+        """
+        self.template = template
+        self.variables = tuple(_VARIABLE_RE.findall(template))
+        self._regex = re.compile('^{}$'.format(''.join(
+            '(?P<{}>.+?)'.format(part) if index % 2 else re.escape(part)
+            for index, part in enumerate(_VARIABLE_RE.split(template))
+        )))
+        self._format_cached = functools.lru_cache(maxsize=cache_size)(self._format)
+        self._parse_cached = functools.lru_cache(maxsize=cache_size)(self._parse)
+
+    def __repr__(self) -> str:
+        return '{0}<{1!r}>'.format(self.__class__.__name__, self.template)
+
+    def _format(self, values: Tuple[Any, ...]) -> str:
+        return sys.intern(self.template.format(
+            **dict(zip(self.variables, values))))
+
+    def _parse(self, path: str) -> Optional[Tuple[str, ...]]:
+        match = self._regex.match(path)
+        return match.groups() if match else None
+
+    def _segments(self, path: str, values: Optional[Tuple[str, ...]]) -> Dict[str, str]:
+        if values is None:
+            if not self.variables:
+                # An empty dict would also be the result of a match.
+                raise ValueError('{!r} is not {!r}.'.format(path, self.template))
+            return {}
+        return dict(zip(self.variables, values))
+
+    def format(self, **kwargs: Any) -> str:
+        """Build a resource name from its segments.
+
+        Raises:
+            KeyError: If a variable of the template is missing.
+        """
+        values = tuple(kwargs[name] for name in self.variables)
+        try:
+            return self._format_cached(values)
+        except TypeError:
+            # An unhashable segment value; format it without the cache.
+            return self._format(values)
+
+    def parse(self, path: str) -> Dict[str, str]:
+        """Split a resource name into its segments.
+
+        Returns:
+            Dict[str, str]: The segments by variable name, or an empty
+                dict if ``path`` does not match the template.
+
+        Raises:
+            ValueError: If the template has no variables and ``path`` is
+                not the template itself.
+        """
+        return self._segments(path, self._parse_cached(path))
+
+    def format_many(self, segments: Iterable[Mapping[str, Any]]) -> List[str]:
+        """Build a resource name for each mapping of segments.
+
+        Raises:
+            KeyError: If a mapping lacks a variable of the template.
+        """
+        variables = self.variables
+        cached = self._format_cached
+        results = []
+        for index, mapping in enumerate(segments):
+            try:
+                values = tuple(mapping[name] for name in variables)
+            except KeyError as exc:
+                raise KeyError('Segments {} lack the variable {}.'.format(
+                    index, exc)) from exc
+            try:
+                results.append(cached(values))
+            except TypeError:
+                # An unhashable segment value; format it without the cache.
+                results.append(self._format(values))
+        return results
+
+    def parse_many(self, paths: Iterable[str]) -> List[Dict[str, str]]:
+        """Split each resource name into its segments.
+
+        Raises:
+            ValueError: As :meth:`parse` does.
+        """
+        cached = self._parse_cached
+        return [self._segments(path, cached(path)) for path in paths]
+
+    def matches(self, path: str) -> bool:
+        """Return whether ``path`` is a name of this template."""
+        return self._parse_cached(path) is not None
+
+    def cache_info(self) -> Dict[str, Any]:
+        """Return the ``lru_cache`` statistics of both directions."""
+        return {
+            'format': self._format_cached.cache_info(),
+            'parse': self._parse_cached.cache_info(),
+        }
+
+    def cache_clear(self) -> None:
+        self._format_cached.cache_clear()
+        self._parse_cached.cache_clear()
+
+
+__all__ = (
+    'PathTemplate',
+)
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import functools
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, IO, Optional, Tuple
+
+import grpc  # type: ignore
+
+from google.pubsub_v1.services.metrics import ExponentialHistogram
+
+# The CPU time of the calling thread, where available (Python 3.7+).
+_cpu_time = getattr(time, 'thread_time', time.process_time)
+
+# The stages a client call is broken into, in pipeline order.
+CONSTRUCTION = 'construction'
+SERIALIZATION = 'serialization'
+RPC = 'rpc'
+DESERIALIZATION = 'deserialization'
+CALLBACK = 'callback'
+STAGES = (CONSTRUCTION, SERIALIZATION, RPC, DESERIALIZATION, CALLBACK)
+
+
+class _Stage:
+    """The wall and CPU time of one stage of one method."""
+    def __init__(self):
+        self.wall = ExponentialHistogram(min_value=1e-6)
+        self.cpu_total = 0.0
+
+    def add(self, wall: float, cpu: float) -> None:
+        self.wall.add(wall)
+        self.cpu_total += cpu
+
+
+class _Call:
+    """The time spent so far in the stages of one sampled call."""
+    __slots__ = ('method', 'wall', 'cpu', 'lock')
+
+    def __init__(self, method: str):
+        self.method = method
+        self.lock = threading.Lock()
+        self.wall = dict.fromkeys((SERIALIZATION, RPC, DESERIALIZATION), 0.0)
+        self.cpu = dict.fromkeys((SERIALIZATION, RPC, DESERIALIZATION), 0.0)
+
+
+class Profiler:
+    """Attribute the time of client calls to pipeline stages.
+
+    For every sampled call the wall and CPU time of the calling thread are
+    split into:
+
+    * ``construction``: everything before the request reaches the
+      channel, such as coercing arguments into proto-plus messages and
+      wrapping the method with retry and timeout handling.
+    * ``serialization``: encoding the request.
+    * ``rpc``: the channel's own time, including waiting for the
+      network, the server and access tokens.
+    * ``deserialization``: decoding the response.
+    * ``callback``: a subscriber's message handler.
+
+    Calls that are not sampled cost one random draw; the channel stages
+    are only measured when the client is created with the profiler, so a
+    provided transport only reports ``construction`` and ``callback``.
+    Work a call hands to other threads, such as the requests of a split
+    publish, is attributed to the call through :meth:`bind`; the channel
+    stages then add up the time of every request and can exceed the
+    call's own wall time, leaving no ``construction`` time.
+
+    .. code-block:: python
+
+        profiler = Profiler(sample_rate=0.01)
+        client = PublisherClient(profiler=profiler)
+        ...
+        print(profiler.report())
+    """
+    def __init__(self, sample_rate: float = 1.0):
+        """Instantiate the profiler.
+
+        Args:
+            sample_rate (float): The probability, from 0 to 1, that a call
+                or a message is profiled.
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError('sample_rate must be between 0 and 1.')
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._calls = {}  # type: Dict[str, int]
+        self._stages = {}  # type: Dict[Tuple[str, str], _Stage]
+        self._current = threading.local()
+
+    def _sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def _add(self, method: str, stage: str, wall: float, cpu: float) -> None:
+        key = (method, stage)
+        with self._lock:
+            entry = self._stages.get(key)
+            if entry is None:
+                entry = self._stages[key] = _Stage()
+            entry.add(wall, cpu)
+
+    def wrap_method(self, method: str, func: Callable) -> Callable:
+        """Profile calls to a client method.
+
+        Args:
+            method (str): The name to report the calls under.
+            func (Callable): The bound client method.
+
+        Returns:
+            Callable: A function that behaves like ``func``.
+        """
+        @functools.wraps(func)
+        def profiled(*args, **kwargs):
+            if not self._sampled() or getattr(self._current, 'call', None) is not None:
+                return func(*args, **kwargs)
+            call = self._current.call = _Call(method)
+            wall, cpu = time.perf_counter(), _cpu_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                wall, cpu = time.perf_counter() - wall, _cpu_time() - cpu
+                self._current.call = None
+                self._finish(call, wall, cpu)
+        return profiled
+
+    def bind(self, func: Callable) -> Callable:
+        """Attribute calls of ``func`` on other threads to the current call.
+
+        Args:
+            func (Callable): A function the profiled call runs on other
+                threads.
+
+        Returns:
+            Callable: ``func``, reporting to the calling thread's profiled
+                call, or ``func`` itself if the thread is not in one.
+        """
+        call = getattr(self._current, 'call', None)
+        if call is None:
+            return func
+
+        @functools.wraps(func)
+        def bound(*args, **kwargs):
+            outer = getattr(self._current, 'call', None)
+            self._current.call = call
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._current.call = outer
+        return bound
+
+    def _finish(self, call: _Call, wall: float, cpu: float) -> None:
+        # The channel's time includes encoding and decoding, which are
+        # measured separately; what precedes the channel is construction.
+        channel_wall = call.wall[RPC]
+        channel_cpu = call.cpu[RPC]
+        for stage in (SERIALIZATION, DESERIALIZATION):
+            call.wall[RPC] -= call.wall[stage]
+            call.cpu[RPC] -= call.cpu[stage]
+        with self._lock:
+            self._calls[call.method] = self._calls.get(call.method, 0) + 1
+        self._add(call.method, CONSTRUCTION,
+                  max(wall - channel_wall, 0.0), max(cpu - channel_cpu, 0.0))
+        for stage in (SERIALIZATION, RPC, DESERIALIZATION):
+            self._add(call.method, stage,
+                      max(call.wall[stage], 0.0), max(call.cpu[stage], 0.0))
+
+    def instrument_client(self, client: Any, transport_class: type) -> None:
+        """Profile every RPC method of a client.
+
+        Args:
+            client (Any): The client to instrument.
+            transport_class (type): The client's abstract transport, whose
+                properties name the RPC methods.
+        """
+        for name, value in vars(transport_class).items():
+            if isinstance(value, property) and hasattr(client, name):
+                setattr(client, name, self.wrap_method(name, getattr(client, name)))
+
+    def wrap_callback(self, callback: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        """Profile a subscriber's message handler."""
+        @functools.wraps(callback)
+        def profiled(message):
+            if not self._sampled():
+                return callback(message)
+            wall, cpu = time.perf_counter(), _cpu_time()
+            try:
+                return callback(message)
+            finally:
+                self._add('subscribe', CALLBACK,
+                          time.perf_counter() - wall, _cpu_time() - cpu)
+        return profiled
+
+    def _timed(self, stage: str, func: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            call = getattr(self._current, 'call', None)
+            if call is None:
+                return func(*args, **kwargs)
+            wall, cpu = time.perf_counter(), _cpu_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                wall, cpu = time.perf_counter() - wall, _cpu_time() - cpu
+                with call.lock:
+                    call.wall[stage] += wall
+                    call.cpu[stage] += cpu
+        return timed
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the calls profiled so far and their stages.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Keyed by method name, the number of
+                profiled ``calls`` and, for each stage, the wall time
+                summary in seconds and the ``cpu_total`` in seconds.
+        """
+        with self._lock:
+            stages = list(self._stages.items())
+            calls = dict(self._calls)
+        result = {}  # type: Dict[str, Dict[str, Any]]
+        for (method, stage), entry in stages:
+            summary = entry.wall.summary()
+            summary['wall_total'] = summary['mean'] * summary['count']
+            summary['cpu_total'] = entry.cpu_total
+            result.setdefault(method, {'calls': calls.get(method, 0), 'stages': {}})
+            result[method]['stages'][stage] = summary
+        return result
+
+    def report(self) -> str:
+        """Return a table of the time spent in each stage of each method."""
+        lines = ['{:<28} {:<16} {:>8} {:>10} {:>10} {:>10} {:>10} {:>6}'.format(
+            'method', 'stage', 'count', 'mean ms', 'p99 ms', 'total ms', 'cpu ms', 'share')]
+        for method, entry in sorted(self.snapshot().items()):
+            total = sum(s['wall_total'] for s in entry['stages'].values()) or 1.0
+            for stage in STAGES:
+                summary = entry['stages'].get(stage)
+                if summary is None:
+                    continue
+                lines.append(
+                    '{:<28} {:<16} {:>8} {:>10.3f} {:>10.3f} {:>10.1f} {:>10.1f} {:>5.0%}'.format(
+                        method, stage, summary['count'], summary['mean'] * 1000,
+                        summary['p99'] * 1000, summary['wall_total'] * 1000,
+                        summary['cpu_total'] * 1000, summary['wall_total'] / total))
+        return '\n'.join(lines)
+
+    def dump(self, file: IO[str], format: str = 'text') -> None:
+        """Write the report to a file.
+
+        Args:
+            file (IO[str]): The file to write to.
+            format (str): ``text`` for :meth:`report`, or ``json`` for
+                :meth:`snapshot`.
+        """
+        if format == 'json':
+            json.dump(self.snapshot(), file, indent=2, sort_keys=True)
+        elif format == 'text':
+            file.write(self.report())
+        else:
+            raise ValueError('Unknown report format: {!r}'.format(format))
+        file.write('\n')
+
+
+class _ProfiledMultiCallable:
+    """Time a unary method of a channel."""
+    def __init__(self, callable_, profiler: Profiler):
+        self._callable = callable_
+        self._timed = profiler._timed(RPC, callable_)
+
+    def __call__(self, *args, **kwargs):
+        return self._timed(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._callable, name)
+
+
+class _ProfiledChannel:
+    """A channel whose serializers and unary calls report to a profiler."""
+    def __init__(self, channel: grpc.Channel, profiler: Profiler):
+        self._channel = channel
+        self._profiler = profiler
+
+    def _wrap_codecs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        for name, stage in (('request_serializer', SERIALIZATION),
+                            ('response_deserializer', DESERIALIZATION)):
+            if kwargs.get(name) is not None:
+                kwargs[name] = self._profiler._timed(stage, kwargs[name])
+        return kwargs
+
+    def unary_unary(self, method, **kwargs):
+        return _ProfiledMultiCallable(
+            self._channel.unary_unary(method, **self._wrap_codecs(kwargs)),
+            self._profiler)
+
+    def stream_stream(self, method, **kwargs):
+        return self._channel.stream_stream(method, **self._wrap_codecs(kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._channel, name)
+
+
+def instrument(channel: grpc.Channel, profiler: Optional[Profiler]) -> grpc.Channel:
+    """Return ``channel`` reporting to ``profiler``, or unchanged if it is None."""
+    if profiler is None:
+        return channel
+    return _ProfiledChannel(channel, profiler)
+
+
+__all__ = (
+    'CALLBACK',
+    'CONSTRUCTION',
+    'DESERIALIZATION',
+    'Profiler',
+    'RPC',
+    'SERIALIZATION',
+    'STAGES',
+    'instrument',
+)
@@ -16,6 +16,10 @@
 #
 
 from collections import OrderedDict
+import asyncio
+from concurrent import futures
+import functools
+import itertools
 import re
 from typing import Callable, Dict, Sequence, Tuple, Type, Union
 import pkg_resources
@@ -27,7 +31,15 @@ from google.api_core import retry as retries           # type: ignore
 from google.auth import credentials                    # type: ignore
 from google.oauth2 import service_account              # type: ignore
 
+from google.pubsub_v1.services.channel_options import ChannelOptions
+from google.pubsub_v1.services import tracing
+from google.pubsub_v1.services import metrics
+from google.pubsub_v1.services.metrics import MetricsSink
+from google.pubsub_v1.services.path_template import PathTemplate
+from google.pubsub_v1.services.profiling import Profiler
 from google.pubsub_v1.services.publisher import pagers
+from google.pubsub_v1.services.publisher import splitting
+from google.pubsub_v1.services.publisher import templates
 from google.pubsub_v1.types import pubsub
 
 from .transports.base import PublisherTransport
@@ -125,21 +137,28 @@ class PublisherClient(metaclass=PublisherClientMeta):
 
     from_service_account_json = from_service_account_file
 
+    topic_path_template = PathTemplate("projects/{project}/topics/{topic}")
+
     @staticmethod
     def topic_path(project: str,topic: str,) -> str:
         """Return a fully-qualified topic string."""
-        return "projects/{project}/topics/{topic}".format(project=project, topic=topic, )
+        return PublisherClient.topic_path_template.format(project=project, topic=topic, )
 
     @staticmethod
     def parse_topic_path(path: str) -> Dict[str,str]:
         """Parse a topic path into its component segments."""
-        m = re.match(r"^projects/(?P<project>.+?)/topics/(?P<topic>.+?)$", path)
-        return m.groupdict() if m else {}
+        return PublisherClient.topic_path_template.parse(path)
 
     def __init__(self, *,
             credentials: credentials.Credentials = None,
             transport: Union[str, PublisherTransport] = None,
             client_options: ClientOptions = None,
+            channel_options: ChannelOptions = None,
+            lazy: bool = False,
+            metrics_sink: MetricsSink = None,
+            profiler: Profiler = None,
+            background_token_refresh: bool = False,
+            tracer: tracing.Tracer = None,
             ) -> None:
         """Instantiate the publisher client.
 
@@ -160,13 +179,56 @@ class PublisherClient(metaclass=PublisherClientMeta):
                 is provided, mutual TLS transport will be created with the given
                 ``api_endpoint`` or the default mTLS endpoint, and the client
                 SSL credentials obtained from ``client_cert_source``.
+                (3) A ``channel_options`` key or attribute can be used in
+                place of the ``channel_options`` argument, but not with
+                it.
+            channel_options (Optional[~.ChannelOptions]): Keepalive, window
+                and message size settings for the gRPC channel, or a dict
+                of them. Ignored if a transport instance is provided.
+            lazy (bool): Defer looking up default credentials, loading the
+                client certificate and creating the channel until the first
+                RPC. Call :meth:`warm_up_in_background` to start on them
+                without blocking. Ignored if a transport instance is
+                provided.
+            metrics_sink (Optional[~.metrics.MetricsSink]): If set, the
+                latency, sizes, status and retries of every RPC are
+                reported to it. Ignored if a transport instance is provided.
+            profiler (Optional[~.profiling.Profiler]): If set, the wall
+                and CPU time of the calls it samples is broken down by
+                stage and reported to it. Only the time before the request
+                reaches the channel is measured if a transport instance is
+                provided.
+            background_token_refresh (bool): Fetch and refresh access
+                tokens on a background thread, ahead of expiry, so that
+                no RPC waits for a refresh. Clients given the same
+                credentials object share one token. Ignored if a
+                transport instance is provided.
+            tracer (Optional[~.tracing.Tracer]): If set, sampled calls to
+                :meth:`publish` are traced, and the trace context is added
+                to the attributes of the messages they send. Messages that
+                already carry a trace context keep it, and the call's span
+                continues that trace.
 
         Raises:
             google.auth.exceptions.MutualTlsChannelError: If mutual TLS transport
                 creation failed for any reason.
+            ValueError: If ``channel_options`` is given both as an argument
+                and in ``client_options``.
         """
         if isinstance(client_options, dict):
+            # ClientOptions rejects keys it does not know about.
+            client_options = dict(client_options)
+            options_channel_options = client_options.pop('channel_options', None)
             client_options = ClientOptions.from_dict(client_options)
+        else:
+            options_channel_options = getattr(client_options, 'channel_options', None)
+        if options_channel_options is not None:
+            if channel_options is not None:
+                raise ValueError('Provide channel_options either as an argument '
+                                 'or in client_options, not both.')
+            channel_options = options_channel_options
+        channel_options = ChannelOptions.from_value(channel_options)
+        self._tracer = tracer
 
         # Save or instantiate the transport.
         # Ordinarily, we provide the transport, but allowing a custom transport
@@ -184,7 +246,12 @@ class PublisherClient(metaclass=PublisherClientMeta):
             # Don't trigger mTLS if we get an empty ClientOptions.
             Transport = type(self).get_transport_class(transport)
             self._transport = Transport(
-                credentials=credentials, host=self.DEFAULT_ENDPOINT
+                credentials=credentials, host=self.DEFAULT_ENDPOINT,
+                channel_options=channel_options,
+                lazy=lazy,
+                metrics_sink=metrics_sink,
+                profiler=profiler,
+                background_token_refresh=background_token_refresh,
             )
         else:
             # We have a non-empty ClientOptions. If client_cert_source is
@@ -210,8 +277,69 @@ class PublisherClient(metaclass=PublisherClientMeta):
                 host=api_endpoint,
                 api_mtls_endpoint=api_mtls_endpoint,
                 client_cert_source=client_options.client_cert_source,
+                channel_options=channel_options,
+                lazy=lazy,
+                metrics_sink=metrics_sink,
+                profiler=profiler,
+                background_token_refresh=background_token_refresh,
             )
 
+        # RPC methods only open a scope for counting retries when the
+        # transport reports metrics.
+        self._wrap_method = metrics.method_wrapper(
+            getattr(self._transport, '_metrics_sink', None))
+        self._profiler = profiler
+        if profiler is not None:
+            profiler.instrument_client(self, PublisherTransport)
+
+    def wait_for_ready(self, timeout: float = None) -> bool:
+        """Wait until the client's connection to the service is established.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait, in
+                seconds. If not set, wait indefinitely.
+
+        Returns:
+            bool: Whether the connection was established within ``timeout``.
+        """
+        return self._transport.wait_for_ready(timeout)
+
+    def warm_up(self, timeout: float = None) -> bool:
+        """Connect and fetch an access token ahead of the first RPC.
+
+        Call this after start-up and before taking traffic, so that the
+        first request does not pay for DNS, TCP, TLS, HTTP/2 and token
+        setup.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait, in
+                seconds. If not set, wait indefinitely.
+
+        Returns:
+            bool: Whether the client was ready within ``timeout``.
+        """
+        return self._transport.warm_up(timeout)
+
+    def warm_up_in_background(self, timeout: float = None) -> None:
+        """Run :meth:`warm_up` on a background thread.
+
+        Useful with ``lazy``: the first RPC then finds the channel ready,
+        or waits for it rather than creating another.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait for the
+                connection, in seconds.
+        """
+        self._transport.warm_up_in_background(timeout)
+
+    def close(self) -> None:
+        """Release the client's transport and its channel.
+
+        A channel shared with other clients through a
+        :class:`~.SharedChannel` stays open until they are closed too.
+        """
+        self._transport.close()
+
     def create_topic(self,
             request: pubsub.Topic = None,
             *,
@@ -266,7 +394,7 @@ class PublisherClient(metaclass=PublisherClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.create_topic,
             default_timeout=None,
             client_info=_client_info,
@@ -313,7 +441,7 @@ class PublisherClient(metaclass=PublisherClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.update_topic,
             default_timeout=None,
             client_info=_client_info,
@@ -342,6 +470,11 @@ class PublisherClient(metaclass=PublisherClientMeta):
         r"""Adds one or more messages to the topic. Returns ``NOT_FOUND`` if
         the topic does not exist.
 
+        A request larger than the server accepts, in bytes or in
+        messages, is split into several requests that are sent in
+        parallel, keeping the messages of each ordering key in order;
+        see :func:`~.splitting.publish`.
+
         Args:
             request (:class:`~.pubsub.PublishRequest`):
                 The request object. Request for the Publish method.
@@ -387,23 +520,131 @@ class PublisherClient(metaclass=PublisherClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.publish,
             default_timeout=None,
             client_info=_client_info,
         )
 
-        # Send the request.
-        response = rpc(
-            request,
-            retry=retry,
-            timeout=timeout,
-            metadata=metadata,
-        )
+        def send(request):
+            return rpc(
+                request,
+                retry=retry,
+                timeout=timeout,
+                metadata=metadata,
+            )
+        if self._profiler is not None:
+            # Split requests are sent on other threads.
+            send = self._profiler.bind(send)
+
+        span = None
+        if self._tracer is not None:
+            # Continue the application's trace, if its messages carry one.
+            parent = tracing.extract_first(m.attributes for m in request.messages)
+            span = self._tracer.start_span('publish', parent=parent, attributes={
+                'topic': request.topic,
+                'messages': len(request.messages),
+            })
+        if span is None:
+            return splitting.publish(send, request)
+
+        # Propagate the trace to the subscribers.
+        for message in request.messages:
+            tracing.inject(span, message.attributes)
+        with span:
+            span.add_event('rpc_start')
+            response = splitting.publish(send, request)
 
         # Done; return the response.
         return response
 
+    def publish_with_template(self,
+            topic: str,
+            messages: Sequence[pubsub.PubsubMessage],
+            template: templates.AttributeTemplate,
+            *,
+            retry: retries.Retry = gapic_v1.method.DEFAULT,
+            timeout: float = None,
+            metadata: Sequence[Tuple[str, str]] = (),
+            ) -> pubsub.PublishResponse:
+        r"""Publish messages that share the attributes of a template.
+
+        The template's attributes were encoded when it was created; each
+        message only encodes its own fields, and the request is sent
+        without being encoded again. Attributes set on a message override
+        the template's. Oversize requests are split as by :meth:`publish`.
+        Transports that cannot send encoded requests publish the messages
+        with :meth:`publish` instead.
+
+        Args:
+            topic (:class:`str`):
+                Required. The messages will be published on this topic.
+                Format is ``projects/{project}/topics/{topic}``.
+            messages (:class:`Sequence[~.pubsub.PubsubMessage]`):
+                Required. The messages to publish, with the attributes
+                that differ from the template's.
+            template (:class:`~.templates.AttributeTemplate`):
+                Required. The attributes the messages share.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for this request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with the request as metadata.
+
+        Returns:
+            ~.pubsub.PublishResponse:
+                Response for the ``Publish`` method.
+        """
+        publish_serialized = getattr(self._transport, 'publish_serialized', None)
+        if publish_serialized is None:
+            return self.publish(
+                topic=topic,
+                messages=[template.apply(m) for m in messages],
+                retry=retry,
+                timeout=timeout,
+                metadata=metadata,
+            )
+
+        rpc = self._wrap_method(
+            publish_serialized,
+            default_timeout=None,
+            client_info=_client_info,
+        )
+
+        def send(request):
+            return rpc(
+                request,
+                retry=retry,
+                timeout=timeout,
+                metadata=metadata,
+            )
+        if self._profiler is not None:
+            # Split requests are sent on other threads.
+            send = self._profiler.bind(send)
+
+        span = None
+        if self._tracer is not None:
+            parent = tracing.extract_first(itertools.chain(
+                (m.attributes for m in messages), [template.attributes]))
+            span = self._tracer.start_span('publish', parent=parent, attributes={
+                'topic': topic,
+                'messages': len(messages),
+            })
+        if span is None:
+            return templates.publish(send, topic, messages, template)
+
+        # Propagate the trace to the subscribers, without changing the
+        # caller's messages.
+        traced = []
+        for message in messages:
+            message = pubsub.PubsubMessage(message)
+            tracing.inject(span, message.attributes)
+            traced.append(message)
+        with span:
+            span.add_event('rpc_start')
+            return templates.publish(send, topic, traced, template)
+
     def get_topic(self,
             request: pubsub.GetTopicRequest = None,
             *,
@@ -451,7 +692,7 @@ class PublisherClient(metaclass=PublisherClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.get_topic,
             default_timeout=None,
             client_info=_client_info,
@@ -527,7 +768,7 @@ class PublisherClient(metaclass=PublisherClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.list_topics,
             default_timeout=None,
             client_info=_client_info,
@@ -560,6 +801,66 @@ class PublisherClient(metaclass=PublisherClientMeta):
         # Done; return the response.
         return response
 
+    async def list_topics_async(self,
+            request: pubsub.ListTopicsRequest = None,
+            *,
+            project: str = None,
+            retry: retries.Retry = gapic_v1.method.DEFAULT,
+            timeout: float = None,
+            metadata: Sequence[Tuple[str, str]] = (),
+            executor: futures.Executor = None,
+            ) -> pagers.ListTopicsAsyncPager:
+        r"""Lists matching topics without blocking the event loop.
+
+        Each page is fetched by :meth:`list_topics` on ``executor``, so
+        listings of many projects can run concurrently.
+
+        Args:
+            request (:class:`~.pubsub.ListTopicsRequest`):
+                The request object. Request for the `ListTopics` method.
+            project (:class:`str`):
+                Required. The name of the project in which to list
+                topics. Format is ``projects/{project-id}``.
+                This corresponds to the ``project`` field
+                on the ``request`` instance; if ``request`` is provided, this
+                should not be set.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for this request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with the request as metadata.
+            executor (Optional[concurrent.futures.Executor]): The executor
+                to fetch pages on. If not set, the event loop's default
+                executor is used.
+
+        Returns:
+            ~.pagers.ListTopicsAsyncPager:
+                Response for the ``ListTopics`` method.
+
+                Iterating over this object with ``async for`` will yield
+                results and resolve additional pages automatically.
+
+        """
+        loop = asyncio.get_event_loop()
+        pager = await loop.run_in_executor(executor, functools.partial(
+            self.list_topics,
+            request,
+            project=project,
+            retry=retry,
+            timeout=timeout,
+            metadata=metadata,
+        ))
+
+        async def method(request):
+            return await loop.run_in_executor(executor, pager._method, request)
+
+        return pagers.ListTopicsAsyncPager(
+            method=method,
+            request=pager._request,
+            response=pager._response,
+        )
+
     def list_topic_subscriptions(self,
             request: pubsub.ListTopicSubscriptionsRequest = None,
             *,
@@ -609,7 +910,7 @@ class PublisherClient(metaclass=PublisherClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.list_topic_subscriptions,
             default_timeout=None,
             client_info=_client_info,
@@ -690,7 +991,7 @@ class PublisherClient(metaclass=PublisherClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.list_topic_snapshots,
             default_timeout=None,
             client_info=_client_info,
@@ -764,7 +1065,7 @@ class PublisherClient(metaclass=PublisherClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.delete_topic,
             default_timeout=None,
             client_info=_client_info,
@@ -15,7 +15,7 @@
 # limitations under the License.
 #
 
-from typing import Any, Callable, Iterable
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable
 
 from google.pubsub_v1.types import pubsub
 
@@ -73,3 +73,62 @@ class ListTopicsPager:
 
     def __repr__(self) -> str:
         return '{0}<{1!r}>'.format(self.__class__.__name__, self._response)
+
+
+class ListTopicsAsyncPager:
+    """An asyncio pager for iterating through ``list_topics`` requests.
+
+    This class thinly wraps an initial
+    :class:`~.pubsub.ListTopicsResponse` object, and
+    provides an ``__aiter__`` method to iterate through its
+    ``topics`` field.
+
+    If there are more pages, the ``__aiter__`` method will make additional
+    ``ListTopics`` requests and continue to iterate
+    through the ``topics`` field on the
+    corresponding responses.
+
+    All the usual :class:`~.pubsub.ListTopicsResponse`
+    attributes are available on the pager. If multiple requests are made, only
+    the most recent response is retained, and thus used for attribute lookup.
+    """
+    def __init__(self,
+            method: Callable[[pubsub.ListTopicsRequest],
+                Awaitable[pubsub.ListTopicsResponse]],
+            request: pubsub.ListTopicsRequest,
+            response: pubsub.ListTopicsResponse):
+        """Instantiate the pager.
+
+        Args:
+            method (Callable): A coroutine function that fetches the next
+                page.
+            request (:class:`~.pubsub.ListTopicsRequest`):
+                The initial request object.
+            response (:class:`~.pubsub.ListTopicsResponse`):
+                The initial response object.
+        """
+        self._method = method
+        self._request = pubsub.ListTopicsRequest(request)
+        self._response = response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._response, name)
+
+    @property
+    async def pages(self) -> AsyncIterable[pubsub.ListTopicsResponse]:
+        yield self._response
+        while self._response.next_page_token:
+            self._request.page_token = self._response.next_page_token
+            self._response = await self._method(self._request)
+            yield self._response
+
+    def __aiter__(self) -> AsyncIterable[pubsub.Topic]:
+        async def async_generator():
+            async for page in self.pages:
+                for response in page.topics:
+                    yield response
+
+        return async_generator()
+
+    def __repr__(self) -> str:
+        return '{0}<{1!r}>'.format(self.__class__.__name__, self._response)
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from concurrent import futures
+from typing import Any, Callable, Dict, List, Sequence
+
+from google.pubsub_v1.types import pubsub
+
+# The server rejects larger ``Publish`` requests.
+MAX_REQUEST_BYTES = 10 * 1000 * 1000
+MAX_REQUEST_MESSAGES = 1000
+
+# The number of split requests sent at once.
+DEFAULT_CONCURRENCY = 8
+
+# The tag of the length-delimited ``topic`` and ``messages`` fields.
+_TAG_SIZE = 1
+
+
+def _varint_size(value: int) -> int:
+    size = 1
+    while value >= 0x80:
+        value >>= 7
+        size += 1
+    return size
+
+
+def _field_size(length: int) -> int:
+    """The encoded size of a length-delimited field with a ``length`` body."""
+    return _TAG_SIZE + _varint_size(length) + length
+
+
+def topic_size(topic: str) -> int:
+    """Return the bytes the ``topic`` field adds to a ``PublishRequest``."""
+    if not topic:
+        return 0
+    return _field_size(len(topic.encode('utf-8')))
+
+
+def message_sizes(request: pubsub.PublishRequest) -> List[int]:
+    """Return the bytes each message adds to the encoded request.
+
+    Sizes come from the protobuf runtime's ``ByteSize``, which walks the
+    message without encoding it, so sizing a batch does not serialize it
+    a second time.
+
+    Args:
+        request (~.pubsub.PublishRequest): The request to measure.
+
+    Returns:
+        List[int]: The size of each message, in request order, including
+            its field tag and length prefix.
+    """
+    return [_field_size(m.ByteSize())
+            for m in pubsub.PublishRequest.pb(request).messages]
+
+
+def fits(request: pubsub.PublishRequest,
+         max_bytes: int = MAX_REQUEST_BYTES,
+         max_messages: int = MAX_REQUEST_MESSAGES) -> bool:
+    """Return whether the server accepts ``request`` as it is."""
+    request_pb = pubsub.PublishRequest.pb(request)
+    return (len(request_pb.messages) <= max_messages
+            and request_pb.ByteSize() <= max_bytes)
+
+
+def split(request: pubsub.PublishRequest,
+          max_bytes: int = MAX_REQUEST_BYTES,
+          max_messages: int = MAX_REQUEST_MESSAGES) -> List[List[int]]:
+    """Partition the messages of a request into requests the server accepts.
+
+    Messages with the same ordering key are kept together and in order:
+    a new request is started for a key whose messages fit in one request
+    but not in the space left in the current one, so a key only spans
+    several requests when its messages do not fit in one, and then those
+    requests hold consecutive runs of its messages. Messages without an
+    ordering key fill the space left in any request, then new ones.
+
+    Args:
+        request (~.pubsub.PublishRequest): The request to split.
+        max_bytes (int): The largest encoded size of a request.
+        max_messages (int): The most messages in a request.
+
+    Returns:
+        List[List[int]]: The indexes of the messages of each request.
+
+    Raises:
+        ValueError: If a single message is larger than ``max_bytes``
+            allows.
+    """
+    keys = [m.ordering_key for m in pubsub.PublishRequest.pb(request).messages]
+    return _partition(topic_size(request.topic), message_sizes(request), keys,
+                      max_bytes, max_messages)
+
+
+def _partition(base: int,
+               sizes: Sequence[int],
+               keys: Sequence[str],
+               max_bytes: int,
+               max_messages: int) -> List[List[int]]:
+    for index, size in enumerate(sizes):
+        if base + size > max_bytes:
+            raise ValueError(
+                'Message {} is {} bytes, larger than a publish request '
+                'may be.'.format(index, size))
+    groups = {}  # type: Dict[str, List[int]]
+    for index, key in enumerate(keys):
+        groups.setdefault(key, []).append(index)
+    unordered = groups.pop('', [])
+
+    chunks = []  # type: List[List[int]]
+    chunk_bytes = []  # type: List[int]
+
+    def fits(chunk: int, size: int) -> bool:
+        return (len(chunks[chunk]) < max_messages
+                and chunk_bytes[chunk] + size <= max_bytes)
+
+    def add(chunk: int, index: int) -> None:
+        chunks[chunk].append(index)
+        chunk_bytes[chunk] += sizes[index]
+
+    def new_chunk() -> int:
+        chunks.append([])
+        chunk_bytes.append(base)
+        return len(chunks) - 1
+
+    for indexes in groups.values():
+        group_bytes = sum(sizes[i] for i in indexes)
+        whole = len(indexes) <= max_messages and base + group_bytes <= max_bytes
+        if not chunks or (whole and not (
+                len(chunks[-1]) + len(indexes) <= max_messages
+                and chunk_bytes[-1] + group_bytes <= max_bytes)):
+            new_chunk()
+        for index in indexes:
+            if not fits(len(chunks) - 1, sizes[index]):
+                new_chunk()
+            add(len(chunks) - 1, index)
+
+    # Messages without an ordering key go in the first request with room.
+    first_open = 0
+    for index in unordered:
+        size = sizes[index]
+        chunk = first_open
+        while chunk < len(chunks) and not fits(chunk, size):
+            chunk += 1
+        if chunk == len(chunks):
+            new_chunk()
+        add(chunk, index)
+        # Skip the requests that already hold the most messages allowed.
+        while first_open < len(chunks) and len(chunks[first_open]) >= max_messages:
+            first_open += 1
+    return chunks
+
+
+def publish(send: Callable[[pubsub.PublishRequest], pubsub.PublishResponse],
+            request: pubsub.PublishRequest,
+            *,
+            max_bytes: int = MAX_REQUEST_BYTES,
+            max_messages: int = MAX_REQUEST_MESSAGES,
+            concurrency: int = DEFAULT_CONCURRENCY) -> pubsub.PublishResponse:
+    """Send a request, splitting it first if the server would reject it.
+
+    A request within the limits is sent unchanged. Otherwise the requests
+    from :func:`split` are sent on up to ``concurrency`` threads; one
+    holding an ordering key is only sent once the previous request
+    holding that key has succeeded, so each key is published in order.
+    The message IDs are returned in the order of the original messages.
+
+    Args:
+        send (Callable[[~.pubsub.PublishRequest], ~.pubsub.PublishResponse]):
+            Sends one request, with retries.
+        request (~.pubsub.PublishRequest): The request to publish.
+        max_bytes (int): The largest encoded size of a request.
+        max_messages (int): The most messages in a request.
+        concurrency (int): The most requests in flight at once.
+
+    Returns:
+        ~.pubsub.PublishResponse: The response, as if for ``request``.
+
+    Raises:
+        ValueError: If a single message is larger than ``max_bytes``
+            allows.
+        google.api_core.exceptions.GoogleAPICallError: The error of the
+            first request that failed, once every other request has
+            finished. The messages of requests that succeeded have been
+            published; requests behind a failed one for the same ordering
+            key are not sent.
+    """
+    if fits(request, max_bytes, max_messages):
+        return send(request)
+
+    chunks = split(request, max_bytes, max_messages)
+    messages = pubsub.PublishRequest.pb(request).messages
+    requests = []
+    for chunk in chunks:
+        part = pubsub.PublishRequest(topic=request.topic)
+        pubsub.PublishRequest.pb(part).messages.extend(messages[i] for i in chunk)
+        requests.append(part)
+    return _send_parts(send, requests, chunks,
+                       [m.ordering_key for m in messages], concurrency)
+
+
+def _send_parts(send: Callable[[Any], pubsub.PublishResponse],
+                requests: Sequence[Any],
+                chunks: Sequence[List[int]],
+                keys: Sequence[str],
+                concurrency: int) -> pubsub.PublishResponse:
+    """Send the parts of a split request and merge their responses.
+
+    ``chunks`` holds the indexes of the messages of each request and
+    ``keys`` the ordering key of every message.
+    """
+    def send_after(part, previous):
+        # A failure of the previous request for a key is raised here, so
+        # the messages behind it are not sent out of order.
+        for future in previous:
+            future.result()
+        return send(part)
+
+    # The executor runs requests in submission order, so the requests a
+    # worker waits for have already started; waiting cannot deadlock.
+    with futures.ThreadPoolExecutor(
+            max_workers=min(concurrency, len(requests)),
+            thread_name_prefix='Thread-PublishSplit') as executor:
+        last_for_key = {}  # type: Dict[str, futures.Future]
+        submitted = []  # type: List[futures.Future]
+        for chunk, part in zip(chunks, requests):
+            part_keys = {keys[i] for i in chunk} - {''}
+            previous = [last_for_key[k] for k in part_keys if k in last_for_key]
+            future = executor.submit(send_after, part, previous)
+            for key in part_keys:
+                last_for_key[key] = future
+            submitted.append(future)
+        futures.wait(submitted)
+
+    message_ids = [''] * len(keys)
+    for chunk, future in zip(chunks, submitted):
+        response = future.result()
+        for index, message_id in zip(chunk, response.message_ids):
+            message_ids[index] = message_id
+    return pubsub.PublishResponse(message_ids=message_ids)
+
+
+__all__ = (
+    'DEFAULT_CONCURRENCY',
+    'MAX_REQUEST_BYTES',
+    'MAX_REQUEST_MESSAGES',
+    'fits',
+    'message_sizes',
+    'publish',
+    'split',
+)
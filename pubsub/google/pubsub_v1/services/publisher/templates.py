@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from typing import Callable, Dict, List, Mapping, Sequence
+
+from google.pubsub_v1.services.publisher import splitting
+from google.pubsub_v1.types import pubsub
+
+# The tags of ``PublishRequest.topic`` and ``PublishRequest.messages``.
+_TOPIC_TAG = b'\x0a'
+_MESSAGES_TAG = b'\x12'
+
+
+def _varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value >= 0x80:
+        encoded.append(value & 0x7f | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+class AttributeTemplate:
+    """Attributes shared by many messages, encoded once.
+
+    A ``PubsubMessage`` encodes each attribute as a separate map entry, and
+    a parser that meets the same key twice keeps the last value. The
+    template's entries are therefore encoded when it is created, and a
+    message is encoded by prefixing its own encoding with them: attributes
+    set on the message are appended after the template's and override
+    them, and only those are encoded per message.
+
+    .. code-block:: python
+
+        template = AttributeTemplate({'source': 'billing', 'schema': 'v3'})
+        client.publish_with_template(
+            topic, [pubsub.PubsubMessage(data=b'...')], template)
+
+    The template is immutable; create a new one to change its attributes.
+    """
+    def __init__(self, attributes: Mapping[str, str]):
+        """Instantiate the template.
+
+        Args:
+            attributes (Mapping[str, str]): The attributes every message
+                starts with.
+        """
+        self._attributes = dict(attributes)
+        self._encoded = pubsub.PubsubMessage.serialize(
+            pubsub.PubsubMessage(attributes=self._attributes))
+
+    @property
+    def attributes(self) -> Dict[str, str]:
+        """A copy of the template's attributes."""
+        return dict(self._attributes)
+
+    @property
+    def encoded(self) -> bytes:
+        """The encoded map entries of the template's attributes."""
+        return self._encoded
+
+    def encode(self, message: pubsub.PubsubMessage) -> bytes:
+        """Return the encoding of ``message`` with the template's attributes.
+
+        Args:
+            message (~.pubsub.PubsubMessage): The message. Its attributes
+                are added to the template's, replacing those with the same
+                key.
+
+        Returns:
+            bytes: The encoded message, as the server will parse it.
+        """
+        return self._encoded + pubsub.PubsubMessage.serialize(message)
+
+    def apply(self, message: pubsub.PubsubMessage) -> pubsub.PubsubMessage:
+        """Return a copy of ``message`` with the template's attributes.
+
+        This is what :meth:`encode` produces, decoded; it is used where
+        encoded messages cannot be sent.
+        """
+        result = pubsub.PubsubMessage(message)
+        attributes = dict(self._attributes)
+        attributes.update(message.attributes)
+        result.attributes = attributes
+        return result
+
+
+def encode_request(topic: str, messages: Sequence[bytes]) -> bytes:
+    """Return an encoded ``PublishRequest`` from encoded messages.
+
+    Args:
+        topic (str): The topic to publish to.
+        messages (Sequence[bytes]): The encoded messages.
+
+    Returns:
+        bytes: The request, ready to be sent without serialization.
+    """
+    parts = []  # type: List[bytes]
+    if topic:
+        encoded_topic = topic.encode('utf-8')
+        parts.extend((_TOPIC_TAG, _varint(len(encoded_topic)), encoded_topic))
+    for message in messages:
+        parts.extend((_MESSAGES_TAG, _varint(len(message)), message))
+    return b''.join(parts)
+
+
+def publish(send: Callable[[bytes], pubsub.PublishResponse],
+            topic: str,
+            messages: Sequence[pubsub.PubsubMessage],
+            template: AttributeTemplate,
+            *,
+            max_bytes: int = splitting.MAX_REQUEST_BYTES,
+            max_messages: int = splitting.MAX_REQUEST_MESSAGES,
+            concurrency: int = splitting.DEFAULT_CONCURRENCY) -> pubsub.PublishResponse:
+    """Publish messages with a template's attributes as encoded requests.
+
+    Requests the server would reject are split as by
+    :func:`~.splitting.publish`; the encoded messages are measured by
+    their length.
+
+    Args:
+        send (Callable[[bytes], ~.pubsub.PublishResponse]): Sends one
+            encoded request, with retries.
+        topic (str): The topic to publish to.
+        messages (Sequence[~.pubsub.PubsubMessage]): The messages, with
+            the attributes that differ from the template's.
+        template (~.AttributeTemplate): The attributes shared by the
+            messages.
+        max_bytes (int): The largest encoded size of a request.
+        max_messages (int): The most messages in a request.
+        concurrency (int): The most requests in flight at once.
+
+    Returns:
+        ~.pubsub.PublishResponse: The response, with the message IDs in
+            the order of ``messages``.
+
+    Raises:
+        ValueError: If a single message is larger than ``max_bytes``
+            allows.
+    """
+    encoded = [template.encode(m) for m in messages]
+    base = splitting.topic_size(topic)
+    sizes = [splitting._field_size(len(m)) for m in encoded]
+    if len(encoded) <= max_messages and base + sum(sizes) <= max_bytes:
+        return send(encode_request(topic, encoded))
+
+    keys = [m.ordering_key for m in messages]
+    chunks = splitting._partition(base, sizes, keys, max_bytes, max_messages)
+    requests = [encode_request(topic, [encoded[i] for i in chunk]) for chunk in chunks]
+    return splitting._send_parts(send, requests, chunks, keys, concurrency)
+
+
+__all__ = (
+    'AttributeTemplate',
+    'encode_request',
+    'publish',
+)
@@ -15,21 +15,35 @@
 # limitations under the License.
 #
 
-from typing import Callable, Dict, Tuple
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
+from google import auth                    # type: ignore
 from google.api_core import grpc_helpers   # type: ignore
 from google.auth import credentials        # type: ignore
+from google.auth import credentials as ga_credentials  # type: ignore
 from google.auth.transport.grpc import SslCredentials  # type: ignore
+from google.auth.transport.requests import Request  # type: ignore
 
 
 import grpc  # type: ignore
 
 from google.protobuf import empty_pb2 as empty  # type: ignore
+from google.pubsub_v1.services import metrics
+from google.pubsub_v1.services import profiling
+from google.pubsub_v1.services import token_refresh
+from google.pubsub_v1.services.channel_options import ChannelOptions
+from google.pubsub_v1.services.shared_channel import SharedChannel
 from google.pubsub_v1.types import pubsub
 
 from .base import PublisherTransport
 
 
+_LOGGER = logging.getLogger(__name__)
+
+
 class PublisherGrpcTransport(PublisherTransport):
     """gRPC backend transport for Publisher.
 
@@ -46,9 +60,14 @@ class PublisherGrpcTransport(PublisherTransport):
     def __init__(self, *,
             host: str = 'pubsub.googleapis.com',
             credentials: credentials.Credentials = None,
-            channel: grpc.Channel = None,
+            channel: Union[grpc.Channel, SharedChannel] = None,
             api_mtls_endpoint: str = None,
-            client_cert_source: Callable[[], Tuple[bytes, bytes]] = None) -> None:
+            client_cert_source: Callable[[], Tuple[bytes, bytes]] = None,
+            channel_options: ChannelOptions = None,
+            lazy: bool = False,
+            metrics_sink: metrics.MetricsSink = None,
+            profiler: profiling.Profiler = None,
+            background_token_refresh: bool = False) -> None:
         """Instantiate the transport.
 
         Args:
@@ -59,8 +78,11 @@ class PublisherGrpcTransport(PublisherTransport):
                 are specified, the client will attempt to ascertain the
                 credentials from the environment.
                 This argument is ignored if ``channel`` is provided.
-            channel (Optional[grpc.Channel]): A ``Channel`` instance through
-                which to make calls.
+            channel (Optional[Union[grpc.Channel, ~.SharedChannel]]): A
+                ``Channel`` instance through which to make calls, or a
+                :class:`~.SharedChannel` to acquire one from. A shared
+                channel is released by :meth:`close`; any other channel
+                provided here is left open for its owner.
             api_mtls_endpoint (Optional[str]): The mutual TLS endpoint. If
                 provided, it overrides the ``host`` argument and tries to create
                 a mutual TLS channel with client SSL credentials from
@@ -69,41 +91,65 @@ class PublisherGrpcTransport(PublisherTransport):
                 callback to provide client SSL certificate bytes and private key
                 bytes, both in PEM format. It is ignored if ``api_mtls_endpoint``
                 is None.
+            channel_options (Optional[~.ChannelOptions]): Keepalive, window
+                and message size settings for the channel the transport
+                creates. It is ignored if ``channel`` is provided.
+            lazy (bool): Defer looking up default credentials, loading the
+                client certificate and creating the channel until the first
+                RPC, or until :meth:`warm_up_in_background` does so.
+            metrics_sink (Optional[~.metrics.MetricsSink]): If set, the
+                latency, sizes, status and retries of every RPC are
+                reported to it. If not, no interceptor is installed.
+            profiler (Optional[~.profiling.Profiler]): If set, the time
+                spent encoding, sending and decoding the calls it samples
+                is reported to it.
+            background_token_refresh (bool): Fetch and refresh access
+                tokens on a background thread, ahead of expiry, instead of
+                inside the RPC that finds the token expired. Transports
+                given the same credentials share one token. It is ignored
+                if ``channel`` is provided.
 
         Raises:
           google.auth.exceptions.MutualTlsChannelError: If mutual TLS transport
               creation failed for any reason.
         """
-        if channel:
+        self._shared_channel = None
+        self._owns_channel = not channel
+        self._channel_options = channel_options
+        self._metrics_sink = metrics_sink
+        self._profiler = profiler
+        self._background_token_refresh = background_token_refresh
+        self._token_refresher = None  # type: Optional[token_refresh.TokenRefresher]
+        # The credentials the channel was created with, once scoped.
+        self._scoped_credentials = None  # type: Optional[credentials.Credentials]
+        self._channel_lock = threading.Lock()
+        self._client_cert_source = client_cert_source
+        self._mtls = False
+
+        if isinstance(channel, SharedChannel):
+            credentials = False
+
+            # Hold a reference to the shared channel until closed.
+            self._shared_channel = channel
+            self._grpc_channel = self._instrument(channel.acquire())
+        elif channel:
             # Sanity check: Ensure that channel and credentials are not both
             # provided.
             credentials = False
 
             # If a channel was explicitly provided, set it.
-            self._grpc_channel = channel
+            self._grpc_channel = self._instrument(channel)
         elif api_mtls_endpoint:
             host = api_mtls_endpoint if ":" in api_mtls_endpoint else api_mtls_endpoint + ":443"
-
-            # Create SSL credentials with client_cert_source or application
-            # default SSL credentials.
-            if client_cert_source:
-                cert, key = client_cert_source()
-                ssl_credentials = grpc.ssl_channel_credentials(
-                    certificate_chain=cert, private_key=key
-                )
-            else:
-                ssl_credentials = SslCredentials().ssl_credentials
+            self._mtls = True
 
             # create a new channel. The provided one is ignored.
-            self._grpc_channel = grpc_helpers.create_channel(
-                host,
-                credentials=credentials,
-                ssl_credentials=ssl_credentials,
-                scopes=self.AUTH_SCOPES,
-            )
+            if not lazy:
+                self._grpc_channel = self._instrument(
+                    self._create_mtls_channel(host, credentials))
 
         # Run the base constructor.
-        super().__init__(host=host, credentials=credentials)
+        super().__init__(host=host, credentials=credentials, lazy=lazy)
         self._stubs = {}  # type: Dict[str, Callable]
 
     @classmethod
@@ -131,6 +177,51 @@ class PublisherGrpcTransport(PublisherTransport):
             **kwargs
         )
 
+    def _create_mtls_channel(self,
+            host: str,
+            credentials: credentials.Credentials) -> grpc.Channel:
+        # Create SSL credentials with client_cert_source or application
+        # default SSL credentials.
+        if self._client_cert_source:
+            cert, key = self._client_cert_source()
+            ssl_credentials = grpc.ssl_channel_credentials(
+                certificate_chain=cert, private_key=key
+            )
+        else:
+            ssl_credentials = SslCredentials().ssl_credentials
+
+        return grpc_helpers.create_channel(
+            host,
+            credentials=self._channel_credentials(credentials),
+            ssl_credentials=ssl_credentials,
+            scopes=self.AUTH_SCOPES,
+            **self._channel_kwargs()
+        )
+
+    def _channel_credentials(self,
+            credentials: credentials.Credentials) -> credentials.Credentials:
+        # Scope the credentials here rather than in ``create_channel``, so
+        # that :meth:`warm_up` refreshes the object the channel uses.
+        if credentials is None:
+            credentials, _ = auth.default(scopes=self.AUTH_SCOPES)
+        if self._background_token_refresh:
+            self._token_refresher = token_refresh.acquire(credentials, self.AUTH_SCOPES)
+            credentials = self._token_refresher.credentials
+        else:
+            credentials = ga_credentials.with_scopes_if_required(
+                credentials, self.AUTH_SCOPES)
+        self._scoped_credentials = credentials
+        return credentials
+
+    def _instrument(self, channel: grpc.Channel) -> grpc.Channel:
+        return profiling.instrument(
+            metrics.instrument(channel, self._metrics_sink), self._profiler)
+
+    def _channel_kwargs(self) -> Dict[str, Any]:
+        if self._channel_options is None:
+            return {}
+        return {'options': self._channel_options.to_grpc_options()}
+
     @property
     def grpc_channel(self) -> grpc.Channel:
         """Create the channel designed to connect to this service.
@@ -141,14 +232,121 @@ class PublisherGrpcTransport(PublisherTransport):
         # Sanity check: Only create a new channel if we do not already
         # have one.
         if not hasattr(self, '_grpc_channel'):
-            self._grpc_channel = self.create_channel(
-                self._host,
-                credentials=self._credentials,
-            )
+            with self._channel_lock:
+                if not hasattr(self, '_grpc_channel'):
+                    if self._credentials is None:
+                        # Deferred by ``lazy``.
+                        self._credentials, _ = auth.default(scopes=self.AUTH_SCOPES)
+                    if self._mtls:
+                        channel = self._create_mtls_channel(
+                            self._host, self._credentials)
+                    else:
+                        channel = self.create_channel(
+                            self._host,
+                            credentials=self._channel_credentials(self._credentials),
+                            **self._channel_kwargs()
+                        )
+                    self._grpc_channel = self._instrument(channel)
 
         # Return the channel from cache.
         return self._grpc_channel
 
+    def wait_for_ready(self, timeout: float = None) -> bool:
+        """Wait until the channel is connected to the service.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait, in
+                seconds. If not set, wait indefinitely.
+
+        Returns:
+            bool: Whether the channel connected within ``timeout``.
+        """
+        if self._shared_channel is not None:
+            return self._shared_channel.wait_for_ready(timeout)
+        future = grpc.channel_ready_future(self.grpc_channel)
+        try:
+            future.result(timeout=timeout)
+        except grpc.FutureTimeoutError:
+            future.cancel()
+            return False
+        return True
+
+    def warm_up(self, timeout: float = None) -> bool:
+        """Prepare the transport to take traffic.
+
+        Creates the channel if it does not exist yet, fetches an access
+        token if the credentials do not hold a valid one, and waits for the
+        connection (DNS, TCP, TLS and HTTP/2 setup) to be established, so
+        the first RPC pays none of these costs. With a
+        :class:`~.SharedChannel`, every channel of its pool is connected.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait for the
+                connections, in seconds. If not set, wait indefinitely.
+
+        Returns:
+            bool: Whether the transport was ready within ``timeout``.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.grpc_channel
+        if self._token_refresher is not None:
+            self._token_refresher.ensure_valid()
+        elif self._scoped_credentials is not None and not self._scoped_credentials.valid:
+            self._scoped_credentials.refresh(Request())
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if self._shared_channel is not None:
+            return self._shared_channel.wait_for_ready(remaining)
+        return self.wait_for_ready(remaining)
+
+    def warm_up_in_background(self, timeout: float = None) -> threading.Thread:
+        """Run :meth:`warm_up` on a background thread.
+
+        For a ``lazy`` transport, this also takes credential discovery,
+        client certificate loading and channel creation off the caller's
+        thread. An RPC made meanwhile waits for the channel rather than
+        creating another. If warming up fails, the error is logged and the
+        first RPC tries again.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait for the
+                connections, in seconds.
+
+        Returns:
+            threading.Thread: The started thread.
+        """
+        thread = threading.Thread(
+            name='Thread-PublisherWarmUp',
+            target=self._warm_up_quietly,
+            args=(timeout,),
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def _warm_up_quietly(self, timeout: float = None) -> None:
+        try:
+            if not self.warm_up(timeout):
+                _LOGGER.warning('The channel was not ready after %s seconds.', timeout)
+        except Exception as exc:
+            _LOGGER.warning('Failed to warm up the channel in the background: %r', exc)
+
+    def close(self) -> None:
+        """Release the channel.
+
+        A channel acquired from a :class:`~.SharedChannel` is released, and
+        closed if no other transport uses it. A channel the transport
+        created is closed. A channel passed in directly is left open.
+        """
+        if self._shared_channel is not None:
+            self._shared_channel.release()
+            self._shared_channel = None
+        elif self._owns_channel and hasattr(self, '_grpc_channel'):
+            self._grpc_channel.close()
+        if self._token_refresher is not None:
+            self._token_refresher.release()
+            self._token_refresher = None
+        self._stubs = {}
+
     @property
     def create_topic(self) -> Callable[
             [pubsub.Topic],
@@ -230,6 +428,30 @@ class PublisherGrpcTransport(PublisherTransport):
             )
         return self._stubs['publish']
 
+    @property
+    def publish_serialized(self) -> Callable[
+            [bytes],
+            pubsub.PublishResponse]:
+        r"""Return a callable for the publish method taking an encoded
+        request.
+
+        The request is sent as it is, so that messages encoded ahead of
+        time, such as with :class:`~.templates.AttributeTemplate`, are
+        not decoded and encoded again.
+
+        Returns:
+            Callable[[bytes],
+                    ~.PublishResponse]:
+                A function that, when called, will call the underlying RPC
+                on the server.
+        """
+        if 'publish_serialized' not in self._stubs:
+            self._stubs['publish_serialized'] = self.grpc_channel.unary_unary(
+                '/google.pubsub.v1.Publisher/Publish',
+                response_deserializer=pubsub.PublishResponse.deserialize,
+            )
+        return self._stubs['publish_serialized']
+
     @property
     def get_topic(self) -> Callable[
             [pubsub.GetTopicRequest],
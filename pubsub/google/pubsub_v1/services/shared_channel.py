@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import itertools
+import threading
+import time
+from typing import Any, Callable, List, Sequence, Tuple
+
+from google.api_core import grpc_helpers   # type: ignore
+from google.auth import credentials        # type: ignore
+from google.auth.transport.grpc import SslCredentials  # type: ignore
+
+import grpc  # type: ignore
+
+from google.pubsub_v1.services.channel_options import ChannelOptions
+
+
+# The scopes requested by both the publisher and subscriber transports.
+AUTH_SCOPES = (
+    'https://www.googleapis.com/auth/cloud-platform',
+    'https://www.googleapis.com/auth/pubsub',
+)
+
+
+class _RoundRobinCallable:
+    """A multi-callable that sends each call on the next channel of a pool."""
+    def __init__(self, callables: Sequence[Any]):
+        self._callables = list(callables)
+        # ``next`` on a count is atomic under the GIL.
+        self._counter = itertools.count()
+
+    def _next(self) -> Any:
+        return self._callables[next(self._counter) % len(self._callables)]
+
+    def __call__(self, *args, **kwargs):
+        return self._next()(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # ``with_call``, ``future`` and the like.
+        return getattr(self._next(), name)
+
+
+class _PooledChannel(grpc.Channel):
+    """A channel that spreads calls round robin over a pool of channels.
+
+    Each method is bound on every channel of the pool once, when its stub
+    is created; each call then goes to the next channel. Closing it does
+    nothing: the pool belongs to its :class:`SharedChannel`.
+    """
+    def __init__(self, channels: Sequence[grpc.Channel]):
+        self._channels = list(channels)
+
+    def _pooled(self, kind: str, method: str, *args, **kwargs) -> _RoundRobinCallable:
+        return _RoundRobinCallable([
+            getattr(channel, kind)(method, *args, **kwargs)
+            for channel in self._channels
+        ])
+
+    def unary_unary(self, method, *args, **kwargs):
+        return self._pooled('unary_unary', method, *args, **kwargs)
+
+    def unary_stream(self, method, *args, **kwargs):
+        return self._pooled('unary_stream', method, *args, **kwargs)
+
+    def stream_unary(self, method, *args, **kwargs):
+        return self._pooled('stream_unary', method, *args, **kwargs)
+
+    def stream_stream(self, method, *args, **kwargs):
+        return self._pooled('stream_stream', method, *args, **kwargs)
+
+    def subscribe(self, callback, try_to_connect=False):
+        for channel in self._channels:
+            channel.subscribe(callback, try_to_connect=try_to_connect)
+
+    def unsubscribe(self, callback):
+        for channel in self._channels:
+            channel.unsubscribe(callback)
+
+    def close(self):
+        pass
+
+
+class SharedChannel:
+    """A gRPC channel, or pool of channels, shared between transports.
+
+    Pass the same instance as the ``channel`` of a
+    :class:`~.PublisherGrpcTransport` and a
+    :class:`~.SubscriberGrpcTransport` to have both clients use one
+    connection, with one TLS handshake and one stream of keepalives. Both
+    services live on the same endpoint, so nothing else is needed.
+
+    The channels are reference counted. The creator holds one reference,
+    and every transport built on the instance acquires another, released by
+    the transport's ``close()``. The channels are closed when the last
+    reference is released, whichever order the owners close in.
+
+    With ``pool_size`` above one, every channel has its own connection,
+    and every transport spreads its calls over all of them, round robin
+    per call, which spreads many concurrent streams over several HTTP/2
+    connections. The publisher and subscriber still share every
+    connection; a pool only adds connections.
+
+    .. code-block:: python
+
+        channel = SharedChannel.create(
+            api_mtls_endpoint='pubsub.mtls.googleapis.com',
+            client_cert_source=client_cert_source)
+        publisher = PublisherClient(
+            transport=PublisherGrpcTransport(channel=channel))
+        subscriber = SubscriberClient(
+            transport=SubscriberGrpcTransport(channel=channel))
+        channel.close()  # Closed for real once both clients are closed.
+    """
+    def __init__(self, channels: Sequence[grpc.Channel]):
+        """Share existing channels.
+
+        Args:
+            channels (Sequence[grpc.Channel]): The channels to share. They
+                are closed when the last reference is released.
+        """
+        if not channels:
+            raise ValueError('At least one channel is required.')
+        self._channels = list(channels)  # type: List[grpc.Channel]
+        self._lock = threading.Lock()
+        self._references = 1
+        self._owner_released = False
+        self._pooled = None  # type: Any
+        if len(self._channels) > 1:
+            self._pooled = _PooledChannel(self._channels)
+
+    @classmethod
+    def create(cls,
+            host: str = 'pubsub.googleapis.com',
+            credentials: credentials.Credentials = None,
+            *,
+            api_mtls_endpoint: str = None,
+            client_cert_source: Callable[[], Tuple[bytes, bytes]] = None,
+            pool_size: int = 1,
+            channel_options: ChannelOptions = None,
+            **kwargs) -> 'SharedChannel':
+        """Create the channels to share.
+
+        Args:
+            host (Optional[str]): The hostname to connect to.
+            credentials (Optional[google.auth.credentials.Credentials]): The
+                authorization credentials to attach to requests. If none
+                are specified, they are ascertained from the environment.
+            api_mtls_endpoint (Optional[str]): The mutual TLS endpoint. If
+                provided, it overrides ``host`` and the channels use client
+                SSL credentials from ``client_cert_source`` or application
+                default SSL credentials.
+            client_cert_source (Optional[Callable[[], Tuple[bytes, bytes]]]):
+                A callback to provide client SSL certificate bytes and
+                private key bytes, both in PEM format. It is called once,
+                however many channels are created.
+            pool_size (int): The number of channels to create.
+            channel_options (Optional[~.ChannelOptions]): Keepalive, window
+                and message size settings for the channels.
+            kwargs (Optional[dict]): Keyword arguments, which are passed to
+                the channel creation.
+
+        Returns:
+            SharedChannel: The shared channels, holding the caller's
+                reference.
+
+        Raises:
+          google.auth.exceptions.MutualTlsChannelError: If mutual TLS channel
+              creation failed for any reason.
+        """
+        if pool_size < 1:
+            raise ValueError('pool_size must be a positive integer.')
+        if api_mtls_endpoint:
+            host = api_mtls_endpoint if ':' in api_mtls_endpoint else api_mtls_endpoint + ':443'
+            if client_cert_source:
+                cert, key = client_cert_source()
+                kwargs['ssl_credentials'] = grpc.ssl_channel_credentials(
+                    certificate_chain=cert, private_key=key
+                )
+            else:
+                kwargs['ssl_credentials'] = SslCredentials().ssl_credentials
+        elif ':' not in host:
+            host += ':443'
+
+        options = list(kwargs.pop('options', None) or [])
+        if channel_options is not None:
+            options.extend(channel_options.to_grpc_options())
+        if pool_size > 1:
+            # Channels with identical arguments otherwise share their
+            # connections through gRPC's global subchannel pool.
+            options.append(('grpc.use_local_subchannel_pool', 1))
+        if options:
+            kwargs['options'] = options
+
+        return cls([
+            grpc_helpers.create_channel(
+                host,
+                credentials=credentials,
+                scopes=AUTH_SCOPES,
+                **kwargs
+            )
+            for _ in range(pool_size)
+        ])
+
+    @property
+    def channels(self) -> Sequence[grpc.Channel]:
+        return tuple(self._channels)
+
+    @property
+    def reference_count(self) -> int:
+        """The number of owners still using the channels."""
+        return self._references
+
+    @property
+    def closed(self) -> bool:
+        return self._references == 0
+
+    def wait_for_ready(self, timeout: float = None) -> bool:
+        """Connect every channel of the pool and wait until all are ready.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait for all the
+                channels, in seconds. If not set, wait indefinitely.
+
+        Returns:
+            bool: Whether every channel connected within ``timeout``.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Subscribe to every channel first, so they connect in parallel.
+        futures = [grpc.channel_ready_future(c) for c in self._channels]
+        try:
+            for future in futures:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                future.result(timeout=remaining)
+        except grpc.FutureTimeoutError:
+            for future in futures:
+                future.cancel()
+            return False
+        return True
+
+    def acquire(self) -> grpc.Channel:
+        """Take a reference and return the channel to use with it.
+
+        For a pool, the channel sends each call on the next channel of the
+        pool.
+
+        Raises:
+            ValueError: If the channels are already closed.
+        """
+        with self._lock:
+            if self._references == 0:
+                raise ValueError('The shared channel is closed.')
+            self._references += 1
+        return self._pooled or self._channels[0]
+
+    def release(self) -> None:
+        """Give up a reference taken by :meth:`acquire`.
+
+        The channels are closed when the last reference is released.
+        """
+        with self._lock:
+            if self._references == 0:
+                return
+            self._references -= 1
+            if self._references:
+                return
+        for channel in self._channels:
+            channel.close()
+
+    def close(self) -> None:
+        """Release the creator's reference. Calling it again has no effect."""
+        with self._lock:
+            if self._owner_released:
+                return
+            self._owner_released = True
+        self.release()
+
+    def __enter__(self) -> 'SharedChannel':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+__all__ = (
+    'SharedChannel',
+)
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import collections
+import logging
+import random
+import threading
+from concurrent import futures
+from typing import Deque, Dict, Iterator, Optional, Sequence, Tuple
+
+from google.api_core import exceptions
+from google.pubsub_v1.services.subscriber.streaming import _MAX_ACK_IDS_PER_REQUEST
+from google.pubsub_v1.types import pubsub
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# Errors after which a pull is retried after a backoff. ``UNAVAILABLE`` is
+# also how the server rejects too many concurrent pulls.
+_RETRYABLE_PULL_ERRORS = (
+    exceptions.Aborted,
+    exceptions.GatewayTimeout,
+    exceptions.InternalServerError,
+    exceptions.ServiceUnavailable,
+    exceptions.Unknown,
+)
+
+
+class BatchPuller:
+    """Consume a subscription in batches with concurrent ``Pull`` calls.
+
+    ``concurrency`` pulls are kept outstanding at all times: as soon as one
+    returns, a replacement is sent before its batch is handed to the
+    caller, so the next batches are already on their way while the current
+    one is processed. At most ``concurrency`` received batches are held
+    beyond the one being processed.
+
+    Without ``return_immediately`` the server holds a pull open until
+    messages arrive, so empty responses are retried straight away. With
+    it, and after retryable errors, the retry of that pull is delayed by a
+    randomized exponential backoff, reset once the pull returns messages.
+
+    .. code-block:: python
+
+        with client.pull_batches(subscription, max_messages=500) as puller:
+            for response in puller:
+                handle(response.received_messages)
+                puller.ack([m.ack_id for m in response.received_messages])
+
+    Acking is left to the caller, and :meth:`ack` sends ack IDs in as few
+    ``Acknowledge`` requests as the server accepts, so acks for several
+    batches can be collected and sent together.
+    """
+    def __init__(self,
+            client,
+            subscription: str,
+            *,
+            max_messages: int = 1000,
+            concurrency: int = 4,
+            return_immediately: bool = False,
+            initial_backoff: float = 0.1,
+            max_backoff: float = 10.0,
+            timeout: float = None,
+            metadata: Sequence[Tuple[str, str]] = ()):
+        """Instantiate the puller.
+
+        Args:
+            client (~.SubscriberClient): The client used to pull and ack.
+            subscription (str): The subscription to consume. Format is
+                ``projects/{project}/subscriptions/{sub}``.
+            max_messages (int): The maximum number of messages per batch.
+            concurrency (int): The number of pulls kept outstanding.
+            return_immediately (bool): Ask the server to answer pulls
+                straight away even when no messages are available.
+            initial_backoff (float): The upper bound, in seconds, of the
+                random delay before a pull that returned nothing or failed
+                is retried. It doubles with each such pull in a row.
+            max_backoff (float): The largest upper bound, in seconds, of
+                the retry delay.
+            timeout (Optional[float]): The timeout for each pull.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with every request as metadata.
+        """
+        if max_messages < 1:
+            raise ValueError('max_messages must be a positive integer.')
+        if concurrency < 1:
+            raise ValueError('concurrency must be a positive integer.')
+        self._client = client
+        self.subscription = subscription
+        self.max_messages = max_messages
+        self.concurrency = concurrency
+        self.return_immediately = return_immediately
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._timeout = timeout
+        self._metadata = tuple(metadata)
+        self._stopped = threading.Event()
+        # Completed by close() to wake batches() from waiting on pulls.
+        self._closed = futures.Future()  # type: futures.Future
+        self._lock = threading.Lock()
+
+        self.pull_count = 0
+        self.empty_pull_count = 0
+
+    def __iter__(self) -> Iterator[pubsub.PullResponse]:
+        return self.batches()
+
+    def __enter__(self) -> 'BatchPuller':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop pulling.
+
+        A consumer waiting in :meth:`batches` returns at once, without
+        waiting for the pulls in flight. Batches received but not yet
+        handed to the caller are nacked so they are redelivered promptly;
+        so are those of pulls still in flight, as they return.
+        """
+        self._stopped.set()
+        with self._lock:
+            if not self._closed.done():
+                self._closed.set_result(None)
+
+    def batches(self) -> Iterator[pubsub.PullResponse]:
+        """Yield non-empty ``PullResponse`` batches until closed.
+
+        Raises:
+            google.api_core.exceptions.GoogleAPICallError: If a pull fails
+                with a non-retryable error.
+        """
+        executor = futures.ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix='ThreadPoolExecutor-PubsubPull',
+        )
+        # Each outstanding pull maps to the backoff of its slot.
+        pending = {
+            executor.submit(self._pull, 0): 0.0
+            for _ in range(self.concurrency)
+        }  # type: Dict[futures.Future, float]
+        ready = collections.deque()  # type: Deque[pubsub.PullResponse]
+        try:
+            while not self._stopped.is_set():
+                done, _ = futures.wait(
+                    list(pending) + [self._closed], return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    if future is self._closed:
+                        continue
+                    backoff = pending.pop(future)
+                    response = None  # type: Optional[pubsub.PullResponse]
+                    try:
+                        response = future.result()
+                    except _RETRYABLE_PULL_ERRORS as exc:
+                        _LOGGER.info('Pull failed, retrying: %r', exc)
+
+                    if response is not None and response.received_messages:
+                        ready.append(response)
+                        backoff = delay = 0.0
+                    elif response is not None and not self.return_immediately:
+                        # The server already waited for messages.
+                        delay = 0.0
+                    else:
+                        backoff = min(max(backoff * 2, self._initial_backoff),
+                                      self._max_backoff)
+                        delay = random.uniform(0, backoff)
+                    pending[executor.submit(self._pull, delay)] = backoff
+
+                while ready:
+                    yield ready.popleft()
+        finally:
+            self._stopped.set()
+            for response in ready:
+                self._nack_response(response)
+            for future in pending:
+                future.add_done_callback(self._nack_unclaimed)
+            executor.shutdown(wait=False)
+
+    def _pull(self, delay: float) -> Optional[pubsub.PullResponse]:
+        if delay:
+            self._stopped.wait(delay)
+        if self._stopped.is_set():
+            return None
+        try:
+            response = self._client.pull(
+                subscription=self.subscription,
+                max_messages=self.max_messages,
+                return_immediately=self.return_immediately,
+                timeout=self._timeout,
+                metadata=self._metadata,
+            )
+        except exceptions.DeadlineExceeded:
+            # A long poll that timed out without messages.
+            response = pubsub.PullResponse()
+        with self._lock:
+            self.pull_count += 1
+            if not response.received_messages:
+                self.empty_pull_count += 1
+        return response
+
+    def _nack_unclaimed(self, future: futures.Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        response = future.result()
+        if response is not None:
+            self._nack_response(response)
+
+    def _nack_response(self, response: pubsub.PullResponse) -> None:
+        ack_ids = [m.ack_id for m in response.received_messages]
+        try:
+            self.nack(ack_ids)
+        except exceptions.GoogleAPICallError as exc:
+            _LOGGER.warning('Failed to nack unclaimed messages: %r', exc)
+
+    def ack(self, ack_ids: Sequence[str]) -> None:
+        """Acknowledge messages, in as few requests as possible.
+
+        Args:
+            ack_ids (Sequence[str]): The ack IDs to acknowledge, from any
+                number of batches.
+        """
+        for start in range(0, len(ack_ids), _MAX_ACK_IDS_PER_REQUEST):
+            self._client.acknowledge(
+                subscription=self.subscription,
+                ack_ids=list(ack_ids[start:start + _MAX_ACK_IDS_PER_REQUEST]),
+                metadata=self._metadata,
+            )
+
+    def modify_ack_deadline(self, ack_ids: Sequence[str], seconds: int) -> None:
+        """Modify the ack deadline of messages, in as few requests as possible.
+
+        Args:
+            ack_ids (Sequence[str]): The ack IDs to modify.
+            seconds (int): The new deadline, counted from now. ``0`` makes
+                the messages available for redelivery immediately.
+        """
+        for start in range(0, len(ack_ids), _MAX_ACK_IDS_PER_REQUEST):
+            self._client.modify_ack_deadline(
+                subscription=self.subscription,
+                ack_ids=list(ack_ids[start:start + _MAX_ACK_IDS_PER_REQUEST]),
+                ack_deadline_seconds=seconds,
+                metadata=self._metadata,
+            )
+
+    def nack(self, ack_ids: Sequence[str]) -> None:
+        """Make messages available for redelivery immediately."""
+        self.modify_ack_deadline(ack_ids, 0)
+
+
+__all__ = (
+    'BatchPuller',
+)
@@ -16,8 +16,11 @@
 #
 
 from collections import OrderedDict
+import asyncio
+from concurrent import futures
+import functools
 import re
-from typing import Callable, Dict, Iterable, Iterator, Sequence, Tuple, Type, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, Sequence, Tuple, Type, Union
 import pkg_resources
 
 import google.api_core.client_options as ClientOptions # type: ignore
@@ -29,7 +32,19 @@ from google.oauth2 import service_account              # type: ignore
 
 from google.protobuf import duration_pb2 as duration  # type: ignore
 from google.protobuf import timestamp_pb2 as timestamp  # type: ignore
+from google.pubsub_v1.services import tracing
+from google.pubsub_v1.services.channel_options import ChannelOptions
+from google.pubsub_v1.services import metrics
+from google.pubsub_v1.services.metrics import MetricsSink
+from google.pubsub_v1.services.path_template import PathTemplate
+from google.pubsub_v1.services.profiling import Profiler
+from google.pubsub_v1.services.subscriber import batch
+from google.pubsub_v1.services.subscriber import ordering
 from google.pubsub_v1.services.subscriber import pagers
+from google.pubsub_v1.services.subscriber import streaming
+from google.pubsub_v1.services.subscriber.dedup import DuplicateFilter
+from google.pubsub_v1.services.subscriber.flow_control import FlowController
+from google.pubsub_v1.services.subscriber.latency import DeliveryMetrics
 from google.pubsub_v1.types import pubsub
 
 from .transports.base import SubscriberTransport
@@ -129,31 +144,37 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
     from_service_account_json = from_service_account_file
 
+    snapshot_path_template = PathTemplate("projects/{project}/snapshots/{snapshot}")
+    subscription_path_template = PathTemplate("projects/{project}/subscriptions/{subscription}")
+
     @staticmethod
     def snapshot_path(project: str,snapshot: str,) -> str:
         """Return a fully-qualified snapshot string."""
-        return "projects/{project}/snapshots/{snapshot}".format(project=project, snapshot=snapshot, )
+        return SubscriberClient.snapshot_path_template.format(project=project, snapshot=snapshot, )
 
     @staticmethod
     def parse_snapshot_path(path: str) -> Dict[str,str]:
         """Parse a snapshot path into its component segments."""
-        m = re.match(r"^projects/(?P<project>.+?)/snapshots/(?P<snapshot>.+?)$", path)
-        return m.groupdict() if m else {}
+        return SubscriberClient.snapshot_path_template.parse(path)
     @staticmethod
     def subscription_path(project: str,subscription: str,) -> str:
         """Return a fully-qualified subscription string."""
-        return "projects/{project}/subscriptions/{subscription}".format(project=project, subscription=subscription, )
+        return SubscriberClient.subscription_path_template.format(project=project, subscription=subscription, )
 
     @staticmethod
     def parse_subscription_path(path: str) -> Dict[str,str]:
         """Parse a subscription path into its component segments."""
-        m = re.match(r"^projects/(?P<project>.+?)/subscriptions/(?P<subscription>.+?)$", path)
-        return m.groupdict() if m else {}
+        return SubscriberClient.subscription_path_template.parse(path)
 
     def __init__(self, *,
             credentials: credentials.Credentials = None,
             transport: Union[str, SubscriberTransport] = None,
             client_options: ClientOptions = None,
+            channel_options: ChannelOptions = None,
+            lazy: bool = False,
+            metrics_sink: MetricsSink = None,
+            profiler: Profiler = None,
+            background_token_refresh: bool = False,
             ) -> None:
         """Instantiate the subscriber client.
 
@@ -174,13 +195,51 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
                 is provided, mutual TLS transport will be created with the given
                 ``api_endpoint`` or the default mTLS endpoint, and the client
                 SSL credentials obtained from ``client_cert_source``.
+                (3) A ``channel_options`` key or attribute can be used in
+                place of the ``channel_options`` argument, but not with
+                it.
+            channel_options (Optional[~.ChannelOptions]): Keepalive, window
+                and message size settings for the gRPC channel, or a dict
+                of them. Ignored if a transport instance is provided.
+            lazy (bool): Defer looking up default credentials, loading the
+                client certificate and creating the channel until the first
+                RPC. Call :meth:`warm_up_in_background` to start on them
+                without blocking. Ignored if a transport instance is
+                provided.
+            metrics_sink (Optional[~.metrics.MetricsSink]): If set, the
+                latency, sizes, status and retries of every RPC are
+                reported to it. Ignored if a transport instance is provided.
+            profiler (Optional[~.profiling.Profiler]): If set, the wall
+                and CPU time of the calls it samples, and of the callbacks
+                given to :meth:`subscribe`, is broken down by stage and
+                reported to it. Only the time before the request
+                reaches the channel is measured if a transport instance is
+                provided.
+            background_token_refresh (bool): Fetch and refresh access
+                tokens on a background thread, ahead of expiry, so that
+                no RPC waits for a refresh. Clients given the same
+                credentials object share one token. Ignored if a
+                transport instance is provided.
 
         Raises:
             google.auth.exceptions.MutualTlsChannelError: If mutual TLS transport
                 creation failed for any reason.
+            ValueError: If ``channel_options`` is given both as an argument
+                and in ``client_options``.
         """
         if isinstance(client_options, dict):
+            # ClientOptions rejects keys it does not know about.
+            client_options = dict(client_options)
+            options_channel_options = client_options.pop('channel_options', None)
             client_options = ClientOptions.from_dict(client_options)
+        else:
+            options_channel_options = getattr(client_options, 'channel_options', None)
+        if options_channel_options is not None:
+            if channel_options is not None:
+                raise ValueError('Provide channel_options either as an argument '
+                                 'or in client_options, not both.')
+            channel_options = options_channel_options
+        channel_options = ChannelOptions.from_value(channel_options)
 
         # Save or instantiate the transport.
         # Ordinarily, we provide the transport, but allowing a custom transport
@@ -198,7 +257,12 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
             # Don't trigger mTLS if we get an empty ClientOptions.
             Transport = type(self).get_transport_class(transport)
             self._transport = Transport(
-                credentials=credentials, host=self.DEFAULT_ENDPOINT
+                credentials=credentials, host=self.DEFAULT_ENDPOINT,
+                channel_options=channel_options,
+                lazy=lazy,
+                metrics_sink=metrics_sink,
+                profiler=profiler,
+                background_token_refresh=background_token_refresh,
             )
         else:
             # We have a non-empty ClientOptions. If client_cert_source is
@@ -224,8 +288,69 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
                 host=api_endpoint,
                 api_mtls_endpoint=api_mtls_endpoint,
                 client_cert_source=client_options.client_cert_source,
+                channel_options=channel_options,
+                lazy=lazy,
+                metrics_sink=metrics_sink,
+                profiler=profiler,
+                background_token_refresh=background_token_refresh,
             )
 
+        # RPC methods only open a scope for counting retries when the
+        # transport reports metrics.
+        self._wrap_method = metrics.method_wrapper(
+            getattr(self._transport, '_metrics_sink', None))
+        self._profiler = profiler
+        if profiler is not None:
+            profiler.instrument_client(self, SubscriberTransport)
+
+    def wait_for_ready(self, timeout: float = None) -> bool:
+        """Wait until the client's connection to the service is established.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait, in
+                seconds. If not set, wait indefinitely.
+
+        Returns:
+            bool: Whether the connection was established within ``timeout``.
+        """
+        return self._transport.wait_for_ready(timeout)
+
+    def warm_up(self, timeout: float = None) -> bool:
+        """Connect and fetch an access token ahead of the first RPC.
+
+        Call this after start-up and before taking traffic, so that the
+        first request does not pay for DNS, TCP, TLS, HTTP/2 and token
+        setup.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait, in
+                seconds. If not set, wait indefinitely.
+
+        Returns:
+            bool: Whether the client was ready within ``timeout``.
+        """
+        return self._transport.warm_up(timeout)
+
+    def warm_up_in_background(self, timeout: float = None) -> None:
+        """Run :meth:`warm_up` on a background thread.
+
+        Useful with ``lazy``: the first RPC then finds the channel ready,
+        or waits for it rather than creating another.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait for the
+                connection, in seconds.
+        """
+        self._transport.warm_up_in_background(timeout)
+
+    def close(self) -> None:
+        """Release the client's transport and its channel.
+
+        A channel shared with other clients through a
+        :class:`~.SharedChannel` stays open until they are closed too.
+        """
+        self._transport.close()
+
     def create_subscription(self,
             request: pubsub.Subscription = None,
             *,
@@ -345,7 +470,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.create_subscription,
             default_timeout=None,
             client_info=_client_info,
@@ -410,7 +535,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.get_subscription,
             default_timeout=None,
             client_info=_client_info,
@@ -467,7 +592,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.update_subscription,
             default_timeout=None,
             client_info=_client_info,
@@ -536,7 +661,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.list_subscriptions,
             default_timeout=None,
             client_info=_client_info,
@@ -569,6 +694,66 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
         # Done; return the response.
         return response
 
+    async def list_subscriptions_async(self,
+            request: pubsub.ListSubscriptionsRequest = None,
+            *,
+            project: str = None,
+            retry: retries.Retry = gapic_v1.method.DEFAULT,
+            timeout: float = None,
+            metadata: Sequence[Tuple[str, str]] = (),
+            executor: futures.Executor = None,
+            ) -> pagers.ListSubscriptionsAsyncPager:
+        r"""Lists matching subscriptions without blocking the event loop.
+
+        Each page is fetched by :meth:`list_subscriptions` on ``executor``, so
+        listings of many projects can run concurrently.
+
+        Args:
+            request (:class:`~.pubsub.ListSubscriptionsRequest`):
+                The request object. Request for the `ListSubscriptions` method.
+            project (:class:`str`):
+                Required. The name of the project in which to list
+                subscriptions. Format is ``projects/{project-id}``.
+                This corresponds to the ``project`` field
+                on the ``request`` instance; if ``request`` is provided, this
+                should not be set.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for this request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with the request as metadata.
+            executor (Optional[concurrent.futures.Executor]): The executor
+                to fetch pages on. If not set, the event loop's default
+                executor is used.
+
+        Returns:
+            ~.pagers.ListSubscriptionsAsyncPager:
+                Response for the ``ListSubscriptions`` method.
+
+                Iterating over this object with ``async for`` will yield
+                results and resolve additional pages automatically.
+
+        """
+        loop = asyncio.get_event_loop()
+        pager = await loop.run_in_executor(executor, functools.partial(
+            self.list_subscriptions,
+            request,
+            project=project,
+            retry=retry,
+            timeout=timeout,
+            metadata=metadata,
+        ))
+
+        async def method(request):
+            return await loop.run_in_executor(executor, pager._method, request)
+
+        return pagers.ListSubscriptionsAsyncPager(
+            method=method,
+            request=pager._request,
+            response=pager._response,
+        )
+
     def delete_subscription(self,
             request: pubsub.DeleteSubscriptionRequest = None,
             *,
@@ -618,7 +803,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.delete_subscription,
             default_timeout=None,
             client_info=_client_info,
@@ -707,7 +892,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.modify_ack_deadline,
             default_timeout=None,
             client_info=_client_info,
@@ -782,7 +967,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.acknowledge,
             default_timeout=None,
             client_info=_client_info,
@@ -874,7 +1059,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.pull,
             default_timeout=None,
             client_info=_client_info,
@@ -930,7 +1115,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.streaming_pull,
             default_timeout=None,
             client_info=_client_info,
@@ -947,6 +1132,137 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
         # Done; return the response.
         return response
 
+    def subscribe(self,
+            subscription: str,
+            callback: Callable[[streaming.Message], Any],
+            *,
+            stream_count: int = 1,
+            worker_count: int = None,
+            stream_ack_deadline_seconds: int = None,
+            dispatcher: Any = None,
+            flow_control: FlowController = None,
+            enable_message_ordering: bool = False,
+            duplicate_filter: DuplicateFilter = None,
+            tracer: tracing.Tracer = None,
+            delivery_metrics: DeliveryMetrics = None,
+            metadata: Sequence[Tuple[str, str]] = (),
+            ) -> streaming.StreamingPullManager:
+        r"""Consume a subscription over one or more streaming pulls.
+
+        Opens ``stream_count`` concurrent ``StreamingPull`` streams on the
+        subscription, each with a distinct ``client_id``, and dispatches the
+        messages they deliver to ``callback`` on a pool of worker threads.
+        Acknowledgements are sent back on the stream that delivered each
+        message.
+
+        Args:
+            subscription (str):
+                Required. The subscription to consume. Format is
+                ``projects/{project}/subscriptions/{sub}``.
+            callback (Callable[[~.streaming.Message], Any]):
+                The function called with every message. It is
+                responsible for calling ``ack()`` or ``nack()`` on it.
+                Ignored if ``dispatcher`` is provided.
+            stream_count (int): The number of concurrent streams to open.
+            worker_count (Optional[int]): The number of dispatcher threads.
+            stream_ack_deadline_seconds (Optional[int]): A fixed ack
+                deadline for every stream and lease extension, from 10 to
+                600 seconds. If not set, the 99th percentile of the
+                observed times from receipt to ack is used.
+            dispatcher (Optional[Any]): A custom dispatcher, such as a
+                :class:`~.process_pool.ProcessPoolDispatcher`, that runs
+                the message handler instead of the default thread pool.
+            flow_control (Optional[~.flow_control.FlowController]): Limits
+                on the number and total size of messages leased at once.
+                Reading pauses while a limit is reached.
+            enable_message_ordering (bool): Handle messages that share an
+                ``ordering_key`` one at a time and in order, using an
+                :class:`~.ordering.OrderedDispatcher`. Set this for
+                subscriptions created with ``enable_message_ordering``.
+                Ignored if ``dispatcher`` is provided.
+            duplicate_filter (Optional[~.dedup.DuplicateFilter]): If set,
+                redeliveries of recently acked message IDs are acked
+                without invoking the callback.
+            tracer (Optional[~.tracing.Tracer]): If set, sampled messages
+                are traced from receipt to ack, continuing the trace
+                started by the publisher.
+            delivery_metrics (Optional[~.latency.DeliveryMetrics]): If
+                set, the delivery, handler and ack latencies of every
+                message are recorded in it, under ``subscription``.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with every stream as metadata.
+
+        Returns:
+            ~.streaming.StreamingPullManager:
+                The started manager. Call ``close()`` on it to stop
+                consuming.
+        """
+        if self._profiler is not None:
+            callback = self._profiler.wrap_callback(callback)
+        if dispatcher is None and enable_message_ordering:
+            dispatcher = ordering.OrderedDispatcher(
+                callback, worker_count=worker_count)
+
+        manager = streaming.StreamingPullManager(
+            self,
+            subscription,
+            callback,
+            stream_count=stream_count,
+            worker_count=worker_count,
+            stream_ack_deadline_seconds=stream_ack_deadline_seconds,
+            dispatcher=dispatcher,
+            flow_control=flow_control,
+            duplicate_filter=duplicate_filter,
+            tracer=tracer,
+            delivery_metrics=delivery_metrics,
+            metadata=metadata,
+        )
+        return manager.start()
+
+    def pull_batches(self,
+            subscription: str,
+            *,
+            max_messages: int = 1000,
+            concurrency: int = 4,
+            return_immediately: bool = False,
+            timeout: float = None,
+            metadata: Sequence[Tuple[str, str]] = (),
+            ) -> batch.BatchPuller:
+        r"""Consume a subscription in batches with concurrent pulls.
+
+        Keeps ``concurrency`` ``Pull`` calls outstanding and yields each
+        non-empty :class:`~.pubsub.PullResponse` as it arrives. The caller
+        acks the messages, for example with the returned puller's
+        ``ack()``, which sends ack IDs in bulk.
+
+        Args:
+            subscription (str):
+                Required. The subscription to consume. Format is
+                ``projects/{project}/subscriptions/{sub}``.
+            max_messages (int): The maximum number of messages per batch.
+            concurrency (int): The number of pulls kept outstanding.
+            return_immediately (bool): Ask the server to answer pulls
+                even when no messages are available. Empty pulls are then
+                retried with backoff.
+            timeout (Optional[float]): The timeout for each pull.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with every request as metadata.
+
+        Returns:
+            ~.batch.BatchPuller:
+                An iterable of batches. Call ``close()`` on it, or use it
+                as a context manager, to stop pulling.
+        """
+        return batch.BatchPuller(
+            self,
+            subscription,
+            max_messages=max_messages,
+            concurrency=concurrency,
+            return_immediately=return_immediately,
+            timeout=timeout,
+            metadata=metadata,
+        )
+
     def modify_push_config(self,
             request: pubsub.ModifyPushConfigRequest = None,
             *,
@@ -1011,7 +1327,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.modify_push_config,
             default_timeout=None,
             client_info=_client_info,
@@ -1088,7 +1404,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.get_snapshot,
             default_timeout=None,
             client_info=_client_info,
@@ -1171,7 +1487,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.list_snapshots,
             default_timeout=None,
             client_info=_client_info,
@@ -1204,6 +1520,66 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
         # Done; return the response.
         return response
 
+    async def list_snapshots_async(self,
+            request: pubsub.ListSnapshotsRequest = None,
+            *,
+            project: str = None,
+            retry: retries.Retry = gapic_v1.method.DEFAULT,
+            timeout: float = None,
+            metadata: Sequence[Tuple[str, str]] = (),
+            executor: futures.Executor = None,
+            ) -> pagers.ListSnapshotsAsyncPager:
+        r"""Lists matching snapshots without blocking the event loop.
+
+        Each page is fetched by :meth:`list_snapshots` on ``executor``, so
+        listings of many projects can run concurrently.
+
+        Args:
+            request (:class:`~.pubsub.ListSnapshotsRequest`):
+                The request object. Request for the `ListSnapshots` method.
+            project (:class:`str`):
+                Required. The name of the project in which to list
+                snapshots. Format is ``projects/{project-id}``.
+                This corresponds to the ``project`` field
+                on the ``request`` instance; if ``request`` is provided, this
+                should not be set.
+
+            retry (google.api_core.retry.Retry): Designation of what errors, if any,
+                should be retried.
+            timeout (float): The timeout for this request.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with the request as metadata.
+            executor (Optional[concurrent.futures.Executor]): The executor
+                to fetch pages on. If not set, the event loop's default
+                executor is used.
+
+        Returns:
+            ~.pagers.ListSnapshotsAsyncPager:
+                Response for the ``ListSnapshots`` method.
+
+                Iterating over this object with ``async for`` will yield
+                results and resolve additional pages automatically.
+
+        """
+        loop = asyncio.get_event_loop()
+        pager = await loop.run_in_executor(executor, functools.partial(
+            self.list_snapshots,
+            request,
+            project=project,
+            retry=retry,
+            timeout=timeout,
+            metadata=metadata,
+        ))
+
+        async def method(request):
+            return await loop.run_in_executor(executor, pager._method, request)
+
+        return pagers.ListSnapshotsAsyncPager(
+            method=method,
+            request=pager._request,
+            response=pager._response,
+        )
+
     def create_snapshot(self,
             request: pubsub.CreateSnapshotRequest = None,
             *,
@@ -1300,7 +1676,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.create_snapshot,
             default_timeout=None,
             client_info=_client_info,
@@ -1363,7 +1739,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.update_snapshot,
             default_timeout=None,
             client_info=_client_info,
@@ -1436,7 +1812,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.delete_snapshot,
             default_timeout=None,
             client_info=_client_info,
@@ -1490,7 +1866,7 @@ class SubscriberClient(metaclass=SubscriberClientMeta):
 
         # Wrap the RPC method; this adds retry and timeout information,
         # and friendly error handling.
-        rpc = gapic_v1.method.wrap_method(
+        rpc = self._wrap_method(
             self._transport.seek,
             default_timeout=None,
             client_info=_client_info,
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import collections
+import sys
+import threading
+import time
+from typing import Dict
+
+
+class DuplicateFilter:
+    """Remember recently acked message IDs to suppress redeliveries.
+
+    Delivery is at least once, so a message may be delivered again after a
+    stream reconnects or an ack deadline is missed. When a manager is given
+    a filter, every acked ``message_id`` is recorded, and a later delivery
+    of the same ID within ``ttl`` seconds is acked straight away without
+    invoking the callback.
+
+    IDs are kept in insertion order with their timestamp, so expiring old
+    entries and evicting the least recently acked ones when ``max_size`` is
+    reached are both O(1) per entry. Membership is exact: unlike a Bloom
+    filter, the filter never reports a message it has not seen, which would
+    silently drop it.
+
+    Only acked messages are recorded. A redelivery that arrives while the
+    first delivery is still being handled is dispatched normally.
+    """
+    def __init__(self, ttl: float = 600.0, max_size: int = 1000000):
+        """Instantiate the filter.
+
+        Args:
+            ttl (float): How long, in seconds, an acked ID is remembered.
+            max_size (int): The maximum number of IDs remembered at once.
+        """
+        if max_size < 1:
+            raise ValueError('max_size must be a positive integer.')
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()  # type: Dict[str, float]
+        self._key_bytes = 0
+        self._lookups = 0
+        self._hits = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, message_id: str) -> bool:
+        """Return whether ``message_id`` was acked within the last ``ttl``.
+
+        Every call counts towards :attr:`hit_rate`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._lookups += 1
+            acked_at = self._entries.get(message_id)
+            if acked_at is None or now - acked_at > self.ttl:
+                return False
+            self._hits += 1
+            return True
+
+    def add(self, message_id: str) -> None:
+        """Record that ``message_id`` was acked.
+
+        Args:
+            message_id (str): The ID of the acked message.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if message_id in self._entries:
+                self._entries.move_to_end(message_id)
+            else:
+                self._key_bytes += sys.getsizeof(message_id)
+            self._entries[message_id] = now
+
+            cutoff = now - self.ttl
+            entries = self._entries
+            while entries:
+                oldest, acked_at = next(iter(entries.items()))
+                if acked_at >= cutoff and len(entries) <= self.max_size:
+                    break
+                del entries[oldest]
+                self._key_bytes -= sys.getsizeof(oldest)
+
+    @property
+    def lookups(self) -> int:
+        return self._lookups
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that found a duplicate."""
+        return self._hits / self._lookups if self._lookups else 0.0
+
+    @property
+    def memory_bytes(self) -> int:
+        """An estimate of the memory held by the filter, in bytes."""
+        with self._lock:
+            return (
+                sys.getsizeof(self._entries)
+                + self._key_bytes
+                + len(self._entries) * sys.getsizeof(0.0)
+            )
+
+
+__all__ = (
+    'DuplicateFilter',
+)
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import functools
+import re
+from typing import Any, Callable, List, Mapping, Optional, Sequence, Tuple
+
+from google.pubsub_v1.types import pubsub
+
+
+# The server rejects filters longer than this many bytes.
+MAX_FILTER_LENGTH = 256
+
+_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<op>!=|[():.=,-])
+      | (?P<ident>[A-Za-z0-9_][A-Za-z0-9_-]*)
+    )''', re.VERBOSE)
+
+_ESCAPE_RE = re.compile(r'\\(.)')
+
+
+class FilterSyntaxError(ValueError):
+    """Raised when a filter expression does not follow the filter grammar."""
+
+
+class _Parser:
+    """Recursive-descent parser for the subscription filter grammar.
+
+    .. code-block:: none
+
+        expr      := term { AND term } | term { OR term }
+        term      := [ NOT | '-' ] ( '(' expr ')' | predicate )
+        predicate := attributes ':' key
+                   | attributes '.' key ( '=' | '!=' ) string
+                   | hasPrefix '(' attributes '.' key ',' string ')'
+        key       := identifier | string
+
+    As on the server, ``AND`` and ``OR`` may not be mixed at one level
+    without parentheses. The parser emits a Python expression over a
+    mapping named ``a``; string literals are embedded with ``repr``.
+    """
+    def __init__(self, expression: str):
+        self._expression = expression
+        self._tokens = self._tokenize(expression)
+        self._pos = 0
+
+    def _tokenize(self, expression: str) -> List[Tuple[str, str]]:
+        tokens = []
+        pos = 0
+        stripped = expression.rstrip()
+        while pos < len(stripped):
+            match = _TOKEN_RE.match(stripped, pos)
+            if not match:
+                raise FilterSyntaxError(
+                    'Unexpected character at position {}: {!r}'.format(
+                        pos, stripped[pos:pos + 10]))
+            kind = match.lastgroup
+            tokens.append((kind, match.group(kind)))
+            pos = match.end()
+        return tokens
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+
+    def _next(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise FilterSyntaxError('Unexpected end of filter.')
+        self._pos += 1
+        return token
+
+    def _expect(self, value: str) -> None:
+        kind, text = self._next()
+        if text != value or kind == 'string':
+            raise FilterSyntaxError('Expected {!r}, got {!r}.'.format(value, text))
+
+    def _accept_keyword(self, *keywords: str) -> Optional[str]:
+        token = self._peek()
+        if token and token[0] == 'ident' and token[1] in keywords:
+            self._pos += 1
+            return token[1]
+        return None
+
+    def parse(self) -> str:
+        if not self._tokens:
+            raise FilterSyntaxError('Filter is empty.')
+        source = self._expr()
+        if self._peek() is not None:
+            raise FilterSyntaxError('Unexpected {!r}.'.format(self._peek()[1]))
+        return source
+
+    def _expr(self) -> str:
+        terms = [self._term()]
+        operator = self._accept_keyword('AND', 'OR')
+        if operator is None:
+            return terms[0]
+        terms.append(self._term())
+        while True:
+            following = self._accept_keyword('AND', 'OR')
+            if following is None:
+                break
+            if following != operator:
+                raise FilterSyntaxError(
+                    'AND and OR must be separated with parentheses.')
+            terms.append(self._term())
+        joiner = ' and ' if operator == 'AND' else ' or '
+        return '(' + joiner.join(terms) + ')'
+
+    def _term(self) -> str:
+        token = self._peek()
+        if self._accept_keyword('NOT') or (token and token == ('op', '-')):
+            if token == ('op', '-'):
+                self._pos += 1
+            return '(not {})'.format(self._term())
+        if token == ('op', '('):
+            self._pos += 1
+            inner = self._expr()
+            self._expect(')')
+            return inner
+        return self._predicate()
+
+    def _key(self) -> str:
+        kind, text = self._next()
+        if kind == 'ident':
+            return text
+        if kind == 'string':
+            return self._string(text)
+        raise FilterSyntaxError('Expected an attribute key, got {!r}.'.format(text))
+
+    def _literal(self) -> str:
+        kind, text = self._next()
+        if kind != 'string':
+            raise FilterSyntaxError('Expected a quoted string, got {!r}.'.format(text))
+        return self._string(text)
+
+    @staticmethod
+    def _string(text: str) -> str:
+        return _ESCAPE_RE.sub(r'\1', text[1:-1])
+
+    def _predicate(self) -> str:
+        if self._accept_keyword('hasPrefix'):
+            self._expect('(')
+            self._expect('attributes')
+            self._expect('.')
+            key = self._key()
+            self._expect(',')
+            prefix = self._literal()
+            self._expect(')')
+            return '({0!r} in a and a[{0!r}].startswith({1!r}))'.format(key, prefix)
+
+        self._expect('attributes')
+        kind, text = self._next()
+        if text == ':' and kind == 'op':
+            return '({!r} in a)'.format(self._key())
+        if text != '.' or kind != 'op':
+            raise FilterSyntaxError("Expected ':' or '.', got {!r}.".format(text))
+        key = self._key()
+        kind, operator = self._next()
+        if kind != 'op' or operator not in ('=', '!='):
+            raise FilterSyntaxError("Expected '=' or '!=', got {!r}.".format(operator))
+        value = self._literal()
+        if operator == '=':
+            return '(a.get({!r}) == {!r})'.format(key, value)
+        return '(a.get({!r}) != {!r})'.format(key, value)
+
+
+class Filter:
+    """A compiled subscription filter.
+
+    Use :func:`compile_filter` to build one. The expression is parsed once
+    into Python source, which is compiled into two functions: one testing a
+    single attribute mapping, and one testing a whole batch in a single
+    list comprehension, avoiding a Python call per message.
+    """
+    def __init__(self, expression: str, source: str):
+        self.expression = expression
+        self.source = source
+        namespace = {}  # type: dict
+        code = compile(
+            'def match(a):\n'
+            '    return {0}\n'
+            'def match_batch(batch):\n'
+            '    return [{0} for a in batch]\n'.format(source),
+            '<pubsub filter>', 'exec')
+        exec(code, namespace)
+        self._match = namespace['match']
+        self._match_batch = namespace['match_batch']
+
+    def matches(self, attributes: Mapping[str, str]) -> bool:
+        """Evaluate the filter against one message's attributes.
+
+        Args:
+            attributes (Mapping[str, str]): The ``attributes`` of a
+                :class:`~.pubsub.PubsubMessage`, or any equivalent mapping.
+
+        Returns:
+            bool: Whether the message matches.
+        """
+        return self._match(attributes)
+
+    __call__ = matches
+
+    def matches_batch(self, batch: Sequence[Mapping[str, str]]) -> List[bool]:
+        """Evaluate the filter against the attributes of many messages.
+
+        Args:
+            batch (Sequence[Mapping[str, str]]): One attribute mapping per
+                message.
+
+        Returns:
+            List[bool]: Whether each message matches, in order.
+        """
+        return self._match_batch(batch)
+
+    def filter_messages(self,
+            messages: Sequence[pubsub.PubsubMessage],
+            ) -> List[pubsub.PubsubMessage]:
+        """Return the messages that match, in order."""
+        results = self._match_batch([dict(m.attributes) for m in messages])
+        return [m for m, matched in zip(messages, results) if matched]
+
+    def __repr__(self) -> str:
+        return '{0}<{1!r}>'.format(self.__class__.__name__, self.expression)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_filter(expression: str) -> Filter:
+    """Parse and compile a subscription filter expression.
+
+    Compiled filters are cached, so calling this repeatedly with the same
+    expression is cheap. It can also be used to validate a filter before
+    passing it to ``Subscription.filter``.
+
+    Args:
+        expression (str): The filter, e.g.
+            ``'attributes.region = "eu" AND NOT attributes:test'``.
+
+    Returns:
+        Filter: The compiled filter.
+
+    Raises:
+        FilterSyntaxError: If the expression is not a valid filter.
+    """
+    if len(expression.encode('utf-8')) > MAX_FILTER_LENGTH:
+        raise FilterSyntaxError(
+            'Filter exceeds {} bytes.'.format(MAX_FILTER_LENGTH))
+    return Filter(expression, _Parser(expression).parse())
+
+
+class FilterRouter:
+    """Split one stream of messages across handlers by filter.
+
+    The router is itself a message callback. Each message goes to the
+    handler of the first route whose filter matches its attributes. A
+    message that matches no route goes to ``default``; if there is none it
+    is acked, as the server does for messages a subscription filter
+    excludes.
+
+    .. code-block:: python
+
+        router = FilterRouter([
+            ('attributes.type = "order"', handle_order),
+            ('hasPrefix(attributes.type, "user.")', handle_user),
+        ])
+        client.subscribe(subscription, router)
+    """
+    def __init__(self,
+            routes: Sequence[Tuple[str, Callable[[Any], Any]]],
+            default: Callable[[Any], Any] = None):
+        """Instantiate the router.
+
+        Args:
+            routes (Sequence[Tuple[str, Callable]]): Pairs of filter
+                expression and the handler for messages matching it.
+            default (Optional[Callable]): The handler for messages matching
+                no route.
+
+        Raises:
+            FilterSyntaxError: If any route's filter is invalid.
+        """
+        self._routes = [(compile_filter(expression), handler)
+                        for expression, handler in routes]
+        self._default = default
+
+    def route(self, attributes: Mapping[str, str]) -> Optional[Callable[[Any], Any]]:
+        """Return the handler for a message with these attributes."""
+        for filter_, handler in self._routes:
+            if filter_.matches(attributes):
+                return handler
+        return self._default
+
+    def __call__(self, message) -> Any:
+        handler = self.route(dict(message.message.attributes))
+        if handler is None:
+            message.ack()
+            return None
+        return handler(message)
+
+
+__all__ = (
+    'Filter',
+    'FilterRouter',
+    'FilterSyntaxError',
+    'MAX_FILTER_LENGTH',
+    'compile_filter',
+)
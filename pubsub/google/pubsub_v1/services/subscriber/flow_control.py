@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+
+
+class FlowController:
+    """Limit the messages and bytes a subscriber holds at once.
+
+    A message is outstanding from the moment it is received until it is
+    acked or nacked. When either limit is reached the controller is
+    *saturated*: streams stop reading responses, which lets gRPC's HTTP/2
+    flow control push back on the server, and reading resumes as soon as
+    enough messages are acked or nacked to drop below both limits.
+
+    Messages arrive in batches, so a single response may push the totals
+    past the limits; the overshoot is bounded by one response per stream.
+    """
+    def __init__(self,
+            max_messages: int = 1000,
+            max_bytes: int = 100 * 1024 * 1024):
+        """Instantiate the flow controller.
+
+        Args:
+            max_messages (int): The maximum number of outstanding messages.
+                Zero or less disables the limit.
+            max_bytes (int): The maximum total size, in bytes, of outstanding
+                messages. Zero or less disables the limit.
+        """
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self._messages = 0
+        self._bytes = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def outstanding_messages(self) -> int:
+        return self._messages
+
+    @property
+    def outstanding_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def saturated(self) -> bool:
+        """Whether either limit has been reached."""
+        return (
+            (self.max_messages > 0 and self._messages >= self.max_messages)
+            or (self.max_bytes > 0 and self._bytes >= self.max_bytes)
+        )
+
+    def add(self, messages: int, size: int) -> None:
+        """Account for newly received messages.
+
+        This never blocks: the messages have already been received.
+
+        Args:
+            messages (int): The number of messages received.
+            size (int): Their total size in bytes.
+        """
+        with self._condition:
+            self._messages += messages
+            self._bytes += size
+
+    def release(self, messages: int, size: int) -> None:
+        """Account for messages that were acked or nacked.
+
+        Args:
+            messages (int): The number of messages completed.
+            size (int): Their total size in bytes.
+        """
+        with self._condition:
+            self._messages = max(0, self._messages - messages)
+            self._bytes = max(0, self._bytes - size)
+            if not self.saturated:
+                self._condition.notify_all()
+
+    def wait_for_capacity(self, timeout: float = None) -> bool:
+        """Block until the controller is not saturated.
+
+        Args:
+            timeout (Optional[float]): The longest time to wait, in seconds.
+
+        Returns:
+            bool: ``True`` if there is capacity (or the controller was
+                closed), ``False`` if the wait timed out.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._closed or not self.saturated, timeout=timeout)
+
+    def close(self) -> None:
+        """Wake every waiter and stop blocking from now on."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+__all__ = (
+    'FlowController',
+)
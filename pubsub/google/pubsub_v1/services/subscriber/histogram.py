@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import math
+import threading
+
+# The range the server accepts for an ack deadline, in seconds.
+MIN_ACK_DEADLINE = 10
+MAX_ACK_DEADLINE = 600
+
+
+class Histogram:
+    """A histogram of durations in whole seconds with fixed buckets.
+
+    There is one bucket per second between ``min_value`` and ``max_value``
+    inclusive; samples outside that range are clamped into it. Inserting a
+    sample is O(1) and a percentile query is linear in the (small, fixed)
+    number of buckets, independent of the number of samples.
+
+    With the default range this is used to pick ack deadlines: the
+    ``percentile(99)`` of the observed times from receipt to ack, which
+    include the time a message waits for a worker as well as the handler,
+    is the shortest deadline that rarely expires before a message is
+    acked, and is always a value the server accepts.
+    """
+    def __init__(self,
+            min_value: int = MIN_ACK_DEADLINE,
+            max_value: int = MAX_ACK_DEADLINE):
+        """Instantiate the histogram.
+
+        Args:
+            min_value (int): The smallest bucket, in seconds.
+            max_value (int): The largest bucket, in seconds.
+        """
+        if min_value > max_value:
+            raise ValueError('min_value must not exceed max_value.')
+        self.min_value = min_value
+        self.max_value = max_value
+        self._buckets = [0] * (max_value - min_value + 1)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, seconds: float) -> None:
+        """Record a duration.
+
+        Args:
+            seconds (float): The duration; it is rounded up to whole
+                seconds and clamped to the histogram's range.
+        """
+        value = min(max(int(math.ceil(seconds)), self.min_value), self.max_value)
+        with self._lock:
+            self._buckets[value - self.min_value] += 1
+            self._count += 1
+
+    def percentile(self, percent: float) -> int:
+        """Return the duration at or below which ``percent`` of samples fall.
+
+        Args:
+            percent (float): The percentile to compute, from 0 to 100.
+
+        Returns:
+            int: The duration in seconds. An empty histogram returns
+                ``min_value``.
+        """
+        with self._lock:
+            target = self._count * percent / 100.0
+            seen = 0
+            for index, count in enumerate(self._buckets):
+                seen += count
+                if count and seen >= target:
+                    return self.min_value + index
+        return self.min_value
+
+
+__all__ = (
+    'Histogram',
+    'MAX_ACK_DEADLINE',
+    'MIN_ACK_DEADLINE',
+)
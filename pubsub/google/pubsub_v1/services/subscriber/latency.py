@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+from typing import Dict
+
+from google.pubsub_v1.services.metrics import ExponentialHistogram
+
+# The latencies recorded for every subscription.
+DELIVERY = 'delivery'
+HANDLER = 'handler'
+ACK = 'ack'
+_KINDS = (DELIVERY, HANDLER, ACK)
+
+
+class DeliveryMetrics:
+    """Latency histograms of message delivery, per subscription.
+
+    Three latencies are recorded for every message, in seconds:
+
+    * ``delivery``: from the message's ``publish_time`` to its receipt by
+      the subscriber. It grows with the subscription's backlog, so its
+      percentiles are the earliest signal of a consumer falling behind.
+      It relies on the publisher's and the subscriber's clocks agreeing.
+    * ``handler``: from the start of the handler to its ack or nack.
+    * ``ack``: from receipt to ack, including the time spent waiting for
+      a worker. A message whose ack latency approaches the ack deadline is
+      at risk of redelivery.
+
+    Histograms are :class:`~.metrics.ExponentialHistogram`s, so recording
+    is constant time and percentile queries do not depend on the number of
+    messages. One instance can be shared by several managers; each records
+    under its own subscription.
+
+    .. code-block:: python
+
+        metrics = DeliveryMetrics()
+        subscriber.subscribe(subscription, callback, delivery_metrics=metrics)
+        ...
+        if metrics.percentile(subscription, 'delivery', 99) > 60:
+            alert()
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}  # type: Dict[str, Dict[str, ExponentialHistogram]]
+
+    def record(self, subscription: str, kind: str, seconds: float) -> None:
+        """Record one latency.
+
+        Args:
+            subscription (str): The subscription the message came from.
+            kind (str): One of ``delivery``, ``handler`` and ``ack``.
+            seconds (float): The latency. Negative values, from clock
+                skew between publisher and subscriber, count as zero.
+        """
+        seconds = max(seconds, 0.0)
+        # Under the lock, so that a reset cannot swap the histograms out
+        # between looking them up and adding to them.
+        with self._lock:
+            histograms = self._subscriptions.get(subscription)
+            if histograms is None:
+                histograms = self._subscriptions[subscription] = {
+                    kind: ExponentialHistogram() for kind in _KINDS}
+            histograms[kind].add(seconds)
+
+    def percentile(self, subscription: str, kind: str, percent: float) -> float:
+        """Return a percentile of one latency, in seconds.
+
+        Returns ``0.0`` if nothing was recorded for the subscription.
+        """
+        histograms = self._subscriptions.get(subscription)
+        if histograms is None:
+            return 0.0
+        return histograms[kind].percentile(percent)
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Summarize every latency of every subscription.
+
+        Args:
+            reset (bool): Start new histograms, so that the next snapshot
+                only covers messages recorded after this one. Use it to
+                alert on recent latencies rather than on the whole
+                lifetime of the process.
+
+        Returns:
+            Dict[str, Dict[str, Dict[str, float]]]: The count, mean, max
+                and percentiles of each latency, keyed by subscription and
+                then by kind.
+        """
+        with self._lock:
+            subscriptions = self._subscriptions
+            if reset:
+                self._subscriptions = {}
+        return {
+            subscription: {kind: h.summary() for kind, h in histograms.items()}
+            for subscription, histograms in subscriptions.items()
+        }
+
+
+__all__ = (
+    'ACK',
+    'DELIVERY',
+    'DeliveryMetrics',
+    'HANDLER',
+)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import collections
+import logging
+import os
+import threading
+from concurrent import futures
+from typing import Any, Callable, Deque, Dict
+
+from google.pubsub_v1.services.subscriber.streaming import Message
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OrderedDispatcher:
+    """Dispatch messages of ordered subscriptions.
+
+    For subscriptions with ``enable_message_ordering`` set, messages that
+    share an ``ordering_key`` must be handled one at a time, in the order
+    they were delivered. This dispatcher keeps a queue per ordering key and
+    runs at most one callback per key at any moment, while different keys
+    (and messages without a key) run in parallel on a bounded pool of
+    ``worker_count`` threads.
+
+    Unlike :class:`~.streaming.HashPartitionedDispatcher`, a slow key only
+    delays its own messages: a worker is never pinned to a key, so other
+    keys keep every worker busy. After each message the key's remaining
+    work is requeued behind other ready keys, so one busy key cannot
+    starve the rest.
+
+    If the callback raises, the message is nacked together with every
+    message still queued for its key. The server redelivers them in order,
+    and nothing later in the key runs before the failed message.
+
+    Messages dispatched once :meth:`close` has been called, such as those
+    still arriving on a stream, are nacked.
+    """
+    def __init__(self,
+            callback: Callable[[Message], Any],
+            worker_count: int = None):
+        """Instantiate the dispatcher.
+
+        Args:
+            callback (Callable[[~.streaming.Message], Any]): The function
+                called with every message. It is responsible for acking or
+                nacking it.
+            worker_count (Optional[int]): The number of worker threads. If
+                not set, four more than the number of CPUs is used,
+                capped at 32.
+        """
+        if worker_count is None:
+            worker_count = min(32, (os.cpu_count() or 1) + 4)
+        if worker_count < 1:
+            raise ValueError('worker_count must be a positive integer.')
+        self._callback = callback
+        self._worker_count = worker_count
+        self._executor = None  # type: Any
+        self._queues = {}  # type: Dict[str, Deque[Message]]
+        self._unkeyed = 0
+        self._closed = False
+        self._idle = threading.Condition()
+
+    @property
+    def worker_count(self) -> int:
+        return self._worker_count
+
+    @property
+    def active_keys(self) -> int:
+        """The number of ordering keys with queued or running messages."""
+        return len(self._queues)
+
+    def start(self) -> None:
+        """Start the worker pool."""
+        self._executor = futures.ThreadPoolExecutor(
+            max_workers=self._worker_count,
+            thread_name_prefix='Thread-PubsubOrderedDispatcher',
+        )
+
+    def dispatch(self, message: Message) -> None:
+        """Queue a message behind earlier messages with the same key.
+
+        Args:
+            message (~.streaming.Message): The message to dispatch.
+        """
+        key = message.message.ordering_key
+        with self._idle:
+            closed = self._closed
+            if not closed:
+                if not key:
+                    self._unkeyed += 1
+                    self._executor.submit(self._run_unkeyed, message)
+                    return
+                pending = self._queues.get(key)
+                if pending is not None:
+                    # The key is already scheduled; its drain picks this up.
+                    pending.append(message)
+                    return
+                self._queues[key] = collections.deque([message])
+        if closed:
+            # Too late to be handled; the server redelivers it.
+            message.nack()
+            return
+        self._executor.submit(self._drain, key)
+
+    def close(self) -> None:
+        """Stop the worker pool once every queued message is handled."""
+        with self._idle:
+            self._closed = True
+            self._idle.wait_for(lambda: not self._queues and not self._unkeyed)
+        self._executor.shutdown(wait=True)
+
+    def _handle(self, message: Message) -> bool:
+        message._start_handler()
+        try:
+            self._callback(message)
+        except Exception:
+            _LOGGER.exception('Callback raised for message %r; nacking.', message)
+            message.nack()
+            return False
+        return True
+
+    def _run_unkeyed(self, message: Message) -> None:
+        try:
+            self._handle(message)
+        finally:
+            with self._idle:
+                self._unkeyed -= 1
+                self._idle.notify_all()
+
+    def _drain(self, key: str) -> None:
+        with self._idle:
+            message = self._queues[key][0]
+
+        failed = not self._handle(message)
+
+        with self._idle:
+            pending = self._queues[key]
+            pending.popleft()
+            if failed:
+                # Later messages must not overtake the failed one.
+                skipped = list(pending)
+                pending.clear()
+            else:
+                skipped = []
+            if not pending:
+                del self._queues[key]
+                self._idle.notify_all()
+                more = False
+            else:
+                more = True
+        for message in skipped:
+            message.nack()
+        if more:
+            self._executor.submit(self._drain, key)
+
+
+__all__ = (
+    'OrderedDispatcher',
+)
@@ -15,7 +15,7 @@
 # limitations under the License.
 #
 
-from typing import Any, Callable, Iterable
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable
 
 from google.pubsub_v1.types import pubsub
 
@@ -128,3 +128,121 @@ class ListSnapshotsPager:
 
     def __repr__(self) -> str:
         return '{0}<{1!r}>'.format(self.__class__.__name__, self._response)
+
+
+class ListSubscriptionsAsyncPager:
+    """An asyncio pager for iterating through ``list_subscriptions`` requests.
+
+    This class thinly wraps an initial
+    :class:`~.pubsub.ListSubscriptionsResponse` object, and
+    provides an ``__aiter__`` method to iterate through its
+    ``subscriptions`` field.
+
+    If there are more pages, the ``__aiter__`` method will make additional
+    ``ListSubscriptions`` requests and continue to iterate
+    through the ``subscriptions`` field on the
+    corresponding responses.
+
+    All the usual :class:`~.pubsub.ListSubscriptionsResponse`
+    attributes are available on the pager. If multiple requests are made, only
+    the most recent response is retained, and thus used for attribute lookup.
+    """
+    def __init__(self,
+            method: Callable[[pubsub.ListSubscriptionsRequest],
+                Awaitable[pubsub.ListSubscriptionsResponse]],
+            request: pubsub.ListSubscriptionsRequest,
+            response: pubsub.ListSubscriptionsResponse):
+        """Instantiate the pager.
+
+        Args:
+            method (Callable): A coroutine function that fetches the next
+                page.
+            request (:class:`~.pubsub.ListSubscriptionsRequest`):
+                The initial request object.
+            response (:class:`~.pubsub.ListSubscriptionsResponse`):
+                The initial response object.
+        """
+        self._method = method
+        self._request = pubsub.ListSubscriptionsRequest(request)
+        self._response = response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._response, name)
+
+    @property
+    async def pages(self) -> AsyncIterable[pubsub.ListSubscriptionsResponse]:
+        yield self._response
+        while self._response.next_page_token:
+            self._request.page_token = self._response.next_page_token
+            self._response = await self._method(self._request)
+            yield self._response
+
+    def __aiter__(self) -> AsyncIterable[pubsub.Subscription]:
+        async def async_generator():
+            async for page in self.pages:
+                for response in page.subscriptions:
+                    yield response
+
+        return async_generator()
+
+    def __repr__(self) -> str:
+        return '{0}<{1!r}>'.format(self.__class__.__name__, self._response)
+
+
+class ListSnapshotsAsyncPager:
+    """An asyncio pager for iterating through ``list_snapshots`` requests.
+
+    This class thinly wraps an initial
+    :class:`~.pubsub.ListSnapshotsResponse` object, and
+    provides an ``__aiter__`` method to iterate through its
+    ``snapshots`` field.
+
+    If there are more pages, the ``__aiter__`` method will make additional
+    ``ListSnapshots`` requests and continue to iterate
+    through the ``snapshots`` field on the
+    corresponding responses.
+
+    All the usual :class:`~.pubsub.ListSnapshotsResponse`
+    attributes are available on the pager. If multiple requests are made, only
+    the most recent response is retained, and thus used for attribute lookup.
+    """
+    def __init__(self,
+            method: Callable[[pubsub.ListSnapshotsRequest],
+                Awaitable[pubsub.ListSnapshotsResponse]],
+            request: pubsub.ListSnapshotsRequest,
+            response: pubsub.ListSnapshotsResponse):
+        """Instantiate the pager.
+
+        Args:
+            method (Callable): A coroutine function that fetches the next
+                page.
+            request (:class:`~.pubsub.ListSnapshotsRequest`):
+                The initial request object.
+            response (:class:`~.pubsub.ListSnapshotsResponse`):
+                The initial response object.
+        """
+        self._method = method
+        self._request = pubsub.ListSnapshotsRequest(request)
+        self._response = response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._response, name)
+
+    @property
+    async def pages(self) -> AsyncIterable[pubsub.ListSnapshotsResponse]:
+        yield self._response
+        while self._response.next_page_token:
+            self._request.page_token = self._response.next_page_token
+            self._response = await self._method(self._request)
+            yield self._response
+
+    def __aiter__(self) -> AsyncIterable[pubsub.Snapshot]:
+        async def async_generator():
+            async for page in self.pages:
+                for response in page.snapshots:
+                    yield response
+
+        return async_generator()
+
+    def __repr__(self) -> str:
+        return '{0}<{1!r}>'.format(self.__class__.__name__, self._response)
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from multiprocessing import connection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: NO COVER
+    # Python < 3.8: payloads are sent over the pipe instead.
+    shared_memory = None  # type: ignore
+
+from google.pubsub_v1.services.subscriber.streaming import Message
+from google.pubsub_v1.types import pubsub
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# Slot index used for payloads that were sent over the pipe rather than
+# through shared memory.
+_INLINE = -1
+
+
+def _worker_main(
+        shm_name: Optional[str],
+        conn: connection.Connection,
+        handler: Callable[[pubsub.PubsubMessage], bool]) -> None:
+    """Entry point of a worker process.
+
+    Receives ``(token, slot, offset, length, inline)`` tuples over ``conn``,
+    decodes the ``PubsubMessage`` either from shared memory or from
+    ``inline``, runs ``handler`` and replies with ``(token, ack)``. A ``None``
+    work item ends the loop.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name) if shm_name else None
+    try:
+        while True:
+            work = conn.recv()
+            if work is None:
+                return
+            token, slot, offset, length, inline = work
+            if slot == _INLINE:
+                payload = inline
+            else:
+                payload = bytes(shm.buf[offset:offset + length])
+            try:
+                ack = bool(handler(pubsub.PubsubMessage.deserialize(payload)))
+            except Exception:
+                _LOGGER.exception('Handler raised in worker process %d.', os.getpid())
+                ack = False
+            conn.send((token, ack))
+    finally:
+        if shm is not None:
+            shm.close()
+
+
+class ProcessPoolDispatcher:
+    """Dispatch messages to a pool of worker processes.
+
+    Message callbacks run under the GIL, so a CPU-bound handler in a
+    :class:`~.streaming.HashPartitionedDispatcher` is limited to a single
+    core. This dispatcher instead runs ``handler`` in ``process_count``
+    worker processes.
+
+    Each message's ``PubsubMessage`` is serialized into a fixed-size slot of
+    a shared memory segment, and only the slot coordinates travel over the
+    worker's pipe. The handler returns ``True`` to ack or ``False`` to nack;
+    the decision comes back over the same pipe and is applied in the parent,
+    which keeps all ack and lease bookkeeping. Payloads larger than
+    ``slot_size`` are sent over the pipe directly.
+
+    Messages are assigned to workers by hashing their ordering key (or
+    message ID), as the thread dispatcher does. When every slot is in use,
+    ``dispatch`` blocks, which in turn stops the stream from being read.
+
+    A worker that dies is replaced as soon as its pipe reports EOF; the
+    messages it held, and any sent to it before it was replaced, are
+    nacked so the server redelivers them.
+
+    ``handler`` must be picklable (for example, a module-level function),
+    because worker processes are started with the ``spawn`` method by
+    default.
+    """
+    def __init__(self,
+            handler: Callable[[pubsub.PubsubMessage], bool],
+            process_count: int = None,
+            *,
+            slot_size: int = 64 * 1024,
+            slots_per_process: int = 16,
+            mp_context: Any = None):
+        """Instantiate the dispatcher.
+
+        Args:
+            handler (Callable[[~.pubsub.PubsubMessage], bool]): The function
+                run in a worker process for every message. It returns
+                whether the message should be acked.
+            process_count (Optional[int]): The number of worker processes.
+                Defaults to the number of CPUs.
+            slot_size (int): The size in bytes of each shared memory slot.
+            slots_per_process (int): The number of slots allotted per worker
+                process; this bounds the number of messages in flight.
+            mp_context (Optional[multiprocessing.context.BaseContext]): The
+                multiprocessing context used to start workers. Defaults to
+                the ``spawn`` context.
+        """
+        if process_count is None:
+            process_count = os.cpu_count() or 1
+        if process_count < 1:
+            raise ValueError('process_count must be a positive integer.')
+        self._handler = handler
+        self._process_count = process_count
+        self._slot_size = slot_size
+        self._slot_count = process_count * slots_per_process
+        self._context = mp_context or multiprocessing.get_context('spawn')
+
+        self._shm = None  # type: Any
+        self._free_slots = queue.Queue()  # type: queue.Queue
+        self._in_flight = threading.BoundedSemaphore(self._slot_count)
+        self._processes = []  # type: List[Any]
+        self._connections = []  # type: List[connection.Connection]
+        self._send_locks = []  # type: List[threading.Lock]
+        self._pending = {}  # type: Dict[int, Tuple[Message, int, int]]
+        self._pending_lock = threading.Lock()
+        self._tokens = itertools.count()
+        self._collector = None  # type: Optional[threading.Thread]
+        self._closing = False
+
+    @property
+    def worker_count(self) -> int:
+        return self._process_count
+
+    @property
+    def pending(self) -> int:
+        """The number of messages handed to workers and not yet decided."""
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Allocate shared memory and start the worker processes."""
+        if shared_memory is not None:
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=self._slot_size * self._slot_count)
+            for slot in range(self._slot_count):
+                self._free_slots.put(slot)
+
+        for _ in range(self._process_count):
+            process, parent_conn = self._start_worker()
+            self._processes.append(process)
+            self._connections.append(parent_conn)
+            self._send_locks.append(threading.Lock())
+
+        self._collector = threading.Thread(
+            name='Thread-PubsubProcessPoolCollector',
+            target=self._collect,
+            daemon=True,
+        )
+        self._collector.start()
+
+    def dispatch(self, message: Message) -> None:
+        """Send a message to the worker that owns its partition.
+
+        Args:
+            message (~.streaming.Message): The message to dispatch.
+        """
+        payload = pubsub.PubsubMessage.serialize(message.message)
+        self._in_flight.acquire()
+
+        slot, offset, inline = _INLINE, 0, payload  # type: Tuple[int, int, Any]
+        if self._shm is not None and len(payload) <= self._slot_size:
+            slot = self._free_slots.get()
+            offset = slot * self._slot_size
+            self._shm.buf[offset:offset + len(payload)] = payload
+            inline = None
+
+        token = next(self._tokens)
+        key = message.message.ordering_key or message.message.message_id
+        index = hash(key) % self._process_count
+        message._start_handler()
+        with self._send_locks[index]:
+            # Registered under the send lock, so a worker found dead in the
+            # meantime does not take the message with it.
+            with self._pending_lock:
+                self._pending[token] = (message, slot, index)
+            try:
+                self._connections[index].send(
+                    (token, slot, offset, len(payload), inline))
+                return
+            except OSError:
+                # The worker died; the collector replaces it.
+                _LOGGER.warning('Worker process %d is gone; nacking message.', index)
+        self._decide(token, False)
+
+    def close(self) -> None:
+        """Stop the workers once they have decided every pending message."""
+        for index, lock in enumerate(self._send_locks):
+            with lock:
+                self._closing = True
+                try:
+                    self._connections[index].send(None)
+                except OSError:
+                    pass
+        for process in self._processes:
+            process.join()
+        if self._collector is not None:
+            self._collector.join()
+            self._collector = None
+        for conn in self._connections:
+            conn.close()
+        self._processes = []
+        self._connections = []
+        self._send_locks = []
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def _start_worker(self) -> Tuple[Any, connection.Connection]:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self._shm.name if self._shm is not None else None,
+                  child_conn, self._handler),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _collect(self) -> None:
+        # Apply ack/nack decisions as they come back from the workers. A
+        # worker's pipe reports EOF once it has exited.
+        open_conns = {conn: index for index, conn in enumerate(self._connections)}
+        while open_conns:
+            for conn in connection.wait(list(open_conns)):
+                try:
+                    token, ack = conn.recv()
+                except (EOFError, OSError):
+                    index = open_conns.pop(conn)
+                    replacement = self._worker_exited(index)
+                    if replacement is not None:
+                        open_conns[replacement] = index
+                    continue
+                self._decide(token, ack)
+
+        # Anything still pending belongs to a worker that died.
+        with self._pending_lock:
+            orphans = list(self._pending)
+        for token in orphans:
+            self._decide(token, False)
+
+    def _worker_exited(self, index: int) -> Optional[connection.Connection]:
+        """Nack the messages of an exited worker and replace it.
+
+        Returns:
+            Optional[multiprocessing.connection.Connection]: The pipe to
+                the new worker, or ``None`` if the dispatcher is closing.
+        """
+        replacement = None
+        with self._send_locks[index]:
+            if not self._closing:
+                self._processes[index].join()
+                _LOGGER.warning(
+                    'Worker process %d exited with code %s; restarting it.',
+                    index, self._processes[index].exitcode)
+                self._connections[index].close()
+                self._processes[index], replacement = self._start_worker()
+                self._connections[index] = replacement
+            with self._pending_lock:
+                orphans = [token for token, (_, _, worker) in self._pending.items()
+                           if worker == index]
+        for token in orphans:
+            self._decide(token, False)
+        return replacement
+
+    def _decide(self, token: int, ack: bool) -> None:
+        with self._pending_lock:
+            if token not in self._pending:
+                # Already nacked because its worker exited.
+                return
+            message, slot, _ = self._pending.pop(token)
+        if slot != _INLINE:
+            self._free_slots.put(slot)
+        self._in_flight.release()
+        if ack:
+            message.ack()
+        else:
+            message.nack()
+
+
+__all__ = (
+    'ProcessPoolDispatcher',
+)
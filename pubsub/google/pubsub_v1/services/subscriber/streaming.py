@@ -0,0 +1,835 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from google.api_core import exceptions
+from google.pubsub_v1.services import tracing
+from google.pubsub_v1.services.subscriber.dedup import DuplicateFilter
+from google.pubsub_v1.services.subscriber.flow_control import FlowController
+from google.pubsub_v1.services.subscriber.histogram import Histogram
+from google.pubsub_v1.services.subscriber.histogram import MAX_ACK_DEADLINE
+from google.pubsub_v1.services.subscriber.histogram import MIN_ACK_DEADLINE
+from google.pubsub_v1.services.subscriber.latency import ACK, DELIVERY, HANDLER, DeliveryMetrics
+from google.pubsub_v1.types import pubsub
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sentinel placed on a queue to tell its consumer to exit.
+_STOP = object()
+
+# The server rejects a single ``StreamingPullRequest`` carrying more ack IDs
+# than this, so queued acknowledgements are flushed in chunks of this size.
+_MAX_ACK_IDS_PER_REQUEST = 2500
+
+# The longest a closing stream waits for its queued requests to be sent
+# before the call is cancelled.
+_CLOSE_TIMEOUT = 5.0
+
+# Fraction of the ack deadline after which leases are extended, leaving
+# headroom for the modify request to reach the server.
+_LEASE_EXTENSION_RATIO = 0.8
+
+# Errors after which a stream is re-established rather than abandoned.
+_RETRYABLE_STREAM_ERRORS = (
+    exceptions.Aborted,
+    exceptions.DeadlineExceeded,
+    exceptions.GatewayTimeout,
+    exceptions.InternalServerError,
+    exceptions.ServiceUnavailable,
+    exceptions.Unknown,
+)
+
+
+class Message:
+    """A message received on a streaming pull.
+
+    This wraps a :class:`~.pubsub.ReceivedMessage` and remembers which stream
+    delivered it, so that ``ack``, ``nack`` and ``modify_ack_deadline`` are
+    sent back on that same stream.
+    """
+    def __init__(self,
+            received_message: pubsub.ReceivedMessage,
+            stream: '_Stream',
+            manager: 'StreamingPullManager'):
+        """Instantiate the message.
+
+        Args:
+            received_message (:class:`~.pubsub.ReceivedMessage`):
+                The message as delivered by the server.
+            stream (_Stream): The stream that delivered the message.
+            manager (StreamingPullManager): The manager that owns the lease
+                on the message.
+        """
+        self._received_message = received_message
+        self._stream = stream
+        self._manager = manager
+        self._done = False
+        self.received_time = time.monotonic()
+        self.handler_start_time = None  # type: Optional[float]
+        self.size = pubsub.ReceivedMessage.pb(received_message).ByteSize()
+        # The ``receive`` span, while the message is handled and sampled.
+        self.span = None  # type: Optional[tracing.Span]
+
+    @property
+    def ack_id(self) -> str:
+        return self._received_message.ack_id
+
+    @property
+    def message(self) -> pubsub.PubsubMessage:
+        return self._received_message.message
+
+    @property
+    def delivery_attempt(self) -> int:
+        return self._received_message.delivery_attempt
+
+    @property
+    def stream(self) -> '_Stream':
+        """The stream that delivered this message."""
+        return self._stream
+
+    def ack(self) -> None:
+        """Acknowledge the message on the stream that delivered it."""
+        self._manager._complete(self, ack=True)
+
+    def nack(self) -> None:
+        """Make the message available for immediate redelivery."""
+        self._manager._complete(self, ack=False)
+
+    def _start_handler(self) -> None:
+        # Called by dispatchers just before the handler runs.
+        self.handler_start_time = time.monotonic()
+        if self.span is not None:
+            self.span.add_event('handler_start')
+
+    def modify_ack_deadline(self, seconds: int) -> None:
+        """Change the ack deadline of the message.
+
+        Args:
+            seconds (int): The new ack deadline, relative to now.
+        """
+        self._stream.modify_ack_deadline([self.ack_id], seconds)
+
+    def __repr__(self) -> str:
+        return '{0}<{1!r}>'.format(self.__class__.__name__, self.ack_id)
+
+
+class HashPartitionedDispatcher:
+    """Dispatch messages to a fixed set of worker threads.
+
+    Each worker owns its own queue. A message is routed to the worker at
+    ``hash(key) % worker_count``, where the key is the message's
+    ``ordering_key`` if it has one and its ``message_id`` otherwise. Messages
+    that share an ordering key therefore always land on the same worker, and
+    unkeyed messages spread evenly across all of them.
+
+    If the callback raises, the message is nacked so that it is redelivered.
+    """
+    def __init__(self,
+            callback: Callable[[Message], Any],
+            worker_count: int = None):
+        """Instantiate the dispatcher.
+
+        Args:
+            callback (Callable[[Message], Any]): The function called with every
+                message. It is responsible for acking or nacking it.
+            worker_count (Optional[int]): The number of worker threads. If
+                not set, four more than the number of CPUs is used,
+                capped at 32.
+        """
+        if worker_count is None:
+            worker_count = min(32, (os.cpu_count() or 1) + 4)
+        if worker_count < 1:
+            raise ValueError('worker_count must be a positive integer.')
+        self._callback = callback
+        self._queues = [queue.Queue() for _ in range(worker_count)]  # type: List[queue.Queue]
+        self._threads = []  # type: List[threading.Thread]
+
+    @property
+    def worker_count(self) -> int:
+        return len(self._queues)
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        for index, work in enumerate(self._queues):
+            thread = threading.Thread(
+                name='Thread-PubsubDispatcher-{}'.format(index),
+                target=self._work,
+                args=(work,),
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def dispatch(self, message: Message) -> None:
+        """Queue a message on the worker that owns its partition.
+
+        Args:
+            message (Message): The message to dispatch.
+        """
+        key = message.message.ordering_key or message.message.message_id
+        self._queues[hash(key) % len(self._queues)].put(message)
+
+    def close(self) -> None:
+        """Stop the worker threads once their queues are drained."""
+        for work in self._queues:
+            work.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _work(self, work: queue.Queue) -> None:
+        while True:
+            message = work.get()
+            if message is _STOP:
+                return
+            message._start_handler()
+            try:
+                self._callback(message)
+            except Exception:
+                _LOGGER.exception('Callback raised for message %r; nacking.', message)
+                message.nack()
+
+
+class _Stream:
+    """A single ``StreamingPull`` RPC owned by a :class:`StreamingPullManager`.
+
+    Acknowledgements and deadline modifications are queued and sent on the
+    request side of the stream; when several are queued at once they are
+    merged into a single ``StreamingPullRequest``.
+
+    The server closes streams routinely (for example with ``UNAVAILABLE``
+    to rebalance). When that happens, or the stream fails with another
+    retryable error, it is re-established after a randomized exponential
+    backoff ("full jitter"), so that a fleet of consumers disconnected at
+    once does not reconnect at once. Messages leased through the old
+    connection stay leased: their deadlines are extended on the new one.
+    Any other error ends the stream and is kept in :attr:`error`.
+    """
+    def __init__(self, manager: 'StreamingPullManager', client_id: str):
+        self._manager = manager
+        self.client_id = client_id
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()  # type: queue.Queue
+        # Set once the request generator of the current connection has
+        # sent everything queued before ``_STOP``.
+        self._drained = threading.Event()
+        self._responses = None  # type: Any
+        self._thread = None  # type: Optional[threading.Thread]
+
+        # The lease, in seconds, that messages delivered on the current
+        # connection start with; fixed when the connection opens.
+        self.ack_deadline = None  # type: Optional[int]
+
+        # Health.
+        self.connected = False
+        self.reconnects = 0
+        self.last_message_time = None  # type: Optional[float]
+        self.error = None  # type: Optional[Exception]
+
+    def ack(self, ack_ids: Sequence[str]) -> None:
+        """Queue ack IDs to be acknowledged on this stream."""
+        if ack_ids:
+            with self._lock:
+                self._requests.put((list(ack_ids), [], 0))
+
+    def modify_ack_deadline(self, ack_ids: Sequence[str], seconds: int) -> None:
+        """Queue a deadline modification for ack IDs on this stream."""
+        if ack_ids:
+            with self._lock:
+                self._requests.put(([], list(ack_ids), seconds))
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            name='Thread-PubsubStream-{}'.format(self.client_id),
+            target=self._run,
+            daemon=True,
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        with self._lock:
+            self._requests.put(_STOP)
+            responses = self._responses
+            drained = self._drained
+        # Half-closing the request side does not end the response side, so
+        # the call is cancelled to unblock the reader thread, once the
+        # acks queued before the stop have been sent. Before the first
+        # response arrives there is nothing to cancel yet; the daemon
+        # thread is then left to exit on its own.
+        cancel = getattr(responses, 'cancel', None)
+        if cancel is not None:
+            if not drained.wait(_CLOSE_TIMEOUT):
+                _LOGGER.warning(
+                    'Stream %s did not send its last requests within %s seconds.',
+                    self.client_id, _CLOSE_TIMEOUT)
+            cancel()
+            if self._thread is not threading.current_thread():
+                self._thread.join()
+
+    def _initial_request(self) -> pubsub.StreamingPullRequest:
+        self.ack_deadline = self._manager.ack_deadline
+        return pubsub.StreamingPullRequest(
+            subscription=self._manager.subscription,
+            stream_ack_deadline_seconds=self.ack_deadline,
+            client_id=self.client_id,
+        )
+
+    def _request_generator(self,
+            requests: queue.Queue,
+            drained: threading.Event) -> Iterator[pubsub.StreamingPullRequest]:
+        yield self._initial_request()
+        while True:
+            item = requests.get()
+            if item is _STOP:
+                drained.set()
+                return
+            pending = [item]
+            while True:
+                try:
+                    item = requests.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    yield from self._merge(pending)
+                    # Set once gRPC asks for the request after the last one,
+                    # that is, once the last one has been sent.
+                    drained.set()
+                    return
+                pending.append(item)
+            yield from self._merge(pending)
+
+    @staticmethod
+    def _merge(pending: List[Tuple[List[str], List[str], int]],
+            ) -> Iterator[pubsub.StreamingPullRequest]:
+        ack_ids = []  # type: List[str]
+        modify_ack_ids = []  # type: List[str]
+        modify_seconds = []  # type: List[int]
+        for acks, modifies, seconds in pending:
+            ack_ids.extend(acks)
+            modify_ack_ids.extend(modifies)
+            modify_seconds.extend([seconds] * len(modifies))
+
+        for start in range(0, max(len(ack_ids), len(modify_ack_ids)), _MAX_ACK_IDS_PER_REQUEST):
+            end = start + _MAX_ACK_IDS_PER_REQUEST
+            yield pubsub.StreamingPullRequest(
+                ack_ids=ack_ids[start:end],
+                modify_deadline_ack_ids=modify_ack_ids[start:end],
+                modify_deadline_seconds=modify_seconds[start:end],
+            )
+
+    def _connect(self) -> None:
+        # Each connection reads from its own queue. Items not yet sent on
+        # the previous connection move to the new queue, and the old
+        # request generator is told to finish.
+        with self._lock:
+            previous, self._requests = self._requests, queue.Queue()
+            while True:
+                try:
+                    item = previous.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    self._requests.put(item)
+            previous.put(_STOP)
+            requests = self._requests
+            self._drained = drained = threading.Event()
+
+        if self.reconnects:
+            # Keep the leases taken on earlier connections alive.
+            self._manager._extend_leases(stream=self)
+
+        responses = self._manager._client.streaming_pull(
+            self._request_generator(requests, drained),
+            metadata=self._manager._metadata,
+        )
+        with self._lock:
+            self._responses = responses
+        self.connected = True
+
+    def _consume(self) -> bool:
+        """Read responses until the stream ends; return whether any arrived."""
+        received = False
+        # Only read the next response once the manager has room for
+        # it; while we wait, gRPC stops granting the server flow-control
+        # window for this stream.
+        while self._manager._flow_control.wait_for_capacity():
+            if self._manager._closed:
+                break
+            response = next(self._responses, None)
+            if response is None:
+                break
+            received = True
+            self.last_message_time = time.monotonic()
+            self._manager._on_response(self, response)
+        return received
+
+    def _run(self) -> None:
+        manager = self._manager
+        backoff = manager._initial_backoff
+        try:
+            while not manager._closed:
+                received = False
+                try:
+                    self._connect()
+                    received = self._consume()
+                except _RETRYABLE_STREAM_ERRORS as exc:
+                    _LOGGER.info('Stream %s disconnected: %r', self.client_id, exc)
+                except Exception as exc:
+                    if not manager._closed:
+                        _LOGGER.error('Stream %s failed: %r', self.client_id, exc)
+                        self.error = exc
+                    return
+                finally:
+                    self.connected = False
+
+                if manager._closed:
+                    return
+                if received:
+                    backoff = manager._initial_backoff
+                delay = random.uniform(0, backoff)
+                backoff = min(backoff * 2, manager._max_backoff)
+                self.reconnects += 1
+                if manager._stopped.wait(delay):
+                    return
+        finally:
+            with self._lock:
+                self._requests.put(_STOP)
+
+
+class StreamingPullManager:
+    """Consume one subscription over several concurrent streaming pulls.
+
+    The manager opens ``stream_count`` ``StreamingPull`` RPCs on the same
+    subscription, each with its own ``client_id``, and merges the messages
+    they deliver into a single dispatcher. Every message keeps a reference to
+    the stream that delivered it, so acknowledgements and deadline
+    modifications are always routed back to that stream.
+
+    The number and total size of leased (delivered but not yet acked or
+    nacked) messages is capped by a :class:`~.flow_control.FlowController`;
+    while it is saturated, streams pause reading until acks free capacity.
+
+    Leases are extended in the background. Unless a fixed deadline is
+    given, the ack deadline used for new streams and for extensions is the
+    99th percentile of the observed times from receipt to ack, which
+    include the time a message waits for a worker, kept in a :class:`~.histogram.Histogram` and clamped to the 10 to
+    600 second range the server accepts. A stream's deadline is fixed when
+    it opens, so messages it delivers may hold a shorter lease than the
+    current percentile; extensions are timed by the shortest lease any
+    message holds.
+
+    With a :class:`~.dedup.DuplicateFilter`, redeliveries of recently acked
+    messages are acked on arrival and never reach the dispatcher.
+
+    With a :class:`~.tracing.Tracer`, each sampled message gets a
+    ``receive`` span, a child of the publisher's span, that runs from
+    receipt to ack or nack. Its ``delivery_latency`` attribute is the time
+    from ``publish_time`` to receipt, and its ``handler_start`` event
+    splits the rest into time queued for a worker and time in the handler.
+    The same latencies are aggregated for every message, sampled or not,
+    in a :class:`~.latency.DeliveryMetrics`.
+
+    Streams closed by the server are re-established with backoff; see
+    :attr:`reconnect_count` and :attr:`time_without_messages` to monitor
+    their health.
+
+    .. code-block:: python
+
+        def callback(message):
+            handle(message.message)
+            message.ack()
+
+        manager = StreamingPullManager(
+            client, subscription, callback, stream_count=4)
+        manager.start()
+        ...
+        manager.close()
+    """
+    def __init__(self,
+            client,
+            subscription: str,
+            callback: Callable[[Message], Any],
+            *,
+            stream_count: int = 1,
+            worker_count: int = None,
+            stream_ack_deadline_seconds: int = None,
+            dispatcher: Any = None,
+            flow_control: FlowController = None,
+            max_lease_duration: float = 3600,
+            duplicate_filter: DuplicateFilter = None,
+            initial_backoff: float = 0.1,
+            max_backoff: float = 60.0,
+            tracer: tracing.Tracer = None,
+            delivery_metrics: DeliveryMetrics = None,
+            metadata: Sequence[Tuple[str, str]] = ()):
+        """Instantiate the manager.
+
+        Args:
+            client (~.SubscriberClient): The client used to open the
+                streams.
+            subscription (str): The subscription to consume. Format is
+                ``projects/{project}/subscriptions/{sub}``.
+            callback (Callable[[Message], Any]): The function called with
+                every message. It is responsible for acking or nacking it.
+                Ignored if ``dispatcher`` is provided.
+            stream_count (int): The number of concurrent streams to open.
+            worker_count (Optional[int]): The number of dispatcher threads.
+                Ignored if ``dispatcher`` is provided.
+            stream_ack_deadline_seconds (Optional[int]): A fixed ack
+                deadline for every stream and lease extension, from 10 to
+                600 seconds. If not set, the deadline adapts to the
+                observed times from receipt to ack.
+            dispatcher (Optional[Any]): The dispatcher that runs the
+                callback; any object with ``start``, ``dispatch`` and
+                ``close`` methods, such as a
+                :class:`~.process_pool.ProcessPoolDispatcher`. If not set, a
+                :class:`HashPartitionedDispatcher` is created.
+            flow_control (Optional[~.flow_control.FlowController]): The
+                limits on leased messages and bytes. If not set, a
+                controller with the default limits is created.
+            max_lease_duration (float): The longest time, in seconds, that
+                a message's lease is extended for. After that the lease is
+                allowed to lapse and the server redelivers the message.
+            duplicate_filter (Optional[~.dedup.DuplicateFilter]): If set,
+                acked message IDs are recorded in it, and messages whose ID
+                it already holds are acked without being dispatched.
+            initial_backoff (float): The upper bound, in seconds, of the
+                random delay before a stream is first re-established. It
+                doubles with every consecutive reconnect that receives no
+                messages.
+            max_backoff (float): The largest upper bound, in seconds, of the
+                reconnect delay.
+            tracer (Optional[~.tracing.Tracer]): If set, sampled messages
+                are traced from receipt to ack.
+            delivery_metrics (Optional[~.latency.DeliveryMetrics]): If
+                set, the delivery, handler and ack latencies of every
+                message are recorded in it under ``subscription``.
+            metadata (Sequence[Tuple[str, str]]): Strings which should be
+                sent along with every stream as metadata.
+        """
+        if stream_count < 1:
+            raise ValueError('stream_count must be a positive integer.')
+        if stream_ack_deadline_seconds is not None and not (
+                MIN_ACK_DEADLINE <= stream_ack_deadline_seconds <= MAX_ACK_DEADLINE):
+            raise ValueError('stream_ack_deadline_seconds must be between {} and {}.'.format(
+                MIN_ACK_DEADLINE, MAX_ACK_DEADLINE))
+        self._client = client
+        self.subscription = subscription
+        self.stream_ack_deadline_seconds = stream_ack_deadline_seconds
+        self._metadata = tuple(metadata)
+        self._dispatcher = dispatcher or HashPartitionedDispatcher(
+            callback, worker_count=worker_count)
+        self._flow_control = flow_control or FlowController()
+        self._histogram = Histogram()
+        self._max_lease_duration = max_lease_duration
+        self._duplicate_filter = duplicate_filter
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._tracer = tracer
+        self._delivery_metrics = delivery_metrics
+
+        client_prefix = uuid.uuid4().hex
+        self._streams = [
+            _Stream(self, '{}-{}'.format(client_prefix, index))
+            for index in range(stream_count)
+        ]
+
+        self._lock = threading.Lock()
+        self._leased = {}  # type: Dict[str, Message]
+        self._closed = False
+        self._stopped = threading.Event()
+        self._leaser = None  # type: Optional[threading.Thread]
+        # The shortest lease, in seconds, held by a leased message, and an
+        # event set when a shorter one is granted.
+        self._shortest_lease = None  # type: Optional[int]
+        self._lease_changed = threading.Event()
+        self._start_time = None  # type: Optional[float]
+
+    @property
+    def streams(self) -> Sequence[_Stream]:
+        return tuple(self._streams)
+
+    @property
+    def leased_messages(self) -> int:
+        """The number of messages delivered but not yet acked or nacked."""
+        return len(self._leased)
+
+    @property
+    def flow_control(self) -> FlowController:
+        return self._flow_control
+
+    @property
+    def duplicate_filter(self) -> Optional[DuplicateFilter]:
+        return self._duplicate_filter
+
+    @property
+    def histogram(self) -> Histogram:
+        """The times, in seconds, from receipt to ack of acked messages."""
+        return self._histogram
+
+    @property
+    def delivery_metrics(self) -> Optional[DeliveryMetrics]:
+        return self._delivery_metrics
+
+    @property
+    def ack_deadline(self) -> int:
+        """The ack deadline, in seconds, for new streams and extensions."""
+        if self.stream_ack_deadline_seconds is not None:
+            return self.stream_ack_deadline_seconds
+        return self._histogram.percentile(99)
+
+    @property
+    def reconnect_count(self) -> int:
+        """The number of times any stream has been re-established."""
+        return sum(stream.reconnects for stream in self._streams)
+
+    @property
+    def time_without_messages(self) -> Optional[float]:
+        """Seconds since any stream last received messages.
+
+        Counted from :meth:`start` if no messages have arrived yet, and
+        ``None`` before the manager is started. A large value while the
+        subscription has a backlog points at a stalled consumer.
+        """
+        if self._start_time is None:
+            return None
+        last = max(
+            [self._start_time] + [
+                stream.last_message_time for stream in self._streams
+                if stream.last_message_time is not None
+            ])
+        return time.monotonic() - last
+
+    def start(self) -> 'StreamingPullManager':
+        """Start the dispatcher and open every stream."""
+        self._start_time = time.monotonic()
+        self._dispatcher.start()
+        for stream in self._streams:
+            stream.start()
+        self._leaser = threading.Thread(
+            name='Thread-PubsubLeaser',
+            target=self._maintain_leases,
+            daemon=True,
+        )
+        self._leaser.start()
+        return self
+
+    def close(self) -> None:
+        """Close every stream and stop the dispatcher.
+
+        Messages already handed to the dispatcher are processed first, so
+        that their acknowledgements still go out on their streams. Messages
+        still leased after that are not acked; their leases lapse and the
+        server redelivers them.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._stopped.set()
+        self._lease_changed.set()
+        if self._leaser is not None:
+            self._leaser.join()
+            self._leaser = None
+        self._flow_control.close()
+        self._dispatcher.close()
+        for stream in self._streams:
+            stream.close()
+
+    def __enter__(self) -> 'StreamingPullManager':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def ack(self, ack_ids: Sequence[str]) -> None:
+        """Acknowledge messages by ack ID.
+
+        Each ack ID is routed to the stream that delivered it. Unknown ack
+        IDs (already acked, or delivered before a restart) are ignored.
+
+        Args:
+            ack_ids (Sequence[str]): The ack IDs to acknowledge.
+        """
+        for ack_id in ack_ids:
+            message = self._leased.get(ack_id)
+            if message is not None:
+                self._complete(message, ack=True)
+
+    def _on_response(self,
+            stream: _Stream,
+            response: pubsub.StreamingPullResponse) -> None:
+        messages = [
+            Message(received_message, stream, self)
+            for received_message in response.received_messages
+        ]
+        if self._duplicate_filter is not None:
+            duplicates = [
+                m.ack_id for m in messages
+                if m.message.message_id in self._duplicate_filter
+            ]
+            if duplicates:
+                stream.ack(duplicates)
+                skip = set(duplicates)
+                messages = [m for m in messages if m.ack_id not in skip]
+        if self._tracer is not None:
+            self._start_spans(messages)
+        if self._delivery_metrics is not None:
+            now = time.time()
+            for message in messages:
+                publish_time = message.message.publish_time
+                if publish_time is not None:
+                    self._delivery_metrics.record(
+                        self.subscription, DELIVERY, now - publish_time.timestamp())
+        shorter = False
+        with self._lock:
+            for message in messages:
+                self._leased[message.ack_id] = message
+            lease = stream.ack_deadline
+            if messages and lease is not None and (
+                    self._shortest_lease is None or lease < self._shortest_lease):
+                self._shortest_lease = lease
+                shorter = True
+        if shorter:
+            self._lease_changed.set()
+        self._flow_control.add(len(messages), sum(m.size for m in messages))
+        for message in messages:
+            self._dispatcher.dispatch(message)
+
+    def _start_spans(self, messages: Sequence[Message]) -> None:
+        now = time.time()
+        for message in messages:
+            pubsub_message = message.message
+            span = self._tracer.start_span(
+                'receive',
+                parent=tracing.extract(pubsub_message.attributes),
+                start_time=now,
+                attributes={
+                    'subscription': self.subscription,
+                    'message_id': pubsub_message.message_id,
+                    'delivery_attempt': message.delivery_attempt,
+                },
+            )
+            if span is not None:
+                publish_time = pubsub_message.publish_time
+                if publish_time is not None:
+                    span.set_attribute('delivery_latency', now - publish_time.timestamp())
+                message.span = span
+
+    @staticmethod
+    def _end_span(message: Message, outcome: str) -> None:
+        span = message.span
+        if span is not None:
+            message.span = None
+            span.set_attribute('outcome', outcome)
+            span.end()
+
+    def _extend_leases(self, stream: _Stream = None) -> None:
+        """Extend the deadline of every leased message on its stream.
+
+        If ``stream`` is given, only messages delivered by it are extended.
+        """
+        deadline = self.ack_deadline
+        cutoff = time.monotonic() - self._max_lease_duration
+        by_stream = {}  # type: Dict[_Stream, List[str]]
+        expired = []  # type: List[Message]
+        with self._lock:
+            for message in self._leased.values():
+                if stream is not None and message._stream is not stream:
+                    continue
+                if message.received_time < cutoff:
+                    expired.append(message)
+                else:
+                    by_stream.setdefault(message._stream, []).append(message.ack_id)
+            for message in expired:
+                message._done = True
+                del self._leased[message.ack_id]
+            if stream is None:
+                self._shortest_lease = deadline if by_stream else None
+            elif by_stream and self._shortest_lease is not None:
+                self._shortest_lease = min(self._shortest_lease, deadline)
+        for message in expired:
+            self._flow_control.release(1, message.size)
+            self._end_span(message, 'expired')
+        for owner, ack_ids in by_stream.items():
+            owner.modify_ack_deadline(ack_ids, deadline)
+
+    def _next_extension_delay(self) -> float:
+        """Seconds until leases should next be extended.
+
+        Leases are extended well before the shortest one held expires; the
+        jitter keeps many managers from extending in lockstep.
+        """
+        lease = self.ack_deadline
+        if self._shortest_lease is not None:
+            lease = min(lease, self._shortest_lease)
+        return lease * _LEASE_EXTENSION_RATIO * random.uniform(0.9, 1.0)
+
+    def _maintain_leases(self) -> None:
+        next_extension = time.monotonic() + self._next_extension_delay()
+        while True:
+            self._lease_changed.wait(max(next_extension - time.monotonic(), 0))
+            self._lease_changed.clear()
+            if self._stopped.is_set():
+                return
+            now = time.monotonic()
+            if now >= next_extension:
+                self._extend_leases()
+                next_extension = now + self._next_extension_delay()
+            else:
+                # Messages arrived with a shorter lease than the others
+                # hold; bring the next extension forward if needed.
+                next_extension = min(next_extension, now + self._next_extension_delay())
+
+    def _complete(self, message: Message, ack: bool) -> None:
+        with self._lock:
+            if message._done:
+                return
+            message._done = True
+            self._leased.pop(message.ack_id, None)
+        self._flow_control.release(1, message.size)
+        self._end_span(message, 'ack' if ack else 'nack')
+        now = time.monotonic()
+        if self._delivery_metrics is not None:
+            if message.handler_start_time is not None:
+                self._delivery_metrics.record(
+                    self.subscription, HANDLER, now - message.handler_start_time)
+            if ack:
+                self._delivery_metrics.record(
+                    self.subscription, ACK, now - message.received_time)
+        if ack:
+            self._histogram.add(now - message.received_time)
+            if self._duplicate_filter is not None:
+                self._duplicate_filter.add(message.message.message_id)
+            message._stream.ack([message.ack_id])
+        else:
+            message._stream.modify_ack_deadline([message.ack_id], 0)
+
+
+__all__ = (
+    'HashPartitionedDispatcher',
+    'Message',
+    'StreamingPullManager',
+)
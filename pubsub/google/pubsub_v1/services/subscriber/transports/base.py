@@ -37,6 +37,7 @@ class SubscriberTransport(metaclass=abc.ABCMeta):
             self, *,
             host: str = 'pubsub.googleapis.com',
             credentials: credentials.Credentials = None,
+            lazy: bool = False,
             ) -> None:
         """Instantiate the transport.
 
@@ -47,6 +48,9 @@ class SubscriberTransport(metaclass=abc.ABCMeta):
                 credentials identify the application to the service; if none
                 are specified, the client will attempt to ascertain the
                 credentials from the environment.
+            lazy (bool): If set and no credentials are given, they are
+                ascertained from the environment when first needed rather
+                than now.
         """
         # Save the hostname. Default to port 443 (HTTPS) if none is specified.
         if ':' not in host:
@@ -55,12 +59,26 @@ class SubscriberTransport(metaclass=abc.ABCMeta):
 
         # If no credentials are provided, then determine the appropriate
         # defaults.
-        if credentials is None:
+        if credentials is None and not lazy:
             credentials, _ = auth.default(scopes=self.AUTH_SCOPES)
 
         # Save the credentials.
         self._credentials = credentials
 
+    def close(self) -> None:
+        """Release any resources held by the transport."""
+
+    def wait_for_ready(self, timeout: float = None) -> bool:
+        """Wait until the transport can take traffic."""
+        return True
+
+    def warm_up(self, timeout: float = None) -> bool:
+        """Prepare the transport for its first RPC."""
+        return True
+
+    def warm_up_in_background(self, timeout: float = None) -> None:
+        """Prepare the transport for its first RPC without blocking."""
+
     @property
     def create_subscription(self) -> typing.Callable[
             [pubsub.Subscription],
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import datetime
+import logging
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+from google.auth import credentials as ga_credentials  # type: ignore
+from google.auth.transport.requests import Request  # type: ignore
+
+_LOGGER = logging.getLogger(__name__)
+
+# Refresh this many seconds before a token expires. Access tokens are
+# usually valid for an hour.
+DEFAULT_MARGIN = 300.0
+
+# The shortest wait between two refreshes of a valid token.
+_MIN_INTERVAL = 1.0
+
+_registry_lock = threading.Lock()
+_registry = {}  # type: Dict[Tuple[int, Tuple[str, ...]], TokenRefresher]
+
+
+class TokenRefresher:
+    """Keep the access token of one credentials object fresh.
+
+    A background thread fetches a token as soon as it starts, then
+    refreshes it ``margin`` seconds before it expires (or halfway through
+    the remaining lifetime of a short-lived token). RPCs therefore find a
+    valid token and never refresh it themselves, which would add the
+    round trip to the token endpoint to their latency. Failed refreshes
+    are retried with exponential backoff; if they keep failing until the
+    token expires, RPCs fall back to refreshing it as before.
+
+    Use :func:`acquire` rather than the constructor, so that every client
+    using the same credentials shares one refresher and one token.
+    """
+    def __init__(self,
+            credentials: ga_credentials.Credentials,
+            margin: float = DEFAULT_MARGIN,
+            initial_backoff: float = 1.0,
+            max_backoff: float = 60.0):
+        """Instantiate the refresher.
+
+        Args:
+            credentials (google.auth.credentials.Credentials): The
+                credentials to refresh, already scoped.
+            margin (float): Seconds before expiry to refresh at.
+            initial_backoff (float): Seconds to wait before retrying a
+                failed refresh. It doubles with each consecutive failure.
+            max_backoff (float): The longest wait between retries.
+        """
+        self.credentials = credentials
+        self.margin = margin
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._references = 0
+        self._key = None  # type: Optional[Tuple[int, Tuple[str, ...]]]
+        self._original = credentials
+        self._refresh_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+        self.refresh_count = 0
+        self.failure_count = 0
+
+    @property
+    def needs_refresh(self) -> bool:
+        """Whether the credentials have tokens that expire.
+
+        Credentials that are valid without ever having a token, such as
+        anonymous credentials, are left alone.
+        """
+        credentials = self.credentials
+        return not (credentials.valid and credentials.token is None
+                    and credentials.expiry is None)
+
+    def seconds_until_refresh(self) -> Optional[float]:
+        """Return how long to wait before the next refresh.
+
+        Returns:
+            Optional[float]: Zero if there is no token yet or it has
+                expired, ``None`` if the token never expires.
+        """
+        credentials = self.credentials
+        if credentials.token is None:
+            return 0.0
+        if credentials.expiry is None:
+            return None
+        # google.auth keeps expiry as a naive UTC datetime.
+        remaining = (credentials.expiry - datetime.datetime.utcnow()).total_seconds()
+        if remaining <= 0:
+            return 0.0
+        return max(remaining - self.margin, remaining / 2, _MIN_INTERVAL)
+
+    def refresh(self) -> None:
+        """Refresh the token now, on the calling thread."""
+        with self._refresh_lock:
+            self._refresh()
+
+    def ensure_valid(self) -> None:
+        """Make sure the credentials hold a valid token.
+
+        Waits for a refresh in progress on the background thread rather
+        than fetching a second token, and refreshes on the calling thread
+        only if the token is still not valid after that.
+        """
+        with self._refresh_lock:
+            if not self.credentials.valid:
+                self._refresh()
+
+    def _refresh(self) -> None:
+        self.credentials.refresh(Request())
+        self.refresh_count += 1
+
+    def start(self) -> None:
+        if self._thread is not None or not self.needs_refresh:
+            return
+        self._thread = threading.Thread(
+            name='Thread-PubsubTokenRefresh',
+            target=self._run,
+            daemon=True,
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the background thread."""
+        self._stopped.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def release(self) -> None:
+        """Give up a reference taken by :func:`acquire`.
+
+        The refresher stops when the last reference is released.
+        """
+        with _registry_lock:
+            self._references -= 1
+            if self._references:
+                return
+            if _registry.get(self._key) is self:
+                del _registry[self._key]
+        self.close()
+
+    def _run(self) -> None:
+        failures = 0
+        while True:
+            if failures:
+                delay = min(self._initial_backoff * 2 ** (failures - 1), self._max_backoff)
+            else:
+                delay = self.seconds_until_refresh()
+            if self._stopped.wait(delay):
+                return
+            try:
+                self.refresh()
+            except Exception as exc:
+                failures += 1
+                self.failure_count += 1
+                _LOGGER.warning('Background token refresh failed: %r', exc)
+            else:
+                failures = 0
+
+
+def acquire(credentials: ga_credentials.Credentials,
+            scopes: Sequence[str] = (),
+            **kwargs) -> TokenRefresher:
+    """Return the running refresher for ``credentials``, taking a reference.
+
+    Callers passing the same credentials object share a refresher, and
+    so a single token. Credentials that require scopes are scoped once,
+    here; create channels with the refresher's :attr:`credentials`, not
+    the original ones, so that the refreshed object is the one in use.
+
+    Args:
+        credentials (google.auth.credentials.Credentials): The
+            credentials to keep fresh.
+        scopes (Sequence[str]): The scopes to apply if the credentials
+            require them.
+        kwargs (Optional[dict]): Keyword arguments passed to
+            :class:`TokenRefresher` if a new one is created.
+
+    Returns:
+        TokenRefresher: The refresher. Call its :meth:`release` when done.
+    """
+    key = (id(credentials), tuple(scopes))
+    with _registry_lock:
+        refresher = _registry.get(key)
+        if refresher is None:
+            scoped = ga_credentials.with_scopes_if_required(credentials, scopes)
+            refresher = _registry[key] = TokenRefresher(scoped, **kwargs)
+            refresher._key = key
+            # Keep the original alive, so that its id is not reused while
+            # it is a key of the registry.
+            refresher._original = credentials
+            refresher.start()
+        refresher._references += 1
+    return refresher
+
+
+__all__ = (
+    'DEFAULT_MARGIN',
+    'TokenRefresher',
+    'acquire',
+)
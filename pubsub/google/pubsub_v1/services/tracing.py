@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import abc
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# The message attribute carrying the trace context, in the W3C Trace
+# Context ``traceparent`` format.
+TRACEPARENT_ATTRIBUTE = 'googclient_traceparent'
+
+
+class TraceContext:
+    """The identity of a span, as propagated between processes.
+
+    Attributes:
+        trace_id (str): 32 lowercase hex digits shared by every span of a
+            trace.
+        span_id (str): 16 lowercase hex digits identifying the span.
+        sampled (bool): Whether the trace is recorded.
+    """
+    __slots__ = ('trace_id', 'span_id', 'sampled')
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool = True):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def to_traceparent(self) -> str:
+        """Return the context as a ``traceparent`` header value."""
+        return '00-{}-{}-{}'.format(
+            self.trace_id, self.span_id, '01' if self.sampled else '00')
+
+    @classmethod
+    def from_traceparent(cls, value: Optional[str]) -> Optional['TraceContext']:
+        """Parse a ``traceparent`` header value.
+
+        Returns:
+            Optional[TraceContext]: The context, or ``None`` if ``value``
+                is missing or malformed.
+        """
+        if not value:
+            return None
+        parts = value.split('-')
+        if (len(parts) < 4 or len(parts[0]) != 2 or parts[0] == 'ff'
+                or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2):
+            return None
+        try:
+            flags = int(parts[3], 16)
+            int(parts[1], 16)
+            int(parts[2], 16)
+        except ValueError:
+            return None
+        if parts[1] == '0' * 32 or parts[2] == '0' * 16:
+            return None
+        return cls(parts[1].lower(), parts[2].lower(), bool(flags & 1))
+
+    def __repr__(self) -> str:
+        return 'TraceContext({!r})'.format(self.to_traceparent())
+
+
+class Span:
+    """A timed operation within a trace.
+
+    Times are wall-clock seconds since the epoch, so that spans can be
+    compared with ``publish_time`` and with spans from other processes.
+
+    Attributes:
+        name (str): What the span measures, such as ``publish``.
+        context (TraceContext): The span's identity.
+        parent_id (Optional[str]): The span ID of the parent, if any.
+        start_time (float): When the span started.
+        end_time (Optional[float]): When the span ended, or ``None`` while
+            it is open.
+        attributes (Dict[str, Any]): Details of the operation.
+        events (List[Tuple[str, float]]): Named points in time within
+            the span.
+    """
+    def __init__(self,
+            tracer: 'Tracer',
+            name: str,
+            context: TraceContext,
+            parent_id: Optional[str] = None,
+            start_time: float = None,
+            attributes: Mapping[str, Any] = None):
+        self._tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.start_time = time.time() if start_time is None else start_time
+        self.end_time = None  # type: Optional[float]
+        self.attributes = dict(attributes or {})  # type: Dict[str, Any]
+        self.events = []  # type: List[Tuple[str, float]]
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str) -> None:
+        """Record that ``name`` happened now."""
+        self.events.append((name, time.time()))
+
+    def end(self) -> None:
+        """End the span and export it. Ending it again has no effect."""
+        if self.end_time is not None:
+            return
+        self.end_time = time.time()
+        self._tracer._export(self)
+
+    def __enter__(self) -> 'Span':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_value is not None:
+            self.set_attribute('error', repr(exc_value))
+        self.end()
+
+    def __repr__(self) -> str:
+        return 'Span({!r}, {!r})'.format(self.name, self.context)
+
+
+class SpanExporter(metaclass=abc.ABCMeta):
+    """Receives every sampled span when it ends.
+
+    Subclass it to forward spans to a tracing backend. :meth:`export` runs
+    on the thread that ended the span, such as a dispatcher worker, so it
+    should be quick and must not block.
+    """
+    @abc.abstractmethod
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keep the most recent spans in memory, for tests and debugging."""
+    def __init__(self, max_spans: int = 10000):
+        self._max_spans = max_spans
+        self._lock = threading.Lock()
+        self._spans = []  # type: List[Span]
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            if len(self._spans) > self._max_spans:
+                del self._spans[:len(self._spans) - self._max_spans]
+
+    @property
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans = []
+
+
+class Tracer:
+    """Open spans around publishes and message handling.
+
+    A trace starts at the publisher: each sampled ``publish`` span writes
+    its context into the :data:`TRACEPARENT_ATTRIBUTE` attribute of the
+    messages it sends, and the subscriber continues the trace with a
+    ``receive`` span per message that runs from receipt to ack.
+
+    Sampling is decided once, where a trace starts, with probability
+    ``sample_rate``; a subscriber follows the decision carried by the
+    message. Unsampled operations allocate nothing and add no attribute,
+    so a low rate keeps the overhead negligible.
+
+    .. code-block:: python
+
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(exporter, sample_rate=0.01)
+        publisher = PublisherClient(tracer=tracer)
+        manager = subscriber.subscribe(subscription, callback, tracer=tracer)
+    """
+    def __init__(self, exporter: SpanExporter, sample_rate: float = 1.0):
+        """Instantiate the tracer.
+
+        Args:
+            exporter (~.SpanExporter): Receives every sampled span when
+                it ends.
+            sample_rate (float): The probability, from 0 to 1, that an
+                operation starting a new trace is recorded.
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError('sample_rate must be between 0 and 1.')
+        self._exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start_span(self,
+            name: str,
+            parent: Optional[TraceContext] = None,
+            start_time: float = None,
+            attributes: Mapping[str, Any] = None) -> Optional[Span]:
+        """Start a span, if it is sampled.
+
+        Args:
+            name (str): The name of the span.
+            parent (Optional[~.TraceContext]): The context to continue. If
+                set, its sampling decision is followed; otherwise a new
+                trace is started and sampled at ``sample_rate``.
+            start_time (Optional[float]): When the span started, in seconds
+                since the epoch. Defaults to now.
+            attributes (Optional[Mapping[str, Any]]): Details of the
+                operation.
+
+        Returns:
+            Optional[~.Span]: The started span, or ``None`` if the
+                operation is not sampled.
+        """
+        if parent is None:
+            if random.random() >= self.sample_rate:
+                return None
+            trace_id = '{:032x}'.format(random.getrandbits(128) or 1)
+            parent_id = None
+        elif not parent.sampled:
+            return None
+        else:
+            trace_id = parent.trace_id
+            parent_id = parent.span_id
+        context = TraceContext(trace_id, '{:016x}'.format(random.getrandbits(64) or 1))
+        return Span(self, name, context, parent_id, start_time, attributes)
+
+    def _export(self, span: Span) -> None:
+        try:
+            self._exporter.export(span)
+        except Exception as exc:
+            _LOGGER.warning('Span exporter failed: %r', exc)
+
+
+def inject(span: Optional[Span], attributes: Any) -> None:
+    """Write the context of ``span`` into message attributes.
+
+    An existing context, set by the application to continue its own
+    trace, is kept. Nothing is written if ``span`` is ``None``.
+    """
+    if span is not None and TRACEPARENT_ATTRIBUTE not in attributes:
+        attributes[TRACEPARENT_ATTRIBUTE] = span.context.to_traceparent()
+
+
+def extract(attributes: Mapping[str, str]) -> Optional[TraceContext]:
+    """Read the trace context carried by message attributes, if any."""
+    return TraceContext.from_traceparent(attributes.get(TRACEPARENT_ATTRIBUTE))
+
+
+def extract_first(attribute_maps: Iterable[Mapping[str, str]]) -> Optional[TraceContext]:
+    """Return the first trace context carried by any of ``attribute_maps``.
+
+    A request spans many messages but its span has one parent: the
+    context the application set on the first message that carries one.
+    """
+    for attributes in attribute_maps:
+        context = extract(attributes)
+        if context is not None:
+            return context
+    return None
+
+
+__all__ = (
+    'InMemorySpanExporter',
+    'Span',
+    'SpanExporter',
+    'TRACEPARENT_ATTRIBUTE',
+    'TraceContext',
+    'Tracer',
+    'extract',
+    'extract_first',
+    'inject',
+)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Sequence
+
+
+# Statements timed by default, from cheapest to most expensive.
+DEFAULT_STATEMENTS = (
+    'import google.pubsub',
+    'import google.pubsub_v1',
+    'from google.pubsub import PublisherClient',
+    'from google.pubsub import SubscriberClient',
+    'from google.pubsub import PublisherClient, SubscriberClient',
+)
+
+# Run in a fresh interpreter, so that nothing is imported beforehand.
+_PROBE = '''
+import json, sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+loaded = set(sys.modules) - before
+print(json.dumps({{
+    "seconds": elapsed,
+    "modules": len(loaded),
+    "grpc": "grpc" in loaded,
+    "subscriber": any(".subscriber" in m for m in loaded),
+}}))
+'''
+
+
+def measure(statement: str, repeat: int) -> Dict[str, object]:
+    """Time ``statement`` in ``repeat`` fresh interpreters."""
+    samples = []  # type: List[Dict[str, object]]
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(statement=statement)],
+            check=True, stdout=subprocess.PIPE, universal_newlines=True,
+        ).stdout
+        samples.append(json.loads(output))
+    seconds = [s['seconds'] for s in samples]
+    return {
+        'statement': statement,
+        'median_ms': statistics.median(seconds) * 1000,
+        'min_ms': min(seconds) * 1000,
+        'modules': samples[-1]['modules'],
+        'grpc': samples[-1]['grpc'],
+        'subscriber': samples[-1]['subscriber'],
+    }
+
+
+def report(results: Sequence[Dict[str, object]]) -> None:
+    width = max(len(r['statement']) for r in results)
+    print('{:<{w}}  {:>10}  {:>10}  {:>7}  {:>5}  {:>10}'.format(
+        'statement', 'median ms', 'min ms', 'modules', 'grpc', 'subscriber', w=width))
+    for r in results:
+        print('{:<{w}}  {:>10.1f}  {:>10.1f}  {:>7}  {:>5}  {:>10}'.format(
+            r['statement'], r['median_ms'], r['min_ms'], r['modules'],
+            'yes' if r['grpc'] else 'no', 'yes' if r['subscriber'] else 'no',
+            w=width))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="""Measure the cold import time of the Pub/Sub packages.
+
+Each statement runs in a new interpreter, and the wall time of the
+statement alone is recorded, along with the number of modules it loaded
+and whether grpc and any subscriber module were among them.
+""")
+    parser.add_argument(
+        'statements',
+        nargs='*',
+        default=DEFAULT_STATEMENTS,
+        help='the import statements to time',
+    )
+    parser.add_argument(
+        '-n',
+        '--repeat',
+        type=int,
+        default=5,
+        help='the number of interpreters to time each statement in',
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='print the results as JSON',
+    )
+    args = parser.parse_args()
+
+    results = [measure(statement, args.repeat) for statement in args.statements]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        report(results)
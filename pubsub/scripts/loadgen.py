@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import argparse
+import collections
+from concurrent import futures
+import itertools
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import grpc  # type: ignore
+
+import google.api_core.client_options as ClientOptions  # type: ignore
+from google.auth.transport import mtls  # type: ignore
+from google.pubsub_v1.services.metrics import ExponentialHistogram
+from google.pubsub_v1.services.publisher import PublisherClient
+from google.pubsub_v1.services.publisher.transports import PublisherGrpcTransport
+from google.pubsub_v1.services.subscriber import SubscriberClient
+from google.pubsub_v1.services.subscriber.latency import DeliveryMetrics
+from google.pubsub_v1.services.subscriber.transports import SubscriberGrpcTransport
+from google.pubsub_v1.types import pubsub
+
+
+class LocalServer:
+    """An in-process stand-in for the Pub/Sub service.
+
+    ``Publish`` stamps and queues messages; every ``StreamingPull`` stream,
+    whatever its subscription, takes messages from that one queue. Acks
+    are counted and otherwise ignored, and nothing is redelivered. It
+    exercises the client, not the service.
+    """
+    def __init__(self, workers: int = 16):
+        self._messages = queue.Queue()  # type: queue.Queue
+        self._ids = itertools.count()
+        self._stopped = threading.Event()
+        self.acked = 0
+        self._lock = threading.Lock()
+        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers))
+        self._server.add_generic_rpc_handlers((
+            grpc.method_handlers_generic_handler('google.pubsub.v1.Publisher', {
+                'Publish': grpc.unary_unary_rpc_method_handler(
+                    self._publish,
+                    request_deserializer=pubsub.PublishRequest.deserialize,
+                    response_serializer=pubsub.PublishResponse.serialize),
+            }),
+            grpc.method_handlers_generic_handler('google.pubsub.v1.Subscriber', {
+                'StreamingPull': grpc.stream_stream_rpc_method_handler(
+                    self._streaming_pull,
+                    request_deserializer=pubsub.StreamingPullRequest.deserialize,
+                    response_serializer=pubsub.StreamingPullResponse.serialize),
+            }),
+        ))
+        self.port = self._server.add_insecure_port('localhost:0')
+
+    @property
+    def address(self) -> str:
+        return 'localhost:{}'.format(self.port)
+
+    def start(self) -> 'LocalServer':
+        self._server.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._server.stop(None)
+
+    def _publish(self, request, context):
+        now = time.time()
+        publish_time = {'seconds': int(now), 'nanos': int(now % 1 * 1e9)}
+        ids = []
+        for message in request.messages:
+            message_id = str(next(self._ids))
+            message.message_id = message_id
+            message.publish_time = publish_time
+            self._messages.put(message)
+            ids.append(message_id)
+        return pubsub.PublishResponse(message_ids=ids)
+
+    def _streaming_pull(self, requests, context):
+        def read_acks():
+            try:
+                for request in requests:
+                    with self._lock:
+                        self.acked += len(request.ack_ids)
+            except grpc.RpcError:
+                pass  # The client cancelled the stream.
+
+        threading.Thread(target=read_acks, daemon=True).start()
+        while context.is_active() and not self._stopped.is_set():
+            try:
+                batch = [self._messages.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            while len(batch) < 100:
+                try:
+                    batch.append(self._messages.get_nowait())
+                except queue.Empty:
+                    break
+            yield pubsub.StreamingPullResponse(received_messages=[
+                pubsub.ReceivedMessage(ack_id='ack-' + m.message_id, message=m)
+                for m in batch
+            ])
+
+
+class Stats:
+    """Counters and latencies shared by the load threads."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.published = 0
+        self.published_bytes = 0
+        self.errors = collections.Counter()  # type: Dict[str, int]
+        self.received = 0
+        self.publish_latency = ExponentialHistogram()
+        self.delivery = DeliveryMetrics()
+
+
+def _make_clients(args):
+    if args.local:
+        publisher = PublisherClient(transport=PublisherGrpcTransport(
+            channel=grpc.insecure_channel(args.endpoint)))
+        subscriber = SubscriberClient(transport=SubscriberGrpcTransport(
+            channel=grpc.insecure_channel(args.endpoint)))
+        return publisher, subscriber
+
+    client_cert_source = None
+    if args.mtls:
+        if not mtls.has_default_client_cert_source():
+            sys.exit('--mtls was given but no default client certificate was found.')
+        client_cert_source = mtls.default_client_cert_source()
+    # Without --endpoint the clients pick their default, which is the mTLS
+    # endpoint when a client certificate is given, as in sample.py.
+    options = ClientOptions.ClientOptions(client_cert_source=client_cert_source)
+    if args.endpoint:
+        options.api_endpoint = args.endpoint
+    return (PublisherClient(client_options=options),
+            SubscriberClient(client_options=options))
+
+
+def _ordering_keys(index: int, ordering_keys: int, publishers: int) -> List[str]:
+    """Return the ordering keys publisher thread ``index`` cycles through.
+
+    Keys are dealt out round robin, so every thread gets one when there
+    are fewer keys than threads; threads then share keys.
+    """
+    if not ordering_keys:
+        return ['']
+    return ['key-{}'.format(k)
+            for k in range(index % ordering_keys, ordering_keys, publishers)]
+
+
+def _publish_loop(client: PublisherClient, args, stats: Stats, index: int,
+                  deadline: float) -> None:
+    keys = _ordering_keys(index, args.ordering_keys, args.publishers)
+    payload = os.urandom(args.message_size)
+    attributes = {'attr-{}'.format(a): 'x' * 16 for a in range(args.attributes)}
+    # Open-loop pacing: requests are sent on a fixed schedule and latency is
+    # measured from the scheduled time, so a slow response does not hide
+    # the requests that queue up behind it.
+    interval = args.batch_size * args.publishers / args.rate if args.rate else 0.0
+    scheduled = time.monotonic()
+    for sequence in itertools.count():
+        if scheduled >= deadline:
+            return
+        delay = scheduled - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        key = keys[sequence % len(keys)]
+        messages = [
+            pubsub.PubsubMessage(data=payload, attributes=attributes, ordering_key=key)
+            for _ in range(args.batch_size)
+        ]
+        try:
+            client.publish(topic=args.topic, messages=messages, timeout=args.timeout)
+        except Exception as exc:
+            with stats.lock:
+                stats.errors[type(exc).__name__] += 1
+        else:
+            stats.publish_latency.add(time.monotonic() - scheduled)
+            with stats.lock:
+                stats.published += args.batch_size
+                stats.published_bytes += args.batch_size * args.message_size
+        scheduled = scheduled + interval if interval else time.monotonic()
+
+
+def run(args) -> Dict[str, Any]:
+    """Drive the load described by ``args`` and return the report."""
+    server = None  # type: Optional[LocalServer]
+    if args.local:
+        server = LocalServer().start()
+        args.endpoint = server.address
+    publisher, subscriber = _make_clients(args)
+    stats = Stats()
+
+    manager = None
+    if args.subscription:
+        handler_seconds = args.handler_ms / 1000.0
+
+        def callback(message):
+            if handler_seconds:
+                time.sleep(handler_seconds)
+            message.ack()
+            with stats.lock:
+                stats.received += 1
+
+        manager = subscriber.subscribe(
+            args.subscription, callback,
+            stream_count=args.streams,
+            worker_count=args.workers,
+            enable_message_ordering=args.ordering_keys > 0,
+            delivery_metrics=stats.delivery,
+        )
+
+    start = time.monotonic()
+    deadline = start + args.duration
+    threads = [
+        threading.Thread(target=_publish_loop,
+                         args=(publisher, args, stats, index, deadline), daemon=True)
+        for index in range(args.publishers if args.topic else 0)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if manager is not None:
+        # Give the subscribers a moment to drain what was published.
+        drain_deadline = time.monotonic() + args.drain
+        while stats.received < stats.published and time.monotonic() < drain_deadline:
+            time.sleep(0.05)
+        manager.close()
+    elapsed = time.monotonic() - start
+
+    publisher.close()
+    subscriber.close()
+    if server is not None:
+        server.stop()
+
+    report = {
+        'elapsed_s': elapsed,
+        'published': stats.published,
+        'publish_rate': stats.published / elapsed,
+        'publish_mb_per_s': stats.published_bytes / elapsed / 1e6,
+        'publish_latency_s': stats.publish_latency.summary(),
+        'errors': dict(stats.errors),
+        'received': stats.received,
+        'receive_rate': stats.received / elapsed,
+    }  # type: Dict[str, Any]
+    if args.subscription:
+        report['subscriber_latency_s'] = stats.delivery.snapshot().get(args.subscription, {})
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print('elapsed           {:10.2f} s'.format(report['elapsed_s']))
+    print('published         {:10d} msgs  {:10.1f} msgs/s  {:8.2f} MB/s'.format(
+        report['published'], report['publish_rate'], report['publish_mb_per_s']))
+    print('received          {:10d} msgs  {:10.1f} msgs/s'.format(
+        report['received'], report['receive_rate']))
+    if report['errors']:
+        print('errors            {}'.format(report['errors']))
+    print()
+    print('{:<18}{:>8}{:>10}{:>10}{:>10}{:>10}'.format(
+        'latency (ms)', 'count', 'p50', 'p90', 'p99', 'max'))
+    rows = [('publish', report['publish_latency_s'])]
+    rows.extend(sorted(report.get('subscriber_latency_s', {}).items()))
+    for name, summary in rows:
+        print('{:<18}{:>8}{:>10.2f}{:>10.2f}{:>10.2f}{:>10.2f}'.format(
+            name, summary['count'], summary['p50'] * 1000, summary['p90'] * 1000,
+            summary['p99'] * 1000, summary['max'] * 1000))
+
+
+def parse_args(argv: Sequence[str] = None) -> argparse.Namespace:
+    """Parse the command line; ``--local`` also consumes a subscription."""
+    parser = argparse.ArgumentParser(
+        description="""Generate publish and subscribe load and report throughput and latency.
+
+Run against a local stand-in server with --local, or against a real
+endpoint with --endpoint, optionally over mutual TLS with the device's
+default client certificate (--mtls). Publish rate is per run, spread
+over the publisher threads, and paced on a fixed schedule.
+""")
+    parser.add_argument('--local', action='store_true',
+                        help='start an in-process stand-in server and use it')
+    parser.add_argument('--endpoint', default=None,
+                        help='the API endpoint to use without --local; by '
+                             'default the service endpoint, or its mTLS '
+                             'endpoint with --mtls')
+    parser.add_argument('--mtls', action='store_true',
+                        help='connect with the default client certificate')
+    parser.add_argument('--topic', default='projects/loadgen/topics/loadgen',
+                        help='the topic to publish to; empty to only subscribe')
+    parser.add_argument('--subscription', default=None,
+                        help='a subscription to consume while publishing')
+    parser.add_argument('-d', '--duration', type=float, default=10.0,
+                        help='seconds to publish for')
+    parser.add_argument('-r', '--rate', type=float, default=1000.0,
+                        help='messages per second to publish; 0 for unpaced')
+    parser.add_argument('-s', '--message-size', type=int, default=1000,
+                        help='the payload size of each message, in bytes')
+    parser.add_argument('-a', '--attributes', type=int, default=0,
+                        help='the number of attributes on each message')
+    parser.add_argument('-k', '--ordering-keys', type=int, default=0,
+                        help='the number of distinct ordering keys to use')
+    parser.add_argument('-b', '--batch-size', type=int, default=100,
+                        help='messages per publish request')
+    parser.add_argument('-p', '--publishers', type=int, default=4,
+                        help='concurrent publisher threads')
+    parser.add_argument('--streams', type=int, default=1,
+                        help='concurrent streaming pulls')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='subscriber worker threads')
+    parser.add_argument('--handler-ms', type=float, default=0.0,
+                        help='simulated work per message, in milliseconds')
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help='publish timeout, in seconds')
+    parser.add_argument('--drain', type=float, default=10.0,
+                        help='seconds to wait for subscribers to catch up')
+    parser.add_argument('--json', action='store_true',
+                        help='print the report as JSON')
+    args = parser.parse_args(argv)
+    if args.local and args.subscription is None:
+        args.subscription = 'projects/loadgen/subscriptions/loadgen'
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
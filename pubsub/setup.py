@@ -38,6 +38,7 @@ setuptools.setup(
     ],
     scripts=[
         'scripts/fixup_keywords.py',
+        'scripts/loadgen.py',
     ],
     classifiers=[
         'Development Status :: 3 - Alpha',
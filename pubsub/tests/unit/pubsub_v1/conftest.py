@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from concurrent import futures
+from unittest import mock
+
+import grpc
+import pytest
+
+from google.pubsub_v1.services.subscriber import streaming
+from google.pubsub_v1.types import pubsub
+
+
+class PublisherServer:
+    """An in-process stand-in for the Publisher service.
+
+    ``Publish`` records each request and answers with one ID per message,
+    counting from zero; ``GetTopic`` always fails with ``NOT_FOUND``.
+
+    Attributes:
+        requests (List[~.pubsub.PublishRequest]): The publish requests
+            received, in order.
+        errors (List[grpc.StatusCode]): Status codes the next publishes
+            fail with, one per publish.
+    """
+    def __init__(self):
+        self.requests = []
+        self.errors = []
+        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        self._server.add_generic_rpc_handlers((
+            grpc.method_handlers_generic_handler('google.pubsub.v1.Publisher', {
+                'Publish': grpc.unary_unary_rpc_method_handler(
+                    self._publish,
+                    request_deserializer=pubsub.PublishRequest.deserialize,
+                    response_serializer=pubsub.PublishResponse.serialize),
+                'GetTopic': grpc.unary_unary_rpc_method_handler(
+                    self._get_topic,
+                    request_deserializer=pubsub.GetTopicRequest.deserialize,
+                    response_serializer=pubsub.Topic.serialize),
+            }),
+        ))
+        self.address = 'localhost:{}'.format(self._server.add_insecure_port('localhost:0'))
+
+    def _publish(self, request, context):
+        if self.errors:
+            context.abort(self.errors.pop(0), 'try again')
+        self.requests.append(request)
+        return pubsub.PublishResponse(
+            message_ids=[str(i) for i in range(len(request.messages))])
+
+    def _get_topic(self, request, context):
+        context.abort(grpc.StatusCode.NOT_FOUND, 'no such topic')
+
+
+@pytest.fixture
+def make_received():
+    """Return a factory of received messages, one per message ID.
+
+    Each ``ReceivedMessage`` has the ack ID ``'ack-' + message_id``.
+    """
+    def make_received(*message_ids, ordering_key='', data=b'payload'):
+        return [
+            pubsub.ReceivedMessage(
+                ack_id='ack-' + message_id,
+                message=pubsub.PubsubMessage(
+                    message_id=message_id, data=data, ordering_key=ordering_key),
+            )
+            for message_id in message_ids
+        ]
+    return make_received
+
+
+@pytest.fixture
+def make_message(make_received):
+    """Return a factory of ``streaming.Message`` with a mock stream and manager."""
+    def make_message(message_id, ordering_key='', data=b'payload'):
+        received, = make_received(message_id, ordering_key=ordering_key, data=data)
+        return streaming.Message(received, mock.Mock(), mock.Mock())
+    return make_message
+
+
+@pytest.fixture
+def publisher_server():
+    server = PublisherServer()
+    server._server.start()
+    yield server
+    server._server.stop(None)
+
+
+@pytest.fixture
+def channel(publisher_server):
+    with grpc.insecure_channel(publisher_server.address) as channel:
+        yield channel
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import threading
+import time
+
+import pytest
+
+from google.api_core import exceptions
+from google.auth import credentials
+from google.pubsub_v1.services.subscriber import SubscriberClient
+from google.pubsub_v1.services.subscriber import batch
+from google.pubsub_v1.types import pubsub
+
+
+class FakeClient:
+    """Answers pulls from a script, then with empty long polls."""
+    def __init__(self, script=()):
+        self._script = list(script)
+        self._lock = threading.Lock()
+        self.pulls = []
+        self.acknowledge = mock.Mock()
+        self.modify_ack_deadline = mock.Mock()
+
+    def pull(self, **kwargs):
+        with self._lock:
+            self.pulls.append(kwargs)
+            item = self._script.pop(0) if self._script else None
+        if item is None:
+            time.sleep(0.01)
+            return pubsub.PullResponse()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+def test_arguments_must_be_positive():
+    with pytest.raises(ValueError):
+        batch.BatchPuller(FakeClient(), 's', max_messages=0)
+    with pytest.raises(ValueError):
+        batch.BatchPuller(FakeClient(), 's', concurrency=0)
+
+
+def test_pulls_run_concurrently(make_received):
+    barrier = threading.Barrier(3, timeout=5)
+    client = FakeClient()
+
+    def pull(**kwargs):
+        barrier.wait()
+        return pubsub.PullResponse(
+            received_messages=make_received(str(threading.get_ident())))
+    client.pull = pull
+
+    puller = batch.BatchPuller(client, 'projects/p/subscriptions/s', concurrency=3)
+    with puller:
+        batches = puller.batches()
+        received = [next(batches) for _ in range(3)]
+        batches.close()
+
+    assert not barrier.broken
+    assert all(len(r.received_messages) == 1 for r in received)
+
+
+def test_empty_and_failed_pulls_are_retried(make_received):
+    client = FakeClient([
+        pubsub.PullResponse(),
+        exceptions.ServiceUnavailable('too many pulls'),
+        pubsub.PullResponse(received_messages=make_received('1', '2')),
+    ])
+    puller = batch.BatchPuller(
+        client, 'projects/p/subscriptions/s', concurrency=1,
+        max_messages=10, return_immediately=True, initial_backoff=0.01)
+
+    batches = puller.batches()
+    response = next(batches)
+    batches.close()
+
+    assert [m.ack_id for m in response.received_messages] == ['ack-1', 'ack-2']
+    assert client.pulls[0] == {
+        'subscription': 'projects/p/subscriptions/s',
+        'max_messages': 10,
+        'return_immediately': True,
+        'timeout': None,
+        'metadata': (),
+    }
+    assert puller.pull_count >= 2
+    assert puller.empty_pull_count >= 1
+
+
+def test_non_retryable_error_is_raised():
+    client = FakeClient([exceptions.PermissionDenied('denied')])
+    puller = batch.BatchPuller(client, 'projects/p/subscriptions/s', concurrency=1)
+    with pytest.raises(exceptions.PermissionDenied):
+        next(iter(puller))
+
+
+def test_unclaimed_batches_are_nacked(make_received):
+    client = FakeClient([
+        pubsub.PullResponse(received_messages=make_received('1')),
+        pubsub.PullResponse(received_messages=make_received('2')),
+    ])
+    nacked = threading.Event()
+    client.modify_ack_deadline.side_effect = lambda **kwargs: nacked.set()
+
+    puller = batch.BatchPuller(client, 'projects/p/subscriptions/s', concurrency=2)
+    for response in puller:
+        break
+
+    assert nacked.wait(5)
+    claimed = response.received_messages[0].ack_id
+    unclaimed = 'ack-1' if claimed == 'ack-2' else 'ack-2'
+    client.modify_ack_deadline.assert_called_once_with(
+        subscription='projects/p/subscriptions/s',
+        ack_ids=[unclaimed],
+        ack_deadline_seconds=0,
+        metadata=(),
+    )
+
+
+def test_close_wakes_consumer_and_nacks_pulls_in_flight(make_received):
+    client = FakeClient()
+    release = threading.Event()
+
+    def pull(**kwargs):
+        # A long poll that returns messages only after the puller closed.
+        release.wait(5)
+        return pubsub.PullResponse(received_messages=make_received('1'))
+    client.pull = pull
+
+    puller = batch.BatchPuller(client, 'projects/p/subscriptions/s', concurrency=1)
+    received = []
+    consumer = threading.Thread(target=lambda: received.extend(puller))
+    consumer.start()
+    time.sleep(0.05)
+    puller.close()
+    consumer.join(1)
+    assert not consumer.is_alive()
+    assert received == []
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while not client.modify_ack_deadline.called and time.monotonic() < deadline:
+        time.sleep(0.01)
+    client.modify_ack_deadline.assert_called_once_with(
+        subscription='projects/p/subscriptions/s',
+        ack_ids=['ack-1'],
+        ack_deadline_seconds=0,
+        metadata=(),
+    )
+
+
+def test_ack_is_chunked():
+    client = FakeClient()
+    puller = batch.BatchPuller(client, 'projects/p/subscriptions/s')
+    ack_ids = ['a{}'.format(i) for i in range(2501)]
+
+    puller.ack(ack_ids)
+
+    calls = client.acknowledge.call_args_list
+    assert [len(c[1]['ack_ids']) for c in calls] == [2500, 1]
+
+
+def test_pull_batches():
+    client = SubscriberClient(credentials=credentials.AnonymousCredentials())
+    puller = client.pull_batches(
+        'projects/p/subscriptions/s', max_messages=5, concurrency=2)
+
+    assert isinstance(puller, batch.BatchPuller)
+    assert puller.max_messages == 5
+    assert puller.concurrency == 2
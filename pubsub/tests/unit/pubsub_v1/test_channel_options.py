@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import pytest
+
+from google.auth import credentials
+from google.pubsub_v1.services.channel_options import ChannelOptions
+from google.pubsub_v1.services.publisher import PublisherClient
+from google.pubsub_v1.services.subscriber import SubscriberClient
+from google.pubsub_v1.services.subscriber import transports
+
+
+def test_defaults_add_no_arguments():
+    assert ChannelOptions().to_grpc_options() == []
+
+
+def test_grpc_options():
+    options = ChannelOptions(
+        keepalive_time_ms=30000,
+        keepalive_timeout_ms=10000,
+        keepalive_permit_without_calls=True,
+        initial_window_size=1 << 23,
+        max_send_message_length=-1,
+        max_receive_message_length=-1,
+        extra=[('grpc.primary_user_agent', 'loadgen')],
+    )
+    assert options.to_grpc_options() == [
+        ('grpc.keepalive_time_ms', 30000),
+        ('grpc.keepalive_timeout_ms', 10000),
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.http2.lookahead_bytes', 1 << 23),
+        ('grpc.max_send_message_length', -1),
+        ('grpc.max_receive_message_length', -1),
+        ('grpc.http2.bdp_probe', 0),
+        ('grpc.primary_user_agent', 'loadgen'),
+    ]
+
+
+def test_invalid_values():
+    with pytest.raises(ValueError):
+        ChannelOptions(keepalive_time_ms=0)
+    with pytest.raises(ValueError):
+        ChannelOptions(initial_window_size=-1)
+
+
+def test_from_value():
+    options = ChannelOptions(keepalive_time_ms=1)
+    assert ChannelOptions.from_value(options) is options
+    assert ChannelOptions.from_value(None) is None
+    assert ChannelOptions.from_value({'keepalive_time_ms': 1}).keepalive_time_ms == 1
+    with pytest.raises(TypeError):
+        ChannelOptions.from_value({'unknown': 1})
+
+
+@mock.patch("google.api_core.grpc_helpers.create_channel", autospec=True)
+def test_transport_passes_options(grpc_create_channel):
+    transport = transports.SubscriberGrpcTransport(
+        credentials=credentials.AnonymousCredentials(),
+        channel_options=ChannelOptions(max_receive_message_length=-1),
+    )
+    assert transport.grpc_channel is grpc_create_channel.return_value
+    grpc_create_channel.assert_called_once_with(
+        'pubsub.googleapis.com:443',
+        credentials=transport._credentials,
+        scopes=transport.AUTH_SCOPES,
+        options=[('grpc.max_receive_message_length', -1)],
+    )
+
+
+@pytest.mark.parametrize('client_class', [PublisherClient, SubscriberClient])
+def test_client_options_channel_options(client_class):
+    cred = credentials.AnonymousCredentials()
+    client = client_class(
+        credentials=cred, client_options={'channel_options': {'keepalive_time_ms': 5}})
+    assert client._transport._channel_options.keepalive_time_ms == 5
+
+    with pytest.raises(ValueError):
+        client_class(
+            credentials=cred,
+            channel_options=ChannelOptions(keepalive_time_ms=1),
+            client_options={'channel_options': {'keepalive_time_ms': 5}})
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import pytest
+
+from google.pubsub_v1.services.subscriber import streaming
+from google.pubsub_v1.services.subscriber.dedup import DuplicateFilter
+from google.pubsub_v1.types import pubsub
+
+
+def test_max_size_must_be_positive():
+    with pytest.raises(ValueError):
+        DuplicateFilter(max_size=0)
+
+
+def test_hit_rate():
+    dedup = DuplicateFilter()
+    assert dedup.hit_rate == 0.0
+    dedup.add('1')
+
+    assert '1' in dedup
+    assert '2' not in dedup
+    assert dedup.lookups == 2
+    assert dedup.hits == 1
+    assert dedup.hit_rate == 0.5
+
+
+def test_entries_expire_after_ttl():
+    dedup = DuplicateFilter(ttl=10)
+    with mock.patch('time.monotonic', return_value=100.0):
+        dedup.add('1')
+    with mock.patch('time.monotonic', return_value=111.0):
+        assert '1' not in dedup
+        dedup.add('2')
+    assert len(dedup) == 1
+
+
+def test_oldest_entries_are_evicted_at_max_size():
+    dedup = DuplicateFilter(max_size=2)
+    dedup.add('1')
+    dedup.add('2')
+    dedup.add('1')
+    dedup.add('3')
+
+    assert '1' in dedup
+    assert '2' not in dedup
+    assert '3' in dedup
+
+
+def test_memory_bytes_tracks_entries():
+    dedup = DuplicateFilter(max_size=1)
+    empty = dedup.memory_bytes
+    dedup.add('a' * 100)
+    full = dedup.memory_bytes
+    assert full > empty + 100
+    dedup.add('b')
+    assert dedup.memory_bytes < full
+
+
+def test_manager_acks_duplicates_without_dispatch():
+    dedup = DuplicateFilter()
+    dedup.add('seen')
+    dispatcher = mock.Mock()
+    manager = streaming.StreamingPullManager(
+        mock.Mock(), 'projects/p/subscriptions/s', None,
+        dispatcher=dispatcher, duplicate_filter=dedup)
+    stream = mock.Mock()
+
+    manager._on_response(stream, pubsub.StreamingPullResponse(received_messages=[
+        pubsub.ReceivedMessage(ack_id='a1', message=pubsub.PubsubMessage(message_id='seen')),
+        pubsub.ReceivedMessage(ack_id='a2', message=pubsub.PubsubMessage(message_id='new')),
+    ]))
+
+    stream.ack.assert_called_once_with(['a1'])
+    assert dispatcher.dispatch.call_count == 1
+    message = dispatcher.dispatch.call_args[0][0]
+    assert message.ack_id == 'a2'
+    assert manager.leased_messages == 1
+
+    message.ack()
+    assert 'new' in dedup
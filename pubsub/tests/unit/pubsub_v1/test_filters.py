@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import pytest
+
+from google.pubsub_v1.services.subscriber import filters
+from google.pubsub_v1.types import pubsub
+
+
+@pytest.mark.parametrize('expression, attributes, expected', [
+    ('attributes:region', {'region': 'eu'}, True),
+    ('attributes:region', {}, False),
+    ('attributes:"my key"', {'my key': ''}, True),
+    ('attributes.region = "eu"', {'region': 'eu'}, True),
+    ('attributes.region = "eu"', {'region': 'us'}, False),
+    ('attributes.region != "eu"', {}, True),
+    ('attributes.region != "eu"', {'region': 'eu'}, False),
+    ('attributes.name = "say \\"hi\\""', {'name': 'say "hi"'}, True),
+    ('hasPrefix(attributes.type, "user.")', {'type': 'user.created'}, True),
+    ('hasPrefix(attributes.type, "user.")', {'type': 'order'}, False),
+    ('hasPrefix(attributes.type, "")', {}, False),
+    ('NOT attributes:test', {'test': '1'}, False),
+    ('-attributes:test', {}, True),
+    ('attributes:a AND attributes:b AND attributes:c', {'a': '', 'b': '', 'c': ''}, True),
+    ('attributes:a AND attributes:b', {'a': ''}, False),
+    ('attributes:a OR attributes:b', {'b': ''}, True),
+    ('attributes:a AND (attributes:b OR NOT attributes:c)', {'a': ''}, True),
+    ('attributes:a AND (attributes:b OR NOT attributes:c)', {'a': '', 'c': ''}, False),
+    ('attributes.my-key = "x"', {'my-key': 'x'}, True),
+])
+def test_matches(expression, attributes, expected):
+    assert filters.compile_filter(expression).matches(attributes) is expected
+
+
+@pytest.mark.parametrize('expression', [
+    '',
+    'attributes',
+    'attributes:',
+    'attributes.a = b',
+    'attributes.a > "b"',
+    'attributes:a AND attributes:b OR attributes:c',
+    '(attributes:a',
+    'attributes:a)',
+    'labels:a',
+    'hasPrefix(attributes.a "b")',
+    'attributes:a #',
+    'attributes.a = "{}"'.format('x' * 300),
+])
+def test_syntax_errors(expression):
+    with pytest.raises(filters.FilterSyntaxError):
+        filters.compile_filter(expression)
+
+
+def test_compile_is_cached():
+    assert filters.compile_filter('attributes:a') is filters.compile_filter('attributes:a')
+
+
+def test_matches_batch_and_filter_messages():
+    filter_ = filters.compile_filter('attributes.kind = "a"')
+    batch = [{'kind': 'a'}, {'kind': 'b'}, {}]
+    assert filter_.matches_batch(batch) == [True, False, False]
+
+    messages = [pubsub.PubsubMessage(attributes=a) for a in batch]
+    assert filter_.filter_messages(messages) == messages[:1]
+
+
+def test_router():
+    orders, users, fallback = mock.Mock(), mock.Mock(), mock.Mock()
+    router = filters.FilterRouter([
+        ('attributes.type = "order"', orders),
+        ('hasPrefix(attributes.type, "user.")', users),
+    ], default=fallback)
+
+    def message(**attributes):
+        return mock.Mock(message=pubsub.PubsubMessage(attributes=attributes))
+
+    order = message(type='order')
+    router(order)
+    orders.assert_called_once_with(order)
+
+    user = message(type='user.new')
+    router(user)
+    users.assert_called_once_with(user)
+
+    other = message()
+    router(other)
+    fallback.assert_called_once_with(other)
+
+
+def test_router_acks_unmatched_without_default():
+    router = filters.FilterRouter([('attributes:a', mock.Mock())])
+    message = mock.Mock(message=pubsub.PubsubMessage())
+    router(message)
+    message.ack.assert_called_once_with()
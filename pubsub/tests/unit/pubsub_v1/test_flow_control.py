@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+
+from google.pubsub_v1.services.subscriber import streaming
+from google.pubsub_v1.services.subscriber.flow_control import FlowController
+from google.pubsub_v1.types import pubsub
+
+
+def test_saturates_on_messages():
+    controller = FlowController(max_messages=2, max_bytes=0)
+    controller.add(1, 10)
+    assert not controller.saturated
+    controller.add(1, 10)
+    assert controller.saturated
+    assert not controller.wait_for_capacity(timeout=0)
+
+    controller.release(1, 10)
+    assert controller.wait_for_capacity(timeout=0)
+    assert controller.outstanding_messages == 1
+    assert controller.outstanding_bytes == 10
+
+
+def test_saturates_on_bytes():
+    controller = FlowController(max_messages=0, max_bytes=100)
+    controller.add(1, 150)
+    assert controller.saturated
+    controller.release(1, 150)
+    assert not controller.saturated
+
+
+def test_release_never_goes_negative():
+    controller = FlowController()
+    controller.release(3, 300)
+    assert controller.outstanding_messages == 0
+    assert controller.outstanding_bytes == 0
+
+
+def test_close_wakes_waiters():
+    controller = FlowController(max_messages=1)
+    controller.add(1, 1)
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(controller.wait_for_capacity()))
+    waiter.start()
+    controller.close()
+    waiter.join(5)
+    assert result == [True]
+
+
+class RecordingClient:
+    def __init__(self, responses):
+        self.responses = responses
+        self.read = 0
+
+    def streaming_pull(self, requests, metadata=()):
+        for response in self.responses:
+            self.read += 1
+            yield response
+
+
+def test_stream_pauses_while_saturated(make_received):
+    client = RecordingClient([
+        pubsub.StreamingPullResponse(received_messages=make_received('1', '2')),
+        pubsub.StreamingPullResponse(received_messages=make_received('3')),
+    ])
+    received = []
+    arrived = threading.Semaphore(0)
+
+    def callback(message):
+        received.append(message)
+        arrived.release()
+
+    manager = streaming.StreamingPullManager(
+        client, 'projects/p/subscriptions/s', callback, worker_count=1,
+        flow_control=FlowController(max_messages=2))
+    manager.start()
+    assert arrived.acquire(timeout=5) and arrived.acquire(timeout=5)
+
+    # Two messages are leased, so the second response is not read.
+    assert not arrived.acquire(timeout=0.2)
+    assert client.read == 1
+    assert manager.flow_control.outstanding_messages == 2
+
+    received[0].ack()
+    assert arrived.acquire(timeout=5)
+    assert client.read == 2
+    manager.close()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import pytest
+
+from google.pubsub_v1.services.subscriber import streaming
+from google.pubsub_v1.services.subscriber.histogram import Histogram
+from google.pubsub_v1.types import pubsub
+
+
+def test_empty_histogram_returns_minimum():
+    histogram = Histogram()
+    assert len(histogram) == 0
+    assert histogram.percentile(99) == 10
+
+
+def test_samples_are_rounded_up_and_clamped():
+    histogram = Histogram()
+    histogram.add(0.1)
+    assert histogram.percentile(100) == 10
+    histogram.add(10.2)
+    assert histogram.percentile(100) == 11
+    histogram.add(5000)
+    assert histogram.percentile(100) == 600
+    assert len(histogram) == 3
+
+
+def test_percentile():
+    histogram = Histogram()
+    for _ in range(98):
+        histogram.add(20)
+    histogram.add(45)
+    histogram.add(300)
+
+    assert histogram.percentile(50) == 20
+    assert histogram.percentile(99) == 45
+    assert histogram.percentile(100) == 300
+
+
+def test_invalid_range():
+    with pytest.raises(ValueError):
+        Histogram(min_value=20, max_value=10)
+
+
+def make_manager(**kwargs):
+    return streaming.StreamingPullManager(
+        mock.Mock(), 'projects/p/subscriptions/s', lambda m: None, **kwargs)
+
+
+def lease(manager, ack_id, stream, received_time):
+    message = streaming.Message(
+        pubsub.ReceivedMessage(ack_id=ack_id), stream, manager)
+    message.received_time = received_time
+    manager._leased[ack_id] = message
+    manager.flow_control.add(1, message.size)
+    return message
+
+
+def test_ack_deadline_follows_processing_time():
+    manager = make_manager()
+    assert manager.ack_deadline == 10
+
+    with mock.patch('time.monotonic', return_value=100.0):
+        for i in range(10):
+            message = lease(manager, str(i), mock.Mock(), received_time=100.0 - 42)
+            message.ack()
+    assert manager.ack_deadline == 42
+
+
+def test_fixed_ack_deadline():
+    manager = make_manager(stream_ack_deadline_seconds=120)
+    manager.histogram.add(30)
+    assert manager.ack_deadline == 120
+
+
+@pytest.mark.parametrize('seconds', [0, 9, 601])
+def test_fixed_ack_deadline_out_of_range(seconds):
+    with pytest.raises(ValueError):
+        make_manager(stream_ack_deadline_seconds=seconds)
+
+
+def test_extend_leases_per_stream_and_drops_expired():
+    manager = make_manager(max_lease_duration=100, stream_ack_deadline_seconds=30)
+    first, second = mock.Mock(), mock.Mock()
+    with mock.patch('time.monotonic', return_value=1000.0):
+        lease(manager, 'a', first, received_time=990.0)
+        lease(manager, 'b', first, received_time=995.0)
+        lease(manager, 'c', second, received_time=999.0)
+        lease(manager, 'old', second, received_time=800.0)
+        manager._extend_leases()
+
+    first.modify_ack_deadline.assert_called_once_with(['a', 'b'], 30)
+    second.modify_ack_deadline.assert_called_once_with(['c'], 30)
+    assert manager.leased_messages == 3
+    assert manager.flow_control.outstanding_messages == 3
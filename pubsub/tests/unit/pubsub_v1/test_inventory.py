@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import os
+
+import pytest
+
+from google.api_core import exceptions
+from google.pubsub_v1.services import inventory
+from google.pubsub_v1.services.publisher import pagers as publisher_pagers
+from google.pubsub_v1.services.subscriber import pagers as subscriber_pagers
+from google.pubsub_v1.types import pubsub
+
+
+class FakeClient:
+    """Lists two pages per project, tracking how many listings overlap."""
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.active = 0
+        self.max_active = 0
+
+    async def _list(self, project, response_type, pager_type, field, make):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if project in self.failing:
+                raise exceptions.PermissionDenied('no access to ' + project)
+        finally:
+            self.active -= 1
+
+        async def method(request):
+            await asyncio.sleep(0.01)
+            return response_type(**{field: [make(project, 'second')]})
+
+        first = response_type(**{field: [make(project, 'first')]}, next_page_token='next')
+        return pager_type(method, {}, first)
+
+    def list_topics_async(self, project, executor):
+        return self._list(project, pubsub.ListTopicsResponse,
+                          publisher_pagers.ListTopicsAsyncPager, 'topics',
+                          lambda p, n: pubsub.Topic(name=p + '/topics/' + n))
+
+    def list_subscriptions_async(self, project, executor):
+        return self._list(project, pubsub.ListSubscriptionsResponse,
+                          subscriber_pagers.ListSubscriptionsAsyncPager, 'subscriptions',
+                          lambda p, n: pubsub.Subscription(name=p + '/subscriptions/' + n))
+
+    def list_snapshots_async(self, project, executor):
+        return self._list(project, pubsub.ListSnapshotsResponse,
+                          subscriber_pagers.ListSnapshotsAsyncPager, 'snapshots',
+                          lambda p, n: pubsub.Snapshot(name=p + '/snapshots/' + n))
+
+
+def collect(**kwargs):
+    async def run():
+        return [item async for item in inventory.list_resources(**kwargs)]
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+
+def test_lists_every_project_with_bounded_concurrency():
+    client = FakeClient()
+    projects = ['p{}'.format(i) for i in range(20)]
+    results = collect(projects=projects, publisher=client, subscriber=client,
+                      max_concurrency=4)
+
+    assert len(results) == 20 * 3 * 2
+    assert client.max_active <= 4
+    names = {resource.name for _, _, resource in results}
+    assert 'projects/p7/subscriptions/second' in names
+    assert {kind for _, kind, _ in results} == {
+        inventory.TOPICS, inventory.SUBSCRIPTIONS, inventory.SNAPSHOTS}
+
+
+def test_kinds_default_to_the_given_clients():
+    results = collect(projects=['projects/p'], publisher=FakeClient())
+    assert [kind for _, kind, _ in results] == [inventory.TOPICS] * 2
+    assert results[0][0] == 'projects/p'
+
+
+def test_failures():
+    client = FakeClient(failing=['projects/bad'])
+    with pytest.raises(exceptions.PermissionDenied):
+        collect(projects=['good', 'bad'], publisher=client)
+
+    results = collect(projects=['good', 'bad'], publisher=client, return_exceptions=True)
+    errors = [item for item in results if isinstance(item[2], Exception)]
+    assert [(project, kind) for project, kind, _ in errors] == [('projects/bad', 'topics')]
+    assert len(results) == 3
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        collect(projects=['p'], kinds=['snapshots'], publisher=FakeClient())
+    with pytest.raises(ValueError):
+        collect(projects=['p'], kinds=['queues'], publisher=FakeClient())
+    with pytest.raises(ValueError):
+        collect(projects=['p'], publisher=FakeClient(), max_concurrency=0)
+
+
+class StaticClient:
+    """Lists the topics and subscriptions currently in ``self.topics`` and
+    ``self.subscriptions``, keyed by project."""
+    def __init__(self):
+        self.topics = {}
+        self.subscriptions = {}
+        self.failing = set()
+
+    async def list_topics_async(self, project, executor):
+        if project in self.failing:
+            raise exceptions.ServiceUnavailable('try again')
+        response = pubsub.ListTopicsResponse(topics=self.topics.get(project, []))
+        return publisher_pagers.ListTopicsAsyncPager(None, {}, response)
+
+    async def list_subscriptions_async(self, project, executor):
+        response = pubsub.ListSubscriptionsResponse(
+            subscriptions=self.subscriptions.get(project, []))
+        return subscriber_pagers.ListSubscriptionsAsyncPager(None, {}, response)
+
+
+def test_inventory_reports_changes(tmpdir):
+    client = StaticClient()
+    client.topics['projects/a'] = [
+        pubsub.Topic(name='projects/a/topics/t1', labels={'team': 'x'}),
+        pubsub.Topic(name='projects/a/topics/t2'),
+    ]
+    client.subscriptions['projects/a'] = [
+        pubsub.Subscription(name='projects/a/subscriptions/s', topic='projects/a/topics/t1',
+                            ack_deadline_seconds=10),
+    ]
+    client.topics['projects/b'] = [pubsub.Topic(name='projects/b/topics/t')]
+    inventory_ = inventory.Inventory(
+        publisher=client, subscriber=client,
+        kinds=[inventory.TOPICS, inventory.SUBSCRIPTIONS])
+
+    changes = inventory_.refresh(['a', 'b'])
+    assert sorted((c.type, c.name) for c in changes) == [
+        ('added', 'projects/a/subscriptions/s'),
+        ('added', 'projects/a/topics/t1'),
+        ('added', 'projects/a/topics/t2'),
+        ('added', 'projects/b/topics/t'),
+    ]
+    assert inventory_.get('projects/a/subscriptions/s') == {
+        'topic': 'projects/a/topics/t1', 'ack_deadline_seconds': 10}
+    assert inventory_.refresh(['a', 'b']) == []
+
+    # Changes survive a restart.
+    path = os.path.join(str(tmpdir), 'index.json')
+    inventory_.save(path)
+    inventory_ = inventory.Inventory.load(
+        path, publisher=client, subscriber=client,
+        kinds=[inventory.TOPICS, inventory.SUBSCRIPTIONS])
+    assert len(inventory_) == 4
+
+    client.topics['projects/a'] = [
+        pubsub.Topic(name='projects/a/topics/t1', labels={'team': 'y'}),
+        pubsub.Topic(name='projects/a/topics/t3'),
+    ]
+    client.failing.add('projects/b')
+    changes = {c.name: c for c in inventory_.refresh(['a', 'b'])}
+    assert {name: c.type for name, c in changes.items()} == {
+        'projects/a/topics/t1': 'changed',
+        'projects/a/topics/t2': 'removed',
+        'projects/a/topics/t3': 'added',
+    }
+    assert changes['projects/a/topics/t1'].changed_fields == ['labels']
+    assert changes['projects/a/topics/t2'].new is None
+    # The failed listing keeps its resources.
+    assert 'projects/b/topics/t' in inventory_
+    assert [(p, k) for p, k, _ in inventory_.failures] == [('projects/b', 'topics')]
+
+    # Projects left out of a refresh are untouched.
+    assert inventory_.refresh(['a']) == []
+    assert sorted(inventory_.names(inventory.TOPICS)) == [
+        'projects/a/topics/t1', 'projects/a/topics/t3', 'projects/b/topics/t']
+
+
+def test_load_missing_and_incompatible(tmpdir):
+    path = os.path.join(str(tmpdir), 'index.json')
+    assert len(inventory.Inventory.load(path, publisher=StaticClient())) == 0
+    with open(path, 'w') as f:
+        f.write('{"version": 99, "resources": {}}')
+    with pytest.raises(ValueError):
+        inventory.Inventory.load(path, publisher=StaticClient())
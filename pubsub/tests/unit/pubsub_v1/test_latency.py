@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import sys
+import threading
+
+from google.pubsub_v1.services.subscriber import latency
+from google.pubsub_v1.services.subscriber.latency import DeliveryMetrics
+
+
+def test_percentiles_per_subscription():
+    metrics = DeliveryMetrics()
+    for seconds in range(1, 101):
+        metrics.record('projects/p/subscriptions/a', latency.DELIVERY, seconds)
+    metrics.record('projects/p/subscriptions/b', latency.HANDLER, 0.5)
+
+    assert 90 <= metrics.percentile('projects/p/subscriptions/a', latency.DELIVERY, 99) <= 100
+    assert metrics.percentile('projects/p/subscriptions/a', latency.HANDLER, 99) == 0.0
+    assert metrics.percentile('projects/p/subscriptions/b', latency.HANDLER, 50) == 0.5
+    assert metrics.percentile('projects/p/subscriptions/unknown', latency.ACK, 50) == 0.0
+
+
+def test_clock_skew_counts_as_zero():
+    metrics = DeliveryMetrics()
+    metrics.record('projects/p/subscriptions/a', latency.DELIVERY, -3)
+    assert metrics.snapshot()['projects/p/subscriptions/a']['delivery']['max'] == 0.0
+
+
+def test_snapshot_reset():
+    metrics = DeliveryMetrics()
+    metrics.record('projects/p/subscriptions/a', latency.ACK, 2)
+    snapshot = metrics.snapshot(reset=True)
+    assert snapshot['projects/p/subscriptions/a']['ack']['count'] == 1
+    assert snapshot['projects/p/subscriptions/a']['delivery']['count'] == 0
+    assert metrics.snapshot() == {}
+
+
+def test_reset_loses_no_samples():
+    metrics = DeliveryMetrics()
+    subscription = 'projects/p/subscriptions/a'
+
+    def acks_since_last_snapshot():
+        snapshot = metrics.snapshot(reset=True)
+        return snapshot[subscription]['ack']['count'] if snapshot else 0
+
+    def record():
+        for _ in range(5000):
+            metrics.record(subscription, latency.ACK, 1)
+
+    # Switch threads often, so that resets land between recorders'
+    # steps.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        total = 0
+        while any(thread.is_alive() for thread in threads):
+            total += acks_since_last_snapshot()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    total += acks_since_last_snapshot()
+    assert total == 4 * 5000
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import importlib.util
+import os
+
+import pytest
+
+_SCRIPT = os.path.join(
+    os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, 'scripts', 'loadgen.py')
+
+
+@pytest.fixture(scope='module')
+def loadgen():
+    spec = importlib.util.spec_from_file_location('loadgen', _SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_every_publisher_gets_an_ordering_key(loadgen):
+    keys = [loadgen._ordering_keys(index, 2, 4) for index in range(4)]
+    assert keys == [['key-0'], ['key-1'], ['key-0'], ['key-1']]
+    keys = [loadgen._ordering_keys(index, 5, 2) for index in range(2)]
+    assert keys == [['key-0', 'key-2', 'key-4'], ['key-1', 'key-3']]
+    assert loadgen._ordering_keys(3, 0, 4) == ['']
+
+
+def test_local_run_receives_everything_published(loadgen):
+    args = loadgen.parse_args([
+        '--local', '-d', '0.5', '-r', '400', '-b', '10', '-p', '2', '-k', '1',
+        '--drain', '10',
+    ])
+    report = loadgen.run(args)
+    assert report['errors'] == {}
+    assert report['published'] > 0
+    assert report['received'] == report['published']
+    assert report['subscriber_latency_s']['ack']['count'] == report['received']
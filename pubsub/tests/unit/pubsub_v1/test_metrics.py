@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import grpc
+import pytest
+
+from google.api_core import exceptions
+from google.api_core import gapic_v1
+from google.api_core import retry as retries
+from google.pubsub_v1.services import metrics
+from google.pubsub_v1.services.publisher import PublisherClient
+from google.pubsub_v1.services.publisher import transports
+from google.pubsub_v1.types import pubsub
+
+
+PUBLISH = '/google.pubsub.v1.Publisher/Publish'
+GET_TOPIC = '/google.pubsub.v1.Publisher/GetTopic'
+
+
+def test_histogram_percentiles():
+    histogram = metrics.ExponentialHistogram(min_value=1, max_value=1000, factor=2)
+    assert histogram.percentile(50) == 0.0
+    for value in range(1, 101):
+        histogram.add(value)
+    assert len(histogram) == 100
+    assert histogram.mean == 50.5
+    assert histogram.max == 100
+    assert histogram.percentile(50) == 64
+    assert histogram.percentile(99) == 100
+    histogram.add(5000)
+    assert histogram.percentile(100) == 5000
+    with pytest.raises(ValueError):
+        metrics.ExponentialHistogram(factor=1)
+
+
+def test_disabled_installs_no_interceptor():
+    channel = mock.Mock()
+    assert metrics.instrument(channel, None) is channel
+    transport = transports.PublisherGrpcTransport(channel=channel)
+    assert transport.grpc_channel is channel
+    # Nor does it open a scope per call for counting retries.
+    client = PublisherClient(transport=transport)
+    assert client._wrap_method is gapic_v1.method.wrap_method
+
+    sink = metrics.InMemoryMetricsSink()
+    client = PublisherClient(transport=transports.PublisherGrpcTransport(
+        channel=channel, metrics_sink=sink))
+    assert client._wrap_method is metrics.wrap_method
+
+
+def test_sink_must_implement_record():
+    with pytest.raises(TypeError):
+        metrics.MetricsSink()
+
+
+def test_records_unary_calls(channel):
+    sink = metrics.InMemoryMetricsSink()
+    transport = transports.PublisherGrpcTransport(channel=channel, metrics_sink=sink)
+
+    request = pubsub.PublishRequest(
+        topic='projects/p/topics/t', messages=[pubsub.PubsubMessage(data=b'x' * 100)])
+    response = transport.publish(request)
+    assert response.message_ids == ['0']
+    # Sending the same request again is a new call, not a retry.
+    transport.publish(request)
+    with pytest.raises(grpc.RpcError):
+        transport.get_topic(pubsub.GetTopicRequest(topic='projects/p/topics/t'))
+
+    snapshot = sink.snapshot()
+    publish = snapshot[PUBLISH]
+    assert publish['calls'] == 2
+    assert publish['retries'] == 0
+    assert publish['codes'] == {'OK': 2}
+    assert publish['request_bytes'] == 2 * pubsub.PublishRequest.pb(request).ByteSize()
+    assert publish['response_bytes'] == 2 * pubsub.PublishResponse.pb(response).ByteSize()
+    assert publish['latency']['count'] == 2
+    assert publish['latency']['max'] > 0
+    assert snapshot[GET_TOPIC]['codes'] == {'NOT_FOUND': 1}
+    assert snapshot[GET_TOPIC]['retries'] == 0
+
+
+def test_counts_retries(publisher_server, channel):
+    sink = metrics.InMemoryMetricsSink()
+    client = PublisherClient(transport=transports.PublisherGrpcTransport(
+        channel=channel, metrics_sink=sink))
+    retry = retries.Retry(
+        predicate=retries.if_exception_type(exceptions.ServiceUnavailable),
+        initial=0.01)
+
+    publisher_server.errors.append(grpc.StatusCode.UNAVAILABLE)
+    client.publish(topic='projects/p/topics/t', retry=retry)
+    for _ in range(5):
+        client.publish(topic='projects/p/topics/t', retry=retry)
+
+    publish = sink.snapshot()[PUBLISH]
+    assert publish['calls'] == 7
+    assert publish['retries'] == 1
+    assert publish['codes'] == {'UNAVAILABLE': 1, 'OK': 6}
+
+
+def test_sink_errors_are_contained(channel):
+    sink = mock.Mock(spec=metrics.MetricsSink)
+    sink.record.side_effect = RuntimeError('sink down')
+    transport = transports.PublisherGrpcTransport(channel=channel, metrics_sink=sink)
+    transport.publish(pubsub.PublishRequest(topic='projects/p/topics/t'))
+    record = sink.record.call_args[0][0]
+    assert record.method == PUBLISH
+    assert record.code == grpc.StatusCode.OK
+    assert not record.retry
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import threading
+import time
+
+import pytest
+
+from google.auth import credentials
+from google.pubsub_v1.services.subscriber import SubscriberClient
+from google.pubsub_v1.services.subscriber import ordering
+from google.pubsub_v1.services.subscriber import streaming
+
+
+def test_worker_count_must_be_positive():
+    with pytest.raises(ValueError):
+        ordering.OrderedDispatcher(lambda m: None, worker_count=0)
+
+
+def test_messages_with_same_key_run_sequentially_in_order(make_message):
+    lock = threading.Lock()
+    running = {}
+    overlaps = []
+    handled = []
+
+    def callback(message):
+        key = message.message.ordering_key
+        with lock:
+            if running.get(key):
+                overlaps.append(key)
+            running[key] = True
+        time.sleep(0.001)
+        with lock:
+            running[key] = False
+            handled.append((key, message.message.message_id))
+
+    dispatcher = ordering.OrderedDispatcher(callback, worker_count=4)
+    dispatcher.start()
+    for i in range(20):
+        for key in ('a', 'b', 'c'):
+            dispatcher.dispatch(make_message(str(i), key))
+    dispatcher.close()
+
+    assert overlaps == []
+    assert dispatcher.active_keys == 0
+    for key in ('a', 'b', 'c'):
+        ids = [message_id for k, message_id in handled if k == key]
+        assert ids == [str(i) for i in range(20)]
+
+
+def test_different_keys_run_in_parallel(make_message):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def callback(message):
+        # Deadlocks unless both keys are handled at the same time.
+        barrier.wait()
+
+    dispatcher = ordering.OrderedDispatcher(callback, worker_count=2)
+    dispatcher.start()
+    dispatcher.dispatch(make_message('1', 'a'))
+    dispatcher.dispatch(make_message('2', 'b'))
+    dispatcher.close()
+    assert not barrier.broken
+
+
+def test_unkeyed_messages_are_dispatched(make_message):
+    handled = []
+    dispatcher = ordering.OrderedDispatcher(handled.append, worker_count=2)
+    dispatcher.start()
+    messages = [make_message(str(i)) for i in range(5)]
+    for message in messages:
+        dispatcher.dispatch(message)
+    dispatcher.close()
+    assert sorted(handled, key=lambda m: m.ack_id) == messages
+
+
+def test_failure_nacks_rest_of_key(make_message):
+    first_started = threading.Event()
+    release = threading.Event()
+
+    def callback(message):
+        if message.message.message_id == '1':
+            first_started.set()
+            release.wait(5)
+            raise RuntimeError('boom')
+
+    dispatcher = ordering.OrderedDispatcher(callback, worker_count=2)
+    dispatcher.start()
+    messages = [make_message(str(i), 'k') for i in range(1, 4)]
+    dispatcher.dispatch(messages[0])
+    assert first_started.wait(5)
+    dispatcher.dispatch(messages[1])
+    dispatcher.dispatch(messages[2])
+    release.set()
+    dispatcher.close()
+
+    for message in messages:
+        message._manager._complete.assert_called_once_with(message, ack=False)
+
+
+def test_messages_after_close_are_nacked(make_message):
+    handled = []
+    dispatcher = ordering.OrderedDispatcher(handled.append, worker_count=1)
+    dispatcher.start()
+    dispatcher.close()
+
+    late = [make_message('1', 'k'), make_message('2')]
+    for message in late:
+        dispatcher.dispatch(message)
+    assert handled == []
+    for message in late:
+        message._manager._complete.assert_called_once_with(message, ack=False)
+
+
+def test_subscribe_with_message_ordering():
+    client = SubscriberClient(credentials=credentials.AnonymousCredentials())
+    with mock.patch.object(streaming.StreamingPullManager, 'start', autospec=True) as start:
+        start.side_effect = lambda manager: manager
+        manager = client.subscribe(
+            'projects/p/subscriptions/s', lambda m: None,
+            enable_message_ordering=True)
+
+    assert isinstance(manager._dispatcher, ordering.OrderedDispatcher)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import subprocess
+import sys
+
+import pytest
+
+import google.pubsub
+import google.pubsub_v1
+from google.pubsub_v1.services.publisher import PublisherClient
+from google.pubsub_v1.types import pubsub
+
+
+@pytest.mark.parametrize('package', [google.pubsub, google.pubsub_v1])
+def test_public_names_resolve(package):
+    for name in package.__all__:
+        assert getattr(package, name) is not None
+        assert name in dir(package)
+    assert package.PublisherClient is PublisherClient
+    assert package.Topic is pubsub.Topic
+    with pytest.raises(AttributeError):
+        package.NoSuchName
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='requires PEP 562')
+def test_publisher_import_skips_subscriber():
+    script = (
+        'import sys\n'
+        'import google.pubsub\n'
+        'assert "grpc" not in sys.modules\n'
+        'google.pubsub.PublisherClient\n'
+        'assert not [m for m in sys.modules if ".subscriber" in m]\n'
+    )
+    subprocess.run([sys.executable, '-c', script], check=True)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import re
+
+import pytest
+
+from google.pubsub_v1.services.path_template import PathTemplate
+from google.pubsub_v1.services.publisher import PublisherClient
+from google.pubsub_v1.services.subscriber import SubscriberClient
+
+
+def test_format_and_parse_round_trip():
+    template = PathTemplate('projects/{project}/topics/{topic}')
+    assert template.variables == ('project', 'topic')
+
+    path = template.format(project='p', topic='t')
+    assert path == 'projects/p/topics/t'
+    assert template.parse(path) == {'project': 'p', 'topic': 't'}
+    assert template.matches(path)
+
+
+def test_parse_matches_generated_regex():
+    template = PathTemplate('projects/{project}/topics/{topic}')
+    legacy = re.compile(r"^projects/(?P<project>.+?)/topics/(?P<topic>.+?)$")
+    for path in ['projects/p/topics/t', 'projects/a/b/topics/c/d',
+                 'projects//topics/t', 'projects/p/subscriptions/s', 'x']:
+        m = legacy.match(path)
+        assert template.parse(path) == (m.groupdict() if m else {})
+
+
+def test_literal_text_is_escaped():
+    template = PathTemplate('a.b/{x}')
+    assert template.parse('a.b/1') == {'x': '1'}
+    assert template.parse('axb/1') == {}
+
+
+def test_formatted_names_are_interned_and_cached():
+    template = PathTemplate('projects/{project}/topics/{topic}')
+    first = template.format(project='p', topic=''.join(['t', 'opic']))
+    second = template.format(project='p', topic='topic')
+    assert first is second
+    assert template.cache_info()['format'].hits == 1
+
+
+def test_parse_returns_fresh_dicts():
+    template = PathTemplate('projects/{project}')
+    template.parse('projects/p')['project'] = 'changed'
+    assert template.parse('projects/p') == {'project': 'p'}
+
+
+def test_format_missing_variable():
+    template = PathTemplate('projects/{project}/topics/{topic}')
+    with pytest.raises(KeyError):
+        template.format(project='p')
+
+
+def test_format_unhashable_value():
+    template = PathTemplate('projects/{project}')
+    assert template.format(project=['p']) == "projects/['p']"
+
+
+def test_template_without_variables():
+    template = PathTemplate('_deleted-topic_')
+    assert template.parse('_deleted-topic_') == {}
+    assert template.matches('_deleted-topic_')
+    with pytest.raises(ValueError):
+        template.parse('projects/p/topics/t')
+    with pytest.raises(ValueError):
+        template.parse_many(['_deleted-topic_', 'other'])
+
+
+def test_bulk_format_falls_back_per_item():
+    template = PathTemplate('projects/{project}')
+    assert template.format_many([{'project': 'p'}, {'project': ['q']}]) == [
+        'projects/p', "projects/['q']"]
+    with pytest.raises(KeyError, match='Segments 1'):
+        template.format_many([{'project': 'p'}, {'topic': 't'}])
+
+
+def test_bulk_format_and_parse():
+    template = PathTemplate('projects/{project}/topics/{topic}')
+    paths = template.format_many([
+        {'project': 'p', 'topic': 'a'},
+        {'project': 'p', 'topic': 'b'},
+    ])
+    assert paths == ['projects/p/topics/a', 'projects/p/topics/b']
+    assert template.parse_many(paths + ['bad']) == [
+        {'project': 'p', 'topic': 'a'},
+        {'project': 'p', 'topic': 'b'},
+        {},
+    ]
+
+
+def test_clients_use_templates():
+    assert PublisherClient.topic_path_template.matches(
+        PublisherClient.topic_path('p', 't'))
+    assert SubscriberClient.parse_subscription_path(
+        'projects/p/subscriptions/s') == {'project': 'p', 'subscription': 's'}
+    assert SubscriberClient.parse_snapshot_path('nope') == {}
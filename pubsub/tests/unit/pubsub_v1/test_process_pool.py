@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import time
+
+import pytest
+
+from google.pubsub_v1.services.subscriber import process_pool
+
+
+def ack_even_payloads(message):
+    # Runs in a worker process.
+    if message.data == b'raise':
+        raise RuntimeError('boom')
+    if message.data == b'hang':
+        time.sleep(60)
+    return int(message.data) % 2 == 0
+
+
+def test_process_count_must_be_positive():
+    with pytest.raises(ValueError):
+        process_pool.ProcessPoolDispatcher(ack_even_payloads, process_count=0)
+
+
+def test_decisions_are_applied_in_parent(make_message):
+    dispatcher = process_pool.ProcessPoolDispatcher(
+        ack_even_payloads, process_count=2, slots_per_process=2)
+    messages = [make_message(str(i), data=str(i).encode()) for i in range(6)]
+    messages.append(make_message('r', data=b'raise'))
+
+    dispatcher.start()
+    for message in messages:
+        dispatcher.dispatch(message)
+    dispatcher.close()
+
+    assert dispatcher.pending == 0
+    for i, message in enumerate(messages[:6]):
+        manager = message._manager
+        manager._complete.assert_called_once_with(message, ack=(i % 2 == 0))
+    messages[6]._manager._complete.assert_called_once_with(messages[6], ack=False)
+
+
+def test_oversize_payloads_are_sent_inline(make_message):
+    dispatcher = process_pool.ProcessPoolDispatcher(
+        ack_even_payloads, process_count=1, slot_size=1)
+    message = make_message('1', data=b'42')
+
+    dispatcher.start()
+    dispatcher.dispatch(message)
+    dispatcher.close()
+
+    message._manager._complete.assert_called_once_with(message, ack=True)
+
+
+def test_dead_worker_is_replaced_and_its_messages_nacked(make_message):
+    dispatcher = process_pool.ProcessPoolDispatcher(
+        ack_even_payloads, process_count=1, slots_per_process=2)
+    hanging = make_message('h', data=b'hang')
+
+    dispatcher.start()
+    dispatcher.dispatch(hanging)
+    dispatcher._processes[0].kill()
+    deadline = time.monotonic() + 10
+    while not hanging._manager._complete.called and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Nacked while the dispatcher is still running, with its slot freed.
+    hanging._manager._complete.assert_called_once_with(hanging, ack=False)
+    assert dispatcher.pending == 0
+    assert dispatcher._free_slots.qsize() == 2
+
+    message = make_message('2', data=b'2')
+    dispatcher.dispatch(message)
+    dispatcher.close()
+    message._manager._complete.assert_called_once_with(message, ack=True)
+
+
+def test_send_to_dead_worker_is_rolled_back(make_message):
+    dispatcher = process_pool.ProcessPoolDispatcher(
+        ack_even_payloads, process_count=1, slots_per_process=1)
+    message = make_message('2', data=b'2')
+
+    dispatcher.start()
+    with mock.patch.object(dispatcher._connections[0], 'send', side_effect=BrokenPipeError):
+        dispatcher.dispatch(message)
+
+    message._manager._complete.assert_called_once_with(message, ack=False)
+    assert dispatcher.pending == 0
+    assert dispatcher._free_slots.qsize() == 1
+    # The permit was released too, so the next dispatch does not block.
+    assert dispatcher._in_flight.acquire(timeout=0)
+    dispatcher._in_flight.release()
+    dispatcher.close()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import io
+import json
+
+import pytest
+
+from google.auth import credentials
+from google.pubsub_v1.services import profiling
+from google.pubsub_v1.services.publisher import PublisherClient
+from google.pubsub_v1.services.publisher import transports
+from google.pubsub_v1.services.subscriber import SubscriberClient
+from google.pubsub_v1.services.subscriber import streaming
+from google.pubsub_v1.types import pubsub
+
+
+def test_stages_of_a_call(channel):
+    profiler = profiling.Profiler()
+    transport = transports.PublisherGrpcTransport(channel=channel, profiler=profiler)
+    client = PublisherClient(transport=transport, profiler=profiler)
+
+    for _ in range(3):
+        response = client.publish(
+            topic='projects/p/topics/t',
+            messages=[pubsub.PubsubMessage(data=b'x' * 1000)] * 10)
+    assert len(response.message_ids) == 10
+
+    publish = profiler.snapshot()['publish']
+    assert publish['calls'] == 3
+    assert set(publish['stages']) == {
+        profiling.CONSTRUCTION, profiling.SERIALIZATION,
+        profiling.RPC, profiling.DESERIALIZATION}
+    for summary in publish['stages'].values():
+        assert summary['count'] == 3
+        assert summary['wall_total'] > 0
+        assert summary['cpu_total'] >= 0
+
+    report = profiler.report()
+    assert 'serialization' in report
+    out = io.StringIO()
+    profiler.dump(out, format='json')
+    assert json.loads(out.getvalue())['publish']['calls'] == 3
+
+
+def test_split_publish_reports_channel_stages(channel):
+    profiler = profiling.Profiler()
+    transport = transports.PublisherGrpcTransport(channel=channel, profiler=profiler)
+    client = PublisherClient(transport=transport, profiler=profiler)
+
+    # Split into two requests, sent on the splitter's threads.
+    response = client.publish(
+        topic='projects/p/topics/t',
+        messages=[pubsub.PubsubMessage(data=b'x')] * 1500)
+    assert len(response.message_ids) == 1500
+
+    stages = profiler.snapshot()['publish']['stages']
+    for stage in (profiling.SERIALIZATION, profiling.RPC, profiling.DESERIALIZATION):
+        assert stages[stage]['wall_total'] > 0
+
+
+def test_unsampled_calls_are_not_recorded(channel):
+    profiler = profiling.Profiler(sample_rate=0)
+    transport = transports.PublisherGrpcTransport(channel=channel, profiler=profiler)
+    client = PublisherClient(transport=transport, profiler=profiler)
+    client.publish(topic='projects/p/topics/t', messages=[pubsub.PubsubMessage(data=b'x')])
+    assert profiler.snapshot() == {}
+
+
+def test_disabled_leaves_channel_unwrapped():
+    channel = mock.Mock()
+    assert profiling.instrument(channel, None) is channel
+    client = PublisherClient(transport=transports.PublisherGrpcTransport(channel=channel))
+    assert client.publish.__func__ is PublisherClient.publish
+
+
+def test_subscribe_profiles_callback():
+    profiler = profiling.Profiler()
+    client = SubscriberClient(
+        credentials=credentials.AnonymousCredentials(), profiler=profiler)
+    callback = mock.Mock()
+    with mock.patch.object(streaming, 'StreamingPullManager', autospec=True) as manager:
+        client.subscribe('projects/p/subscriptions/s', callback)
+
+    profiled = manager.call_args[0][2]
+    profiled(mock.sentinel.message)
+    callback.assert_called_once_with(mock.sentinel.message)
+    assert profiler.snapshot()['subscribe']['stages']['callback']['count'] == 1
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        profiling.Profiler(sample_rate=-1)
+    with pytest.raises(ValueError):
+        profiling.Profiler().dump(io.StringIO(), format='xml')
@@ -17,6 +17,7 @@
 
 from unittest import mock
 
+import asyncio
 import grpc
 import math
 import pytest
@@ -81,7 +82,12 @@ def test_publisher_client_client_options():
         transport = gtc.return_value = mock.MagicMock()
         client = PublisherClient(client_options=options)
         transport.assert_called_once_with(
+            channel_options=None,
             credentials=None,
+            lazy=False,
+            metrics_sink=None,
+            profiler=None,
+            background_token_refresh=False,
             host=client.DEFAULT_ENDPOINT,
         )
 
@@ -94,7 +100,12 @@ def test_publisher_client_client_options():
         grpc_transport.assert_called_once_with(
             api_mtls_endpoint=None,
             client_cert_source=None,
+            channel_options=None,
             credentials=None,
+            lazy=False,
+            metrics_sink=None,
+            profiler=None,
+            background_token_refresh=False,
             host="squid.clam.whelk",
         )
 
@@ -108,7 +119,12 @@ def test_publisher_client_client_options():
         grpc_transport.assert_called_once_with(
             api_mtls_endpoint=client.DEFAULT_MTLS_ENDPOINT,
             client_cert_source=client_cert_source_callback,
+            channel_options=None,
             credentials=None,
+            lazy=False,
+            metrics_sink=None,
+            profiler=None,
+            background_token_refresh=False,
             host=client.DEFAULT_ENDPOINT,
         )
 
@@ -123,7 +139,12 @@ def test_publisher_client_client_options():
         grpc_transport.assert_called_once_with(
             api_mtls_endpoint="squid.clam.whelk",
             client_cert_source=client_cert_source_callback,
+            channel_options=None,
             credentials=None,
+            lazy=False,
+            metrics_sink=None,
+            profiler=None,
+            background_token_refresh=False,
             host="squid.clam.whelk",
         )
 
@@ -136,11 +157,29 @@ def test_publisher_client_client_options_from_dict():
         grpc_transport.assert_called_once_with(
             api_mtls_endpoint=None,
             client_cert_source=None,
+            channel_options=None,
             credentials=None,
+            lazy=False,
+            metrics_sink=None,
+            profiler=None,
+            background_token_refresh=False,
             host="squid.clam.whelk",
         )
 
 
+def test_publisher_client_channel_options_from_dict():
+    with mock.patch('google.pubsub_v1.services.publisher.transports.PublisherGrpcTransport.__init__') as grpc_transport:
+        grpc_transport.return_value = None
+        client = PublisherClient(
+            client_options={
+                'api_endpoint': 'squid.clam.whelk',
+                'channel_options': {'keepalive_time_ms': 30000},
+            }
+        )
+        channel_options = grpc_transport.call_args[1]['channel_options']
+        assert channel_options.keepalive_time_ms == 30000
+
+
 def test_create_topic(transport: str = 'grpc'):
     client = PublisherClient(
         credentials=credentials.AnonymousCredentials(),
@@ -614,6 +653,53 @@ def test_list_topics_pages():
             assert page.raw_page.next_page_token == token
 
 
+def test_list_topics_async_pager():
+    client = PublisherClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+            type(client._transport.list_topics),
+            '__call__') as call:
+        # Set the response to a series of pages.
+        call.side_effect = (
+            pubsub.ListTopicsResponse(
+                topics=[
+                    pubsub.Topic(),
+                    pubsub.Topic(),
+                ],
+                next_page_token='abc',
+            ),
+            pubsub.ListTopicsResponse(
+                topics=[],
+                next_page_token='def',
+            ),
+            pubsub.ListTopicsResponse(
+                topics=[
+                    pubsub.Topic(),
+                ],
+            ),
+            RuntimeError,
+        )
+
+        async def collect():
+            pager = await client.list_topics_async(project='projects/p')
+            assert isinstance(pager, pagers.ListTopicsAsyncPager)
+            return [i async for i in pager]
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(collect())
+        finally:
+            loop.close()
+        assert len(results) == 3
+        assert all(isinstance(i, pubsub.Topic)
+                   for i in results)
+        _, args, _ = call.mock_calls[0]
+        assert args[0].project == 'projects/p'
+
+
 def test_list_topic_subscriptions(transport: str = 'grpc'):
     client = PublisherClient(
         credentials=credentials.AnonymousCredentials(),
@@ -1027,6 +1113,86 @@ def test_publisher_grpc_transport_channel_mtls_with_client_cert_source(
     assert transport.grpc_channel == mock_grpc_channel
 
 
+@mock.patch("grpc.ssl_channel_credentials", autospec=True)
+@mock.patch("google.api_core.grpc_helpers.create_channel", autospec=True)
+def test_publisher_grpc_transport_lazy_mtls(
+    grpc_create_channel, grpc_ssl_channel_cred
+):
+    # Check that a lazy transport defers credentials, client certificate
+    # and channel creation until the channel is first needed.
+    callback = mock.Mock(return_value=(b"cert bytes", b"key bytes"))
+    mock_cred = mock.Mock()
+    with mock.patch.object(auth, 'default') as adc:
+        adc.return_value = (mock_cred, None)
+        transport = transports.PublisherGrpcTransport(
+            api_mtls_endpoint="mtls.squid.clam.whelk",
+            client_cert_source=callback,
+            lazy=True,
+        )
+        adc.assert_not_called()
+        callback.assert_not_called()
+        grpc_create_channel.assert_not_called()
+
+        with mock.patch.object(grpc, 'channel_ready_future') as ready:
+            transport.warm_up_in_background(timeout=5).join(5)
+        ready.assert_called_once_with(grpc_create_channel.return_value)
+        ready.return_value.result.assert_called_once_with(timeout=mock.ANY)
+        assert transport.grpc_channel is grpc_create_channel.return_value
+
+    adc.assert_called_once_with(scopes=transport.AUTH_SCOPES)
+    callback.assert_called_once_with()
+    grpc_create_channel.assert_called_once_with(
+        "mtls.squid.clam.whelk:443",
+        credentials=mock_cred,
+        ssl_credentials=grpc_ssl_channel_cred.return_value,
+        scopes=transport.AUTH_SCOPES,
+    )
+
+
+def test_publisher_client_lazy():
+    with mock.patch.object(auth, 'default') as adc:
+        client = PublisherClient(lazy=True)
+        adc.assert_not_called()
+    assert client._transport._credentials is None
+
+
+def test_publisher_warm_up(publisher_server):
+    # Credentials that require scopes are scoped once; the scoped copy
+    # is the one the channel uses and the one warm_up refreshes.
+    cred = mock.Mock(spec=service_account.Credentials, requires_scopes=True)
+    scoped = cred.with_scopes.return_value
+    scoped.valid = False
+    with mock.patch.object(grpc_helpers, 'create_channel') as create_channel:
+        create_channel.return_value = grpc.insecure_channel(publisher_server.address)
+        client = PublisherClient(transport=transports.PublisherGrpcTransport(credentials=cred))
+        assert client.warm_up(timeout=5)
+    assert client.wait_for_ready(timeout=5)
+    assert create_channel.call_args[1]['credentials'] is scoped
+    scoped.refresh.assert_called_once_with(mock.ANY)
+    cred.refresh.assert_not_called()
+
+
+def test_publisher_warm_up_waits_for_token_refresher():
+    cred = mock.Mock(spec=credentials.Credentials)
+    refresher = mock.Mock()
+    with mock.patch.object(grpc_helpers, 'create_channel') as create_channel, \
+            mock.patch('google.pubsub_v1.services.token_refresh.acquire',
+                       return_value=refresher):
+        transport = transports.PublisherGrpcTransport(
+            credentials=cred, background_token_refresh=True)
+        with mock.patch.object(transport, 'wait_for_ready', return_value=True):
+            assert transport.warm_up()
+    assert create_channel.call_args[1]['credentials'] is refresher.credentials
+    refresher.ensure_valid.assert_called_once_with()
+    refresher.credentials.refresh.assert_not_called()
+
+
+def test_publisher_wait_for_ready_times_out():
+    with grpc.insecure_channel('localhost:1') as channel:
+        transport = transports.PublisherGrpcTransport(channel=channel)
+        assert not transport.wait_for_ready(timeout=0.1)
+
+
 @pytest.mark.parametrize(
     "api_mtls_endpoint", ["mtls.squid.clam.whelk", "mtls.squid.clam.whelk:443"]
 )
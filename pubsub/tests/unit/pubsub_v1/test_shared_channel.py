@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import grpc
+
+import pytest
+
+from google.api_core import grpc_helpers
+from google.auth import credentials
+from google.pubsub_v1.services.publisher import PublisherClient
+from google.pubsub_v1.services.publisher import transports as publisher_transports
+from google.pubsub_v1.services.shared_channel import SharedChannel
+from google.pubsub_v1.services.subscriber import SubscriberClient
+from google.pubsub_v1.services.subscriber import transports as subscriber_transports
+
+
+def test_channels_close_after_last_release():
+    channel = mock.Mock()
+    shared = SharedChannel([channel])
+
+    publisher = PublisherClient(transport=publisher_transports.PublisherGrpcTransport(
+        channel=shared))
+    subscriber = SubscriberClient(transport=subscriber_transports.SubscriberGrpcTransport(
+        channel=shared))
+    assert publisher._transport.grpc_channel is channel
+    assert subscriber._transport.grpc_channel is channel
+    assert shared.reference_count == 3
+
+    shared.close()
+    shared.close()
+    publisher.close()
+    publisher.close()
+    assert shared.reference_count == 1
+    channel.close.assert_not_called()
+
+    subscriber.close()
+    assert shared.closed
+    channel.close.assert_called_once_with()
+    with pytest.raises(ValueError):
+        shared.acquire()
+
+
+def test_pool_spreads_calls_round_robin():
+    channels = [mock.Mock(), mock.Mock()]
+    shared = SharedChannel(channels)
+    publisher = publisher_transports.PublisherGrpcTransport(channel=shared)
+    subscriber = subscriber_transports.SubscriberGrpcTransport(channel=shared)
+    # Both transports use every channel of the pool.
+    assert publisher.grpc_channel is subscriber.grpc_channel
+
+    publish = publisher.publish
+    for channel in channels:
+        channel.unary_unary.assert_called_once()
+    for _ in range(3):
+        publish('request')
+    assert channels[0].unary_unary.return_value.call_count == 2
+    assert channels[1].unary_unary.return_value.call_count == 1
+
+    subscriber.streaming_pull(iter(()))
+    subscriber.streaming_pull(iter(()))
+    for channel in channels:
+        channel.stream_stream.return_value.assert_called_once()
+
+    publisher.close()
+    for channel in channels:
+        channel.close.assert_not_called()
+
+
+def test_requires_a_channel():
+    with pytest.raises(ValueError):
+        SharedChannel([])
+    with pytest.raises(ValueError):
+        SharedChannel.create(pool_size=0)
+
+
+def test_create_mtls_pool():
+    client_cert_source = mock.Mock(return_value=(b'cert', b'key'))
+    cred = credentials.AnonymousCredentials()
+    with mock.patch.object(grpc_helpers, 'create_channel', autospec=True) as create_channel, \
+            mock.patch.object(grpc, 'ssl_channel_credentials', autospec=True) as ssl_cred:
+        shared = SharedChannel.create(
+            credentials=cred,
+            api_mtls_endpoint='mtls.squid.clam.whelk',
+            client_cert_source=client_cert_source,
+            pool_size=2)
+
+    client_cert_source.assert_called_once_with()
+    ssl_cred.assert_called_once_with(certificate_chain=b'cert', private_key=b'key')
+    assert len(shared.channels) == 2
+    assert create_channel.call_count == 2
+    create_channel.assert_called_with(
+        'mtls.squid.clam.whelk:443',
+        credentials=cred,
+        scopes=('https://www.googleapis.com/auth/cloud-platform',
+                'https://www.googleapis.com/auth/pubsub'),
+        ssl_credentials=ssl_cred.return_value,
+        options=[('grpc.use_local_subchannel_pool', 1)],
+    )
+
+
+def test_transport_closes_only_channels_it_owns():
+    provided = mock.Mock()
+    transport = publisher_transports.PublisherGrpcTransport(channel=provided)
+    transport.close()
+    provided.close.assert_not_called()
+
+    with mock.patch.object(grpc_helpers, 'create_channel', autospec=True) as create_channel:
+        transport = publisher_transports.PublisherGrpcTransport(
+            credentials=credentials.AnonymousCredentials())
+        transport.grpc_channel
+        transport.close()
+    create_channel.return_value.close.assert_called_once_with()
+
+
+def test_wait_for_ready_connects_every_channel():
+    channels = [mock.Mock(), mock.Mock()]
+    shared = SharedChannel(channels)
+    with mock.patch.object(grpc, 'channel_ready_future') as ready:
+        assert shared.wait_for_ready(timeout=1)
+    assert [c[0][0] for c in ready.call_args_list] == channels
+
+    with mock.patch.object(grpc, 'channel_ready_future') as ready:
+        ready.return_value.result.side_effect = grpc.FutureTimeoutError()
+        assert not shared.wait_for_ready(timeout=0)
+    assert ready.return_value.cancel.call_count == 2
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import threading
+import time
+
+import pytest
+
+from google.api_core import exceptions
+from google.auth import credentials
+from google.pubsub_v1.services.publisher import PublisherClient
+from google.pubsub_v1.services.publisher import splitting
+from google.pubsub_v1.types import pubsub
+
+TOPIC = 'projects/p/topics/t'
+
+
+def make_request(*keys, size=10):
+    return pubsub.PublishRequest(topic=TOPIC, messages=[
+        pubsub.PubsubMessage(data=b'x' * size, ordering_key=key,
+                             attributes={'i': str(i)})
+        for i, key in enumerate(keys)
+    ])
+
+
+class FakeSend:
+    """Answer each request with IDs built from the messages' attributes."""
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.lock = threading.Lock()
+        self.requests = []
+
+    def __call__(self, request):
+        time.sleep(self.delay)
+        indexes = [m.attributes['i'] for m in request.messages]
+        with self.lock:
+            self.requests.append(indexes)
+        if self.fail_on in indexes:
+            raise exceptions.InvalidArgument('rejected')
+        return pubsub.PublishResponse(message_ids=['id-' + i for i in indexes])
+
+
+def test_sizes_match_encoding():
+    request = make_request('', 'a', 'b', size=300)
+    encoded = len(pubsub.PublishRequest.serialize(request))
+    assert splitting.topic_size(TOPIC) + sum(splitting.message_sizes(request)) == encoded
+    assert splitting.topic_size('') == 0
+
+
+def test_fits():
+    request = make_request('', '', '')
+    assert splitting.fits(request)
+    assert not splitting.fits(request, max_messages=2)
+    assert not splitting.fits(request, max_bytes=50)
+
+
+def test_split_respects_limits():
+    request = make_request(*[''] * 25, size=100)
+    sizes = splitting.message_sizes(request)
+    base = splitting.topic_size(TOPIC)
+    chunks = splitting.split(request, max_bytes=1000, max_messages=4)
+    assert sorted(i for chunk in chunks for i in chunk) == list(range(25))
+    for chunk in chunks:
+        assert len(chunk) <= 4
+        assert base + sum(sizes[i] for i in chunk) <= 1000
+
+
+def test_split_keeps_keys_together():
+    request = make_request('a', 'b', 'a', '', 'b', 'a')
+    chunks = splitting.split(request, max_messages=2)
+    # Key b fits in one request, so it does not follow a's last message;
+    # the unkeyed message fills the space left instead.
+    assert chunks == [[0, 2], [5, 3], [1, 4]]
+
+
+def test_split_starts_new_request_for_key_by_bytes():
+    request = make_request('a', 'a', 'b', 'b', size=100)
+    size = splitting.message_sizes(request)[0]
+    base = splitting.topic_size(TOPIC)
+    chunks = splitting.split(request, max_bytes=base + 3 * size)
+    assert chunks == [[0, 1], [2, 3]]
+
+
+def test_split_message_too_large():
+    request = make_request('', size=2000)
+    with pytest.raises(ValueError):
+        splitting.split(request, max_bytes=1000)
+
+
+def test_publish_within_limits_is_unchanged():
+    request = make_request('', '')
+    send = mock.Mock(return_value=pubsub.PublishResponse(message_ids=['1', '2']))
+    response = splitting.publish(send, request)
+    send.assert_called_once_with(request)
+    assert response.message_ids == ['1', '2']
+
+
+def test_publish_merges_ids_in_order():
+    keys = ['a', '', 'b', 'a', '', 'b', 'a'] * 3
+    request = make_request(*keys)
+    send = FakeSend()
+    response = splitting.publish(send, request, max_messages=2)
+    assert list(response.message_ids) == ['id-{}'.format(i) for i in range(len(keys))]
+    assert len(send.requests) == 11
+
+
+def test_publish_sends_each_key_in_order():
+    request = make_request(*['a'] * 6 + [''] * 6)
+    send = FakeSend(delay=0.01)
+    splitting.publish(send, request, max_messages=2, concurrency=4)
+    sent = [int(i) for indexes in send.requests for i in indexes if int(i) < 6]
+    assert sent == list(range(6))
+
+
+def test_publish_failure_stops_key():
+    request = make_request(*['a'] * 6 + [''] * 2)
+    send = FakeSend(fail_on='2')
+    with pytest.raises(exceptions.InvalidArgument):
+        splitting.publish(send, request, max_messages=2)
+    sent = {i for indexes in send.requests for i in indexes}
+    assert sent == {'0', '1', '2', '3', '6', '7'}
+
+
+def test_client_publish_splits():
+    client = PublisherClient(credentials=credentials.AnonymousCredentials())
+    messages = [pubsub.PubsubMessage(data=b'x') for _ in range(2500)]
+    with mock.patch.object(type(client._transport.publish), '__call__') as call:
+        call.side_effect = lambda request, **kwargs: pubsub.PublishResponse(
+            message_ids=[str(len(m.data)) for m in request.messages])
+        response = client.publish(topic=TOPIC, messages=messages)
+    assert len(call.mock_calls) == 3
+    assert sorted(len(c[1][0].messages) for c in call.mock_calls) == [500, 1000, 1000]
+    assert len(response.message_ids) == 2500
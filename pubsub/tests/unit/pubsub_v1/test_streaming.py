@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import threading
+import time
+
+import pytest
+
+from google.api_core import exceptions
+from google.auth import credentials
+from google.pubsub_v1.services.subscriber import SubscriberClient
+from google.pubsub_v1.services.subscriber import streaming
+from google.pubsub_v1.services.subscriber.latency import DeliveryMetrics
+from google.pubsub_v1.types import pubsub
+
+
+class FakeStream:
+    """Yields responses, then stays open until cancelled.
+
+    An exception among the responses is raised when it is reached. As
+    gRPC does, requests are consumed on a separate thread and recorded in
+    ``requests``. Sending one takes a moment, and those not sent by the
+    time the call is cancelled are dropped.
+    """
+    def __init__(self, responses, requests):
+        self._responses = iter(responses)
+        self._cancelled = threading.Event()
+        self.requests = []
+        threading.Thread(target=self._send, args=(requests,), daemon=True).start()
+
+    def _send(self, requests):
+        for request in requests:
+            if self._cancelled.wait(0.01):
+                return
+            self.requests.append(request)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            response = next(self._responses)
+        except StopIteration:
+            self._cancelled.wait()
+            raise
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def cancel(self):
+        self._cancelled.set()
+
+
+class FakeClient:
+    """Stands in for SubscriberClient; each call opens the next stream."""
+    def __init__(self, responses_per_stream):
+        self._responses = list(responses_per_stream)
+        self._lock = threading.Lock()
+        self.streams = []
+
+    def streaming_pull(self, requests, metadata=()):
+        with self._lock:
+            responses = self._responses.pop(0) if self._responses else []
+            stream = FakeStream(responses, requests)
+            self.streams.append(stream)
+        return stream
+
+
+def drain(stream):
+    # The first request opens the stream; the rest carry acks and modacks.
+    return stream.requests[0], stream.requests[1:]
+
+
+def wait_for(received, count):
+    done = threading.Event()
+
+    def callback(message):
+        received.append(message)
+        message.ack()
+        if len(received) == count:
+            done.set()
+
+    return callback, done
+
+
+def test_streams_have_distinct_client_ids():
+    client = FakeClient([])
+    manager = streaming.StreamingPullManager(
+        client, 'projects/p/subscriptions/s', lambda m: None, stream_count=4)
+
+    client_ids = {stream.client_id for stream in manager.streams}
+    assert len(client_ids) == 4
+
+
+def test_stream_count_must_be_positive():
+    with pytest.raises(ValueError):
+        streaming.StreamingPullManager(
+            FakeClient([]), 'projects/p/subscriptions/s', lambda m: None,
+            stream_count=0)
+
+
+def test_acks_are_routed_to_delivering_stream(make_received):
+    client = FakeClient([
+        [pubsub.StreamingPullResponse(received_messages=make_received('1', '2'))],
+        [pubsub.StreamingPullResponse(received_messages=make_received('3'))],
+    ])
+    received = []
+    callback, done = wait_for(received, 3)
+    manager = streaming.StreamingPullManager(
+        client, 'projects/p/subscriptions/s', callback,
+        stream_count=2, worker_count=3, stream_ack_deadline_seconds=42)
+
+    manager.start()
+    assert done.wait(5)
+    manager.close()
+
+    assert manager.leased_messages == 0
+    acked = {}
+    for stream in client.streams:
+        initial, rest = drain(stream)
+        assert initial.subscription == 'projects/p/subscriptions/s'
+        assert initial.stream_ack_deadline_seconds == 42
+        acked[initial.client_id] = [
+            ack_id for request in rest for ack_id in request.ack_ids]
+
+    for message in received:
+        assert message.ack_id in acked[message.stream.client_id]
+    assert sorted(sum(acked.values(), [])) == ['ack-1', 'ack-2', 'ack-3']
+
+
+def test_callback_error_nacks_message(make_received):
+    response = pubsub.StreamingPullResponse(received_messages=make_received('1'))
+    client = FakeClient([[response]])
+    done = threading.Event()
+
+    def callback(message):
+        done.set()
+        raise RuntimeError('boom')
+
+    manager = streaming.StreamingPullManager(
+        client, 'projects/p/subscriptions/s', callback, worker_count=1)
+    manager.start()
+    assert done.wait(5)
+    manager.close()
+
+    _, rest = drain(client.streams[0])
+    assert list(rest[0].modify_deadline_ack_ids) == ['ack-1']
+    assert list(rest[0].modify_deadline_seconds) == [0]
+
+
+def test_close_sends_final_acks(make_received):
+    response = pubsub.StreamingPullResponse(received_messages=make_received('1'))
+    client = FakeClient([[response]])
+    started = threading.Event()
+
+    def callback(message):
+        started.set()
+        time.sleep(0.1)
+        message.ack()
+
+    manager = streaming.StreamingPullManager(
+        client, 'projects/p/subscriptions/s', callback, worker_count=1)
+    manager.start()
+    assert started.wait(5)
+    # The ack is queued while the manager is closing, and still sent.
+    manager.close()
+
+    _, rest = drain(client.streams[0])
+    assert [ack_id for r in rest for ack_id in r.ack_ids] == ['ack-1']
+
+
+def test_ack_by_id_and_double_ack_are_idempotent(make_received):
+    response = pubsub.StreamingPullResponse(received_messages=make_received('1', '2'))
+    client = FakeClient([[response]])
+    received = []
+    done = threading.Event()
+
+    def callback(message):
+        received.append(message)
+        if len(received) == 2:
+            done.set()
+
+    manager = streaming.StreamingPullManager(
+        client, 'projects/p/subscriptions/s', callback, worker_count=1)
+    manager.start()
+    assert done.wait(5)
+    assert manager.leased_messages == 2
+
+    manager.ack(['ack-1', 'ack-2', 'unknown'])
+    received[0].ack()
+    manager.close()
+
+    _, rest = drain(client.streams[0])
+    assert [ack_id for r in rest for ack_id in r.ack_ids] == ['ack-1', 'ack-2']
+
+
+def test_reconnect_keeps_leases(make_received):
+    client = FakeClient([
+        [pubsub.StreamingPullResponse(received_messages=make_received('1')),
+         exceptions.ServiceUnavailable('rebalancing')],
+        [pubsub.StreamingPullResponse(received_messages=make_received('2'))],
+    ])
+    received = []
+    done = threading.Event()
+
+    def callback(message):
+        received.append(message)
+        if len(received) == 2:
+            done.set()
+
+    manager = streaming.StreamingPullManager(
+        client, 'projects/p/subscriptions/s', callback, worker_count=1,
+        stream_ack_deadline_seconds=30, initial_backoff=0.01)
+    assert manager.time_without_messages is None
+    manager.start()
+    assert done.wait(5)
+
+    stream = manager.streams[0]
+    assert stream.connected
+    assert stream.error is None
+    assert manager.reconnect_count == 1
+    assert manager.time_without_messages < 5
+    manager.close()
+
+    assert len(client.streams) == 2
+    initial, rest = drain(client.streams[1])
+    assert initial.client_id == stream.client_id
+    assert list(rest[0].modify_deadline_ack_ids) == ['ack-1']
+    assert list(rest[0].modify_deadline_seconds) == [30]
+
+
+def test_non_retryable_error_stops_stream():
+    client = FakeClient([[exceptions.PermissionDenied('denied')]])
+    manager = streaming.StreamingPullManager(
+        client, 'projects/p/subscriptions/s', lambda m: None,
+        initial_backoff=0.01)
+    manager.start()
+    stream = manager.streams[0]
+    stream._thread.join(5)
+
+    assert not stream._thread.is_alive()
+    assert isinstance(stream.error, exceptions.PermissionDenied)
+    assert not stream.connected
+    assert manager.reconnect_count == 0
+    assert len(client.streams) == 1
+    manager.close()
+
+
+def test_delivery_metrics(make_received):
+    response = pubsub.StreamingPullResponse(received_messages=make_received('1', '2'))
+    for received_message in response.received_messages:
+        received_message.message.publish_time = {'seconds': int(time.time()) - 5}
+    client = FakeClient([[response]])
+    received = []
+    done = threading.Event()
+
+    def callback(message):
+        received.append(message)
+        time.sleep(0.01)
+        if message.message.message_id == '1':
+            message.ack()
+        else:
+            message.nack()
+        if len(received) == 2:
+            done.set()
+
+    metrics = DeliveryMetrics()
+    manager = streaming.StreamingPullManager(
+        client, 'projects/p/subscriptions/s', callback, worker_count=1,
+        delivery_metrics=metrics)
+    manager.start()
+    assert done.wait(5)
+    manager.close()
+
+    snapshot = metrics.snapshot()['projects/p/subscriptions/s']
+    assert snapshot['delivery']['count'] == 2
+    assert 4 < snapshot['delivery']['p50'] < 60
+    assert snapshot['handler']['count'] == 2
+    assert snapshot['handler']['max'] >= 0.01
+    assert snapshot['ack']['count'] == 1
+    assert snapshot['ack']['max'] >= 0.01
+
+
+def test_extensions_follow_shortest_lease(make_received):
+    manager = streaming.StreamingPullManager(
+        FakeClient([]), 'projects/p/subscriptions/s', None, dispatcher=mock.Mock())
+    stream = manager.streams[0]
+    # The stream opens before any processing time is known.
+    assert stream._initial_request().stream_ack_deadline_seconds == 10
+    for _ in range(100):
+        manager.histogram.add(60)
+    assert manager.ack_deadline == 60
+    assert manager._next_extension_delay() > 40
+
+    # Its messages still hold the 10 second lease.
+    manager._on_response(stream, pubsub.StreamingPullResponse(received_messages=make_received('1')))
+    assert manager._lease_changed.is_set()
+    assert manager._next_extension_delay() <= 8
+
+    manager._extend_leases()
+    assert stream._requests.get_nowait() == ([], ['ack-1'], 60)
+    assert manager._next_extension_delay() > 40
+
+
+def test_leaser_wakes_for_shorter_lease(make_received):
+    manager = streaming.StreamingPullManager(
+        FakeClient([]), 'projects/p/subscriptions/s', None, dispatcher=mock.Mock())
+    stream = manager.streams[0]
+    stream._initial_request()
+    for _ in range(100):
+        manager.histogram.add(60)
+
+    with mock.patch.object(streaming, '_LEASE_EXTENSION_RATIO', 0.01):
+        leaser = threading.Thread(target=manager._maintain_leases)
+        leaser.start()
+        try:
+            # The leaser now waits about 0.6s; the new message's lease calls
+            # for an extension within 0.1s.
+            time.sleep(0.05)
+            manager._on_response(
+                stream, pubsub.StreamingPullResponse(received_messages=make_received('1')))
+            start = time.monotonic()
+            assert stream._requests.get(timeout=0.4) == ([], ['ack-1'], 60)
+            assert time.monotonic() - start < 0.4
+        finally:
+            manager._stopped.set()
+            manager._lease_changed.set()
+            leaser.join()
+
+
+def test_merge_chunks_large_ack_batches():
+    ack_ids = ['a{}'.format(i) for i in range(streaming._MAX_ACK_IDS_PER_REQUEST + 1)]
+    requests = list(streaming._Stream._merge([(ack_ids, ['m'], 10)]))
+
+    assert len(requests) == 2
+    assert len(requests[0].ack_ids) == streaming._MAX_ACK_IDS_PER_REQUEST
+    assert list(requests[0].modify_deadline_ack_ids) == ['m']
+    assert list(requests[1].ack_ids) == ack_ids[-1:]
+
+
+def test_dispatcher_keeps_ordering_key_on_one_worker(make_received):
+    dispatcher = streaming.HashPartitionedDispatcher(lambda m: None, worker_count=4)
+    messages = [
+        streaming.Message(received, mock.Mock(), mock.Mock())
+        for received in make_received('1', '2', '3', ordering_key='k')
+    ]
+    for message in messages:
+        dispatcher.dispatch(message)
+
+    sizes = sorted(work.qsize() for work in dispatcher._queues)
+    assert sizes == [0, 0, 0, 3]
+
+
+def test_dispatcher_worker_count_must_be_positive():
+    with pytest.raises(ValueError):
+        streaming.HashPartitionedDispatcher(lambda m: None, worker_count=0)
+
+
+def test_subscribe():
+    client = SubscriberClient(credentials=credentials.AnonymousCredentials())
+    with mock.patch.object(streaming.StreamingPullManager, 'start', autospec=True) as start:
+        start.side_effect = lambda manager: manager
+        manager = client.subscribe(
+            'projects/p/subscriptions/s', lambda m: None, stream_count=3)
+
+    start.assert_called_once_with(manager)
+    assert manager.subscription == 'projects/p/subscriptions/s'
+    assert len(manager.streams) == 3
@@ -17,6 +17,7 @@
 
 from unittest import mock
 
+import asyncio
 import grpc
 import math
 import pytest
@@ -82,7 +83,12 @@ def test_subscriber_client_client_options():
         transport = gtc.return_value = mock.MagicMock()
         client = SubscriberClient(client_options=options)
         transport.assert_called_once_with(
+            channel_options=None,
             credentials=None,
+            lazy=False,
+            metrics_sink=None,
+            profiler=None,
+            background_token_refresh=False,
             host=client.DEFAULT_ENDPOINT,
         )
 
@@ -95,7 +101,12 @@ def test_subscriber_client_client_options():
         grpc_transport.assert_called_once_with(
             api_mtls_endpoint=None,
             client_cert_source=None,
+            channel_options=None,
             credentials=None,
+            lazy=False,
+            metrics_sink=None,
+            profiler=None,
+            background_token_refresh=False,
             host="squid.clam.whelk",
         )
 
@@ -109,7 +120,12 @@ def test_subscriber_client_client_options():
         grpc_transport.assert_called_once_with(
             api_mtls_endpoint=client.DEFAULT_MTLS_ENDPOINT,
             client_cert_source=client_cert_source_callback,
+            channel_options=None,
             credentials=None,
+            lazy=False,
+            metrics_sink=None,
+            profiler=None,
+            background_token_refresh=False,
             host=client.DEFAULT_ENDPOINT,
         )
 
@@ -124,7 +140,12 @@ def test_subscriber_client_client_options():
         grpc_transport.assert_called_once_with(
             api_mtls_endpoint="squid.clam.whelk",
             client_cert_source=client_cert_source_callback,
+            channel_options=None,
             credentials=None,
+            lazy=False,
+            metrics_sink=None,
+            profiler=None,
+            background_token_refresh=False,
             host="squid.clam.whelk",
         )
 
@@ -137,11 +158,29 @@ def test_subscriber_client_client_options_from_dict():
         grpc_transport.assert_called_once_with(
             api_mtls_endpoint=None,
             client_cert_source=None,
+            channel_options=None,
             credentials=None,
+            lazy=False,
+            metrics_sink=None,
+            profiler=None,
+            background_token_refresh=False,
             host="squid.clam.whelk",
         )
 
 
+def test_subscriber_client_channel_options_from_dict():
+    with mock.patch('google.pubsub_v1.services.subscriber.transports.SubscriberGrpcTransport.__init__') as grpc_transport:
+        grpc_transport.return_value = None
+        client = SubscriberClient(
+            client_options={
+                'api_endpoint': 'squid.clam.whelk',
+                'channel_options': {'keepalive_time_ms': 30000},
+            }
+        )
+        channel_options = grpc_transport.call_args[1]['channel_options']
+        assert channel_options.keepalive_time_ms == 30000
+
+
 def test_create_subscription(transport: str = 'grpc'):
     client = SubscriberClient(
         credentials=credentials.AnonymousCredentials(),
@@ -580,6 +619,53 @@ def test_list_subscriptions_pages():
             assert page.raw_page.next_page_token == token
 
 
+def test_list_subscriptions_async_pager():
+    client = SubscriberClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+            type(client._transport.list_subscriptions),
+            '__call__') as call:
+        # Set the response to a series of pages.
+        call.side_effect = (
+            pubsub.ListSubscriptionsResponse(
+                subscriptions=[
+                    pubsub.Subscription(),
+                    pubsub.Subscription(),
+                ],
+                next_page_token='abc',
+            ),
+            pubsub.ListSubscriptionsResponse(
+                subscriptions=[],
+                next_page_token='def',
+            ),
+            pubsub.ListSubscriptionsResponse(
+                subscriptions=[
+                    pubsub.Subscription(),
+                ],
+            ),
+            RuntimeError,
+        )
+
+        async def collect():
+            pager = await client.list_subscriptions_async(project='projects/p')
+            assert isinstance(pager, pagers.ListSubscriptionsAsyncPager)
+            return [i async for i in pager]
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(collect())
+        finally:
+            loop.close()
+        assert len(results) == 3
+        assert all(isinstance(i, pubsub.Subscription)
+                   for i in results)
+        _, args, _ = call.mock_calls[0]
+        assert args[0].project == 'projects/p'
+
+
 def test_delete_subscription(transport: str = 'grpc'):
     client = SubscriberClient(
         credentials=credentials.AnonymousCredentials(),
@@ -1263,6 +1349,53 @@ def test_list_snapshots_pages():
             assert page.raw_page.next_page_token == token
 
 
+def test_list_snapshots_async_pager():
+    client = SubscriberClient(
+        credentials=credentials.AnonymousCredentials,
+    )
+
+    # Mock the actual call within the gRPC stub, and fake the request.
+    with mock.patch.object(
+            type(client._transport.list_snapshots),
+            '__call__') as call:
+        # Set the response to a series of pages.
+        call.side_effect = (
+            pubsub.ListSnapshotsResponse(
+                snapshots=[
+                    pubsub.Snapshot(),
+                    pubsub.Snapshot(),
+                ],
+                next_page_token='abc',
+            ),
+            pubsub.ListSnapshotsResponse(
+                snapshots=[],
+                next_page_token='def',
+            ),
+            pubsub.ListSnapshotsResponse(
+                snapshots=[
+                    pubsub.Snapshot(),
+                ],
+            ),
+            RuntimeError,
+        )
+
+        async def collect():
+            pager = await client.list_snapshots_async(project='projects/p')
+            assert isinstance(pager, pagers.ListSnapshotsAsyncPager)
+            return [i async for i in pager]
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(collect())
+        finally:
+            loop.close()
+        assert len(results) == 3
+        assert all(isinstance(i, pubsub.Snapshot)
+                   for i in results)
+        _, args, _ = call.mock_calls[0]
+        assert args[0].project == 'projects/p'
+
+
 def test_create_snapshot(transport: str = 'grpc'):
     client = SubscriberClient(
         credentials=credentials.AnonymousCredentials(),
@@ -1616,6 +1749,86 @@ def test_subscriber_grpc_transport_channel_mtls_with_client_cert_source(
     assert transport.grpc_channel == mock_grpc_channel
 
 
+@mock.patch("grpc.ssl_channel_credentials", autospec=True)
+@mock.patch("google.api_core.grpc_helpers.create_channel", autospec=True)
+def test_subscriber_grpc_transport_lazy_mtls(
+    grpc_create_channel, grpc_ssl_channel_cred
+):
+    # Check that a lazy transport defers credentials, client certificate
+    # and channel creation until the channel is first needed.
+    callback = mock.Mock(return_value=(b"cert bytes", b"key bytes"))
+    mock_cred = mock.Mock()
+    with mock.patch.object(auth, 'default') as adc:
+        adc.return_value = (mock_cred, None)
+        transport = transports.SubscriberGrpcTransport(
+            api_mtls_endpoint="mtls.squid.clam.whelk",
+            client_cert_source=callback,
+            lazy=True,
+        )
+        adc.assert_not_called()
+        callback.assert_not_called()
+        grpc_create_channel.assert_not_called()
+
+        with mock.patch.object(grpc, 'channel_ready_future') as ready:
+            transport.warm_up_in_background(timeout=5).join(5)
+        ready.assert_called_once_with(grpc_create_channel.return_value)
+        ready.return_value.result.assert_called_once_with(timeout=mock.ANY)
+        assert transport.grpc_channel is grpc_create_channel.return_value
+
+    adc.assert_called_once_with(scopes=transport.AUTH_SCOPES)
+    callback.assert_called_once_with()
+    grpc_create_channel.assert_called_once_with(
+        "mtls.squid.clam.whelk:443",
+        credentials=mock_cred,
+        ssl_credentials=grpc_ssl_channel_cred.return_value,
+        scopes=transport.AUTH_SCOPES,
+    )
+
+
+def test_subscriber_client_lazy():
+    with mock.patch.object(auth, 'default') as adc:
+        client = SubscriberClient(lazy=True)
+        adc.assert_not_called()
+    assert client._transport._credentials is None
+
+
+def test_subscriber_warm_up(publisher_server):
+    # Credentials that require scopes are scoped once; the scoped copy
+    # is the one the channel uses and the one warm_up refreshes.
+    cred = mock.Mock(spec=service_account.Credentials, requires_scopes=True)
+    scoped = cred.with_scopes.return_value
+    scoped.valid = False
+    with mock.patch.object(grpc_helpers, 'create_channel') as create_channel:
+        create_channel.return_value = grpc.insecure_channel(publisher_server.address)
+        client = SubscriberClient(transport=transports.SubscriberGrpcTransport(credentials=cred))
+        assert client.warm_up(timeout=5)
+    assert client.wait_for_ready(timeout=5)
+    assert create_channel.call_args[1]['credentials'] is scoped
+    scoped.refresh.assert_called_once_with(mock.ANY)
+    cred.refresh.assert_not_called()
+
+
+def test_subscriber_warm_up_waits_for_token_refresher():
+    cred = mock.Mock(spec=credentials.Credentials)
+    refresher = mock.Mock()
+    with mock.patch.object(grpc_helpers, 'create_channel') as create_channel, \
+            mock.patch('google.pubsub_v1.services.token_refresh.acquire',
+                       return_value=refresher):
+        transport = transports.SubscriberGrpcTransport(
+            credentials=cred, background_token_refresh=True)
+        with mock.patch.object(transport, 'wait_for_ready', return_value=True):
+            assert transport.warm_up()
+    assert create_channel.call_args[1]['credentials'] is refresher.credentials
+    refresher.ensure_valid.assert_called_once_with()
+    refresher.credentials.refresh.assert_not_called()
+
+
+def test_subscriber_wait_for_ready_times_out():
+    with grpc.insecure_channel('localhost:1') as channel:
+        transport = transports.SubscriberGrpcTransport(channel=channel)
+        assert not transport.wait_for_ready(timeout=0.1)
+
+
 @pytest.mark.parametrize(
     "api_mtls_endpoint", ["mtls.squid.clam.whelk", "mtls.squid.clam.whelk:443"]
 )
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+from google.pubsub_v1.services.publisher import PublisherClient
+from google.pubsub_v1.services.publisher import templates
+from google.pubsub_v1.services.publisher.transports import PublisherGrpcTransport
+from google.pubsub_v1.services.publisher.transports import PublisherTransport
+from google.pubsub_v1.types import pubsub
+
+TOPIC = 'projects/p/topics/t'
+TEMPLATE = templates.AttributeTemplate({'source': 'billing', 'schema': 'v3'})
+
+
+def test_encode_overrides_template():
+    message = pubsub.PubsubMessage(data=b'payload', ordering_key='k',
+                                   attributes={'schema': 'v4', 'id': '7'})
+    decoded = pubsub.PubsubMessage.deserialize(TEMPLATE.encode(message))
+    assert decoded.data == b'payload'
+    assert decoded.ordering_key == 'k'
+    assert dict(decoded.attributes) == {'source': 'billing', 'schema': 'v4', 'id': '7'}
+    assert decoded == TEMPLATE.apply(message)
+    # The message itself is left alone.
+    assert dict(message.attributes) == {'schema': 'v4', 'id': '7'}
+
+
+def test_template_is_immutable():
+    attributes = {'a': '1'}
+    template = templates.AttributeTemplate(attributes)
+    attributes['a'] = '2'
+    template.attributes['a'] = '3'
+    assert template.attributes == {'a': '1'}
+
+
+def test_encode_request():
+    messages = [pubsub.PubsubMessage(data=b'x' * n) for n in (0, 5, 300)]
+    encoded = templates.encode_request(TOPIC, [TEMPLATE.encode(m) for m in messages])
+    request = pubsub.PublishRequest.deserialize(encoded)
+    assert request.topic == TOPIC
+    assert list(request.messages) == [TEMPLATE.apply(m) for m in messages]
+
+
+def test_publish_splits():
+    messages = [pubsub.PubsubMessage(data=b'x', attributes={'i': str(i)})
+                for i in range(5)]
+    sent = []
+
+    def send(encoded):
+        request = pubsub.PublishRequest.deserialize(encoded)
+        sent.append(len(request.messages))
+        return pubsub.PublishResponse(
+            message_ids=[m.attributes['i'] for m in request.messages])
+
+    response = templates.publish(send, TOPIC, messages, TEMPLATE, max_messages=2)
+    assert sent == [2, 2, 1]
+    assert list(response.message_ids) == ['0', '1', '2', '3', '4']
+
+
+def test_publish_with_template_over_grpc(publisher_server, channel):
+    client = PublisherClient(transport=PublisherGrpcTransport(channel=channel))
+    response = client.publish_with_template(TOPIC, [
+        pubsub.PubsubMessage(data=b'a'),
+        pubsub.PubsubMessage(data=b'b', attributes={'source': 'audit'}),
+    ], TEMPLATE)
+
+    assert list(response.message_ids) == ['0', '1']
+    request, = publisher_server.requests
+    assert request.topic == TOPIC
+    assert [dict(m.attributes) for m in request.messages] == [
+        {'source': 'billing', 'schema': 'v3'},
+        {'source': 'audit', 'schema': 'v3'},
+    ]
+
+
+def test_publish_with_template_without_encoded_requests():
+    transport = mock.Mock(spec=PublisherTransport)
+    transport.publish.return_value = pubsub.PublishResponse(message_ids=['1'])
+    client = PublisherClient(transport=transport)
+    response = client.publish_with_template(
+        TOPIC, [pubsub.PubsubMessage(data=b'a')], TEMPLATE)
+    assert list(response.message_ids) == ['1']
+    request = transport.publish.call_args[0][0]
+    assert dict(request.messages[0].attributes) == TEMPLATE.attributes
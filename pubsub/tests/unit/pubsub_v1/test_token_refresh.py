@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import datetime
+import threading
+
+from google.api_core import grpc_helpers
+from google.auth import credentials
+from google.pubsub_v1.services import token_refresh
+from google.pubsub_v1.services.publisher import transports as publisher_transports
+from google.pubsub_v1.services.subscriber import transports as subscriber_transports
+
+
+class FakeCredentials(credentials.Credentials):
+    """Hands out one-hour tokens, failing the first ``failures`` refreshes."""
+    def __init__(self, failures=0):
+        super().__init__()
+        self.failures = failures
+        self.refreshed = threading.Event()
+
+    def refresh(self, request):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('token endpoint unavailable')
+        self.token = 'token'
+        self.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        self.refreshed.set()
+
+
+def _expiring_in(seconds):
+    cred = FakeCredentials()
+    cred.token = 'token'
+    cred.expiry = datetime.datetime.utcnow() + datetime.timedelta(seconds=seconds)
+    return cred
+
+
+def test_seconds_until_refresh():
+    assert token_refresh.TokenRefresher(FakeCredentials()).seconds_until_refresh() == 0
+
+    cred = FakeCredentials()
+    cred.token = 'token'
+    assert token_refresh.TokenRefresher(cred).seconds_until_refresh() is None
+
+    assert 3290 < token_refresh.TokenRefresher(_expiring_in(3600)).seconds_until_refresh() <= 3300
+    assert 25 < token_refresh.TokenRefresher(_expiring_in(60)).seconds_until_refresh() <= 30
+    assert token_refresh.TokenRefresher(_expiring_in(-1)).seconds_until_refresh() == 0
+
+
+def test_anonymous_credentials_are_not_refreshed():
+    refresher = token_refresh.acquire(credentials.AnonymousCredentials())
+    assert not refresher.needs_refresh
+    assert refresher._thread is None
+    refresher.release()
+
+
+def test_refresh_ahead_with_backoff():
+    cred = FakeCredentials(failures=2)
+    refresher = token_refresh.acquire(cred, initial_backoff=0.01)
+    try:
+        assert cred.refreshed.wait(5)
+        assert cred.valid
+        assert refresher.failure_count == 2
+        assert refresher.refresh_count == 1
+    finally:
+        refresher.release()
+    assert refresher._thread is None
+
+
+def test_ensure_valid_refreshes_once():
+    refresher = token_refresh.TokenRefresher(FakeCredentials())
+    refresher.ensure_valid()
+    refresher.ensure_valid()
+    assert refresher.credentials.valid
+    assert refresher.refresh_count == 1
+
+
+def test_clients_share_one_refresher():
+    cred = FakeCredentials()
+    with mock.patch.object(grpc_helpers, 'create_channel', autospec=True) as create_channel:
+        publisher = publisher_transports.PublisherGrpcTransport(
+            credentials=cred, background_token_refresh=True)
+        subscriber = subscriber_transports.SubscriberGrpcTransport(
+            credentials=cred, background_token_refresh=True)
+        publisher.grpc_channel
+        subscriber.grpc_channel
+
+    refresher = publisher._token_refresher
+    assert refresher is subscriber._token_refresher
+    assert refresher._references == 2
+    for call in create_channel.call_args_list:
+        assert call[1]['credentials'] is refresher.credentials
+    assert cred.refreshed.wait(5)
+
+    publisher.close()
+    assert refresher._thread is not None
+    subscriber.close()
+    assert refresher._thread is None
+    assert not token_refresh._registry
+
+
+def test_disabled_by_default():
+    cred = FakeCredentials()
+    with mock.patch.object(grpc_helpers, 'create_channel', autospec=True) as create_channel:
+        transport = publisher_transports.PublisherGrpcTransport(credentials=cred)
+        transport.grpc_channel
+    assert transport._token_refresher is None
+    assert create_channel.call_args[1]['credentials'] is cred
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import mock
+
+import threading
+import time
+
+import pytest
+
+from google.auth import credentials
+from google.pubsub_v1.services import tracing
+from google.pubsub_v1.services.publisher import PublisherClient
+from google.pubsub_v1.services.subscriber import streaming
+from google.pubsub_v1.types import pubsub
+
+
+TRACEPARENT = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+
+
+class FakeClient:
+    """Delivers one response on a stream that stays open until cancelled."""
+    def __init__(self, response):
+        self._response = response
+
+    def streaming_pull(self, requests, metadata=()):
+        cancelled = threading.Event()
+        # Consume the requests as gRPC does, so the stream can close.
+        threading.Thread(target=list, args=(requests,), daemon=True).start()
+
+        class Stream:
+            def __init__(stream):
+                stream._responses = iter([self._response])
+
+            def __next__(stream):
+                try:
+                    return next(stream._responses)
+                except StopIteration:
+                    cancelled.wait()
+                    raise
+
+            def cancel(stream):
+                cancelled.set()
+
+        return Stream()
+
+
+def test_traceparent_round_trip():
+    context = tracing.TraceContext.from_traceparent(TRACEPARENT)
+    assert context.trace_id == '0af7651916cd43dd8448eb211c80319c'
+    assert context.span_id == 'b7ad6b7169203331'
+    assert context.sampled
+    assert context.to_traceparent() == TRACEPARENT
+
+
+@pytest.mark.parametrize('value', [
+    None,
+    '',
+    'garbage',
+    'ff-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01',
+    '00-0af7651916cd43dd8448eb211c80319c-b7ad6b716920333-01',
+    '00-00000000000000000000000000000000-b7ad6b7169203331-01',
+    '00-0af7651916cd43dd8448eb211c80319c-b7ad6b716920333z-01',
+])
+def test_malformed_traceparent_is_ignored(value):
+    assert tracing.TraceContext.from_traceparent(value) is None
+
+
+def test_sampling():
+    exporter = tracing.InMemorySpanExporter()
+    assert tracing.Tracer(exporter, sample_rate=0).start_span('publish') is None
+
+    tracer = tracing.Tracer(exporter)
+    unsampled = tracing.TraceContext('1' * 32, '2' * 16, sampled=False)
+    assert tracer.start_span('receive', parent=unsampled) is None
+
+    parent = tracing.TraceContext.from_traceparent(TRACEPARENT)
+    with tracer.start_span('receive', parent=parent) as span:
+        pass
+    assert span.context.trace_id == parent.trace_id
+    assert span.parent_id == parent.span_id
+    assert exporter.spans == [span]
+    assert span.duration >= 0
+
+    with pytest.raises(ValueError):
+        tracing.Tracer(exporter, sample_rate=2)
+
+
+def test_inject_keeps_existing_context():
+    tracer = tracing.Tracer(tracing.InMemorySpanExporter())
+    span = tracer.start_span('publish')
+    attributes = {}
+    tracing.inject(span, attributes)
+    assert tracing.extract(attributes).span_id == span.context.span_id
+
+    attributes = {tracing.TRACEPARENT_ATTRIBUTE: TRACEPARENT}
+    tracing.inject(span, attributes)
+    assert attributes[tracing.TRACEPARENT_ATTRIBUTE] == TRACEPARENT
+
+    attributes = {}
+    tracing.inject(None, attributes)
+    assert attributes == {}
+
+
+def test_exporter_must_implement_export():
+    with pytest.raises(TypeError):
+        tracing.SpanExporter()
+
+
+def test_publish_continues_application_trace():
+    exporter = tracing.InMemorySpanExporter()
+    tracer = tracing.Tracer(exporter, sample_rate=0)
+    client = PublisherClient(
+        credentials=credentials.AnonymousCredentials(), tracer=tracer)
+    messages = [
+        pubsub.PubsubMessage(data=b'x'),
+        pubsub.PubsubMessage(data=b'y', attributes={tracing.TRACEPARENT_ATTRIBUTE: TRACEPARENT}),
+    ]
+    with mock.patch.object(type(client._transport.publish), '__call__') as call:
+        call.return_value = pubsub.PublishResponse(message_ids=['1', '2'])
+        client.publish(topic='projects/p/topics/t', messages=messages)
+
+    # The application's sampled context wins over the sample rate.
+    [span] = exporter.spans
+    assert span.context.trace_id == '0af7651916cd43dd8448eb211c80319c'
+    assert span.parent_id == 'b7ad6b7169203331'
+    sent = call.mock_calls[0][1][0].messages
+    assert tracing.extract(sent[0].attributes).span_id == span.context.span_id
+    assert sent[1].attributes[tracing.TRACEPARENT_ATTRIBUTE] == TRACEPARENT
+
+
+def test_unsampled_publish_is_untouched():
+    tracer = tracing.Tracer(tracing.InMemorySpanExporter(), sample_rate=0)
+    client = PublisherClient(
+        credentials=credentials.AnonymousCredentials(), tracer=tracer)
+    with mock.patch.object(type(client._transport.publish), '__call__') as call:
+        call.return_value = pubsub.PublishResponse(message_ids=['1'])
+        client.publish(topic='projects/p/topics/t',
+                       messages=[pubsub.PubsubMessage(data=b'x')])
+    request = call.mock_calls[0][1][0]
+    assert dict(request.messages[0].attributes) == {}
+
+
+def test_trace_spans_publish_and_receive():
+    exporter = tracing.InMemorySpanExporter()
+    tracer = tracing.Tracer(exporter)
+    client = PublisherClient(
+        credentials=credentials.AnonymousCredentials(), tracer=tracer)
+    message = pubsub.PubsubMessage(data=b'x')
+    with mock.patch.object(type(client._transport.publish), '__call__') as call:
+        call.return_value = pubsub.PublishResponse(message_ids=['1'])
+        client.publish(topic='projects/p/topics/t', messages=[message])
+
+    # The caller's message is not modified.
+    assert dict(message.attributes) == {}
+    [publish_span] = exporter.spans
+    assert publish_span.name == 'publish'
+    assert publish_span.attributes == {'topic': 'projects/p/topics/t', 'messages': 1}
+    assert [name for name, _ in publish_span.events] == ['rpc_start']
+
+    # Deliver what was published to a subscriber.
+    sent = call.mock_calls[0][1][0].messages[0]
+    sent.message_id = '1'
+    sent.publish_time = {'seconds': int(time.time()) - 2}
+    done = threading.Event()
+
+    def callback(message):
+        message.ack()
+        done.set()
+
+    manager = streaming.StreamingPullManager(
+        FakeClient(pubsub.StreamingPullResponse(received_messages=[
+            pubsub.ReceivedMessage(ack_id='ack-1', message=sent)])),
+        'projects/p/subscriptions/s', callback, worker_count=1, tracer=tracer)
+    manager.start()
+    assert done.wait(5)
+    manager.close()
+
+    receive_span = exporter.spans[1]
+    assert receive_span.name == 'receive'
+    assert receive_span.context.trace_id == publish_span.context.trace_id
+    assert receive_span.parent_id == publish_span.context.span_id
+    assert receive_span.attributes['subscription'] == 'projects/p/subscriptions/s'
+    assert receive_span.attributes['message_id'] == '1'
+    assert receive_span.attributes['outcome'] == 'ack'
+    assert 1 < receive_span.attributes['delivery_latency'] < 60
+    assert [name for name, _ in receive_span.events] == ['handler_start']